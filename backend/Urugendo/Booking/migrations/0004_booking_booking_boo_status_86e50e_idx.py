@@ -0,0 +1,20 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Booking', '0003_initial'),
+        ('Experiences', '0005_alter_experienceslot_unique_together_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'updated_at'], name='Booking_boo_status_86e50e_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Booking', '0004_booking_booking_boo_status_86e50e_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='calendar_event_id',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -14,6 +14,10 @@ class Booking(models.Model):
         COMPLETED = "COMPLETED", "Completed"
         EXPIRED = "EXPIRED", "Expired"
 
+    # Statuses whose seats are taken from the slot, and statuses that give them back.
+    SEAT_HOLDING_STATUSES = {Status.PENDING, Status.CONFIRMED}
+    SEAT_RELEASING_STATUSES = {Status.CANCELLED, Status.EXPIRED}
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
     traveler = models.ForeignKey( User, on_delete=models.CASCADE,
@@ -35,6 +39,13 @@ class Booking(models.Model):
         default=Status.PENDING
     )
 
+    # Seats of a PENDING booking are held until this time; Booking.tasks.release_expired_holds
+    # expires the booking afterwards. Cleared once the booking leaves PENDING.
+    hold_expires_at = models.DateTimeField(null=True, blank=True)
+
+    # Id of the traveler's Google Calendar event, set by Utils.tasks.sync_calendar_events.
+    calendar_event_id = models.CharField(max_length=255, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -42,4 +53,21 @@ class Booking(models.Model):
         indexes = [
             models.Index(fields=["status"]),
             models.Index(fields=["created_at"]),
+            models.Index(fields=["status", "updated_at"]),
+            models.Index(
+                fields=["hold_expires_at"], condition=models.Q(status="PENDING"), name="booking_pending_hold_idx"
+            ),
         ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Status as stored, so Booking.signals can detect transitions without re-reading the row
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        # A partial refresh that skips status leaves the loaded value (and any pending change) alone
+        if fields is None or 'status' in fields:
+            self._loaded_status = self.__dict__.get('status')
@@ -1,7 +1,11 @@
+from datetime import timedelta
+from django.conf import settings
 from rest_framework import serializers
 from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
 from django.utils import timezone
 from .models import Booking
+from Experiences.availability import invalidate_availability
 from Experiences.models import ExperienceSlot, Experience
 from Experiences.serializers import ExperienceSlotSerializer
 from Payment.models import Payment
@@ -48,20 +52,26 @@ class BookingCreateSerializer(serializers.Serializer):
     def create(self, validated_data):
         slot = validated_data['_slot']
         guests = validated_data['guests']
-        traveler = self.context['request'].user
+        traveler = validated_data.get('traveler') or self.context['request'].user
 
-        # Create booking with snapshot data
         with transaction.atomic():
-            # Lock the slot row to prevent race conditions
-            slot = ExperienceSlot.objects.select_for_update().get(id=slot.id)
-
-            # Double-check availability (in case of concurrent requests)
-            if slot.remaining_slots < guests:
+            # Reserve the seats with one conditional UPDATE: the row lock is held
+            # only for the rest of this short transaction and the WHERE clause
+            # makes overselling impossible, however many requests race.
+            reserved = ExperienceSlot.objects.filter(
+                id=slot.id, is_active=True, remaining_slots__gte=guests
+            ).update(remaining_slots=F('remaining_slots') - guests)
+
+            if not reserved:
+                remaining = (
+                    ExperienceSlot.objects.filter(id=slot.id, is_active=True)
+                    .values_list('remaining_slots', flat=True).first()
+                )
                 raise serializers.ValidationError({
-                    "guests": f"Only {slot.remaining_slots} slots remaining."
+                    "guests": f"Only {remaining or 0} slots remaining."
                 })
 
-            # Create booking
+            # Create booking with snapshot data
             booking = Booking.objects.create(
                 traveler=traveler,
                 slot=slot,
@@ -69,15 +79,24 @@ class BookingCreateSerializer(serializers.Serializer):
                 experience_title=slot.experience.title,
                 price_per_guest=slot.price,
                 total_price=slot.price * guests,
-                status=Booking.Status.PENDING
+                status=Booking.Status.PENDING,
+                hold_expires_at=timezone.now() + timedelta(minutes=settings.BOOKING_HOLD_MINUTES),
             )
 
-            # Decrement slot availability
-            slot.remaining_slots -= guests
-            slot.save(update_fields=['remaining_slots'])
-
+        # update() sends no signals
+        invalidate_availability([slot.experience_id])
+        slot.refresh_from_db(fields=['remaining_slots'])
         return booking
 
+def with_latest_payment_id(queryset):
+    """
+    Annotate each booking with the id of its most recent payment so
+    BookingSerializer.get_payment_id doesn't query per row.
+    """
+    latest_payment = Payment.objects.filter(booking=OuterRef('pk')).order_by('-payment_date').values('id')[:1]
+    return queryset.annotate(latest_payment_id=Subquery(latest_payment))
+
+
 class BookingSerializer(serializers.ModelSerializer):
     """
     Full booking details including related slot and experience info.
@@ -93,18 +112,22 @@ class BookingSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'traveler', 'traveler_name', 'slot', 'guests',
             'experience_id', 'experience_title', 'experience_location',
-            'price_per_guest', 'total_price', 'status',
+            'price_per_guest', 'total_price', 'status', 'hold_expires_at',
             'created_at', 'updated_at', 'payment_id'
         ]
         read_only_fields = [
             'id', 'traveler', 'experience_title', 'price_per_guest',
-            'total_price', 'created_at', 'updated_at', 'payment_id'
+            'total_price', 'hold_expires_at', 'created_at', 'updated_at', 'payment_id'
         ]
     def get_payment_id(self, obj):
-        payment = obj.payments.first()
-        if payment:
-            return str(payment.id)
-        return None
+        # Booking querysets annotate latest_payment_id (see with_latest_payment_id);
+        # otherwise this reads payments, from the prefetch cache when present.
+        if hasattr(obj, 'latest_payment_id'):
+            payment_id = obj.latest_payment_id
+        else:
+            payments = obj.payments.all()
+            payment_id = payments[0].id if payments else None
+        return str(payment_id) if payment_id else None
 
 class BookingListSerializer(serializers.ModelSerializer):
     """
@@ -127,38 +150,40 @@ class BookingStatusUpdateSerializer(serializers.Serializer):
     """
     status = serializers.ChoiceField(choices=Booking.Status.choices)
 
-    def validate_status(self, value):
-        booking = self.context['booking']
-        current_status = booking.status
-
-        # Define allowed transitions
-        ALLOWED_TRANSITIONS = {
-            Booking.Status.PENDING: [Booking.Status.CONFIRMED, Booking.Status.CANCELLED, Booking.Status.EXPIRED],
-            Booking.Status.CONFIRMED: [Booking.Status.CANCELLED, Booking.Status.COMPLETED],
-            Booking.Status.CANCELLED: [],
-            Booking.Status.COMPLETED: [],
-            Booking.Status.EXPIRED: [],  
-        }
-
-        if value not in ALLOWED_TRANSITIONS.get(current_status, []):
+    # Allowed status transitions
+    ALLOWED_TRANSITIONS = {
+        Booking.Status.PENDING: [Booking.Status.CONFIRMED, Booking.Status.CANCELLED, Booking.Status.EXPIRED],
+        Booking.Status.CONFIRMED: [Booking.Status.CANCELLED, Booking.Status.COMPLETED],
+        Booking.Status.CANCELLED: [],
+        Booking.Status.COMPLETED: [],
+        Booking.Status.EXPIRED: [],
+    }
+
+    def _check_transition(self, current_status, value):
+        if value not in self.ALLOWED_TRANSITIONS.get(current_status, []):
             raise serializers.ValidationError(
                 f"Cannot transition from {current_status} to {value}."
             )
 
+    def validate_status(self, value):
+        self._check_transition(self.context['booking'].status, value)
         return value
 
     def update(self, instance, validated_data):
         new_status = validated_data['status']
-        old_status = instance.status
 
         with transaction.atomic():
-            # If cancelling, restore slot availability
-            if new_status == Booking.Status.CANCELLED and old_status != Booking.Status.CANCELLED:
-                slot = ExperienceSlot.objects.select_for_update().get(id=instance.slot.id)
-                slot.remaining_slots += instance.guests
-                slot.save(update_fields=['remaining_slots'])
+            # Re-read the status under a row lock so two concurrent transitions
+            # can't both release the seats (Booking.signals restores them on save).
+            instance.refresh_from_db(fields=['status'], from_queryset=Booking.objects.select_for_update(of=('self',)))
+            try:
+                self._check_transition(instance.status, new_status)
+            except serializers.ValidationError as e:
+                raise serializers.ValidationError({"status": e.detail})
 
             instance.status = new_status
-            instance.save(update_fields=['status', 'updated_at'])
+            # Only PENDING bookings hold seats until a deadline
+            instance.hold_expires_at = None
+            instance.save(update_fields=['status', 'hold_expires_at', 'updated_at'])
 
         return instance
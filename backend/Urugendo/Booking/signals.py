@@ -1,30 +1,38 @@
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_save
 from django.dispatch import receiver
+from Experiences.models import ExperienceSlot
 from .models import Booking
+from .tasks import release_seats
 
 
-@receiver(pre_save, sender=Booking)
-def handle_booking_status_change(sender, instance, **kwargs):
+@receiver(post_save, sender=Booking)
+def handle_booking_status_change(sender, instance, created, update_fields=None, **kwargs):
     """
-    When a booking is cancelled, immediately restore slot availability.
+    When a booking leaves a seat-holding status (cancelled, expired), give its
+    seats back to the slot. This is the only place that happens for single
+    saves; the batch tasks use queryset updates and restore seats themselves.
+
+    The previous status comes from the value loaded with the instance
+    (Booking.from_db), so no extra query is needed to detect the change. The
+    slot's experience is taken from a select_related slot when there is one.
     """
-    if not instance.pk:
-        return  # new booking, nothing to restore
+    previous = getattr(instance, '_loaded_status', None)
+    instance._loaded_status = instance.status
 
-    try:
-        previous = Booking.objects.get(pk=instance.pk)
-    except Booking.DoesNotExist:
+    if created or previous is None:
+        return
+    if update_fields is not None and 'status' not in update_fields:
         return
 
-    cancelling = (
-        previous.status != Booking.Status.CANCELLED
-        and instance.status == Booking.Status.CANCELLED
+    releasing = (
+        previous in Booking.SEAT_HOLDING_STATUSES
+        and instance.status in Booking.SEAT_RELEASING_STATUSES
     )
-
-    if cancelling and instance.slot:
-        slot = instance.slot
-        slot.remaining_slots = min(
-            slot.remaining_slots + instance.guests,
-            slot.capacity
-        )
-        slot.save(update_fields=['remaining_slots'])
\ No newline at end of file
+    if releasing and instance.slot_id:
+        if Booking.slot.is_cached(instance):
+            experience_id = instance.slot.experience_id
+        else:
+            experience_id = ExperienceSlot.objects.filter(id=instance.slot_id).values_list(
+                'experience_id', flat=True
+            ).first()
+        release_seats(instance.slot_id, instance.guests, experience_id)
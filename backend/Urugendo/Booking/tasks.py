@@ -1,58 +1,150 @@
+import time
+from django.db import transaction
+from django.db.models import DateTimeField, ExpressionWrapper, F, Func, Q, Sum, Value
+from django.db.models.functions import Least
 from django.utils import timezone
 from .models import Booking
+from Experiences.availability import invalidate_availability
 from Experiences.models import ExperienceSlot
 
+# Upper bound on bookings transitioned per transaction by the batch tasks.
+BATCH_SIZE = 1000
 
-def expire_pending_bookings():
+
+def release_seats(slot_id, guests, experience_id):
+    """Give `guests` seats back to a slot, never above its capacity."""
+    restored = ExperienceSlot.objects.filter(id=slot_id).update(
+        remaining_slots=Least(F('remaining_slots') + guests, F('capacity'))
+    )
+    invalidate_availability([experience_id])
+    return restored
+
+
+def _restore_slot_capacity(booking_ids):
     """
-    Expire PENDING bookings whose slot date+time has passed.
-    Restores remaining_slots on the associated ExperienceSlot.
+    Give the seats held by the given bookings back to their slots.
+    Issues one UPDATE per slot with the summed guests, clamped at capacity.
+    """
+    released = (
+        Booking.objects.filter(id__in=booking_ids, slot__isnull=False)
+        .values('slot_id', 'slot__experience_id')
+        .annotate(guests=Sum('guests'))
+        .order_by('slot_id')
+    )
+
+    return sum(release_seats(row['slot_id'], row['guests'], row['slot__experience_id']) for row in released)
+
+
+def _expire_in_batches(due, batch_size, summary):
+    """
+    Expire the PENDING bookings matched by `due` (a filter on Booking) and give
+    their seats back, claiming `batch_size` rows per transaction.
     """
     now = timezone.now()
+    while True:
+        with transaction.atomic():
+            # Lock only booking rows; concurrent runs (and PaymentViewSet.pay) skip what is already claimed.
+            booking_ids = list(
+                Booking.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(due, status=Booking.Status.PENDING)
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not booking_ids:
+                break
 
-    stale_bookings = Booking.objects.filter(
-        status=Booking.Status.PENDING,
-        slot__date__lt=now.date(),
-    ).select_related('slot')
-
-    for booking in stale_bookings:
-        booking.status = Booking.Status.EXPIRED
-        booking.save(update_fields=['status', 'updated_at'])
-
-        # Restore slot availability
-        slot = booking.slot
-        if slot:
-            slot.remaining_slots = min(
-                slot.remaining_slots + booking.guests,
-                slot.capacity
+            summary['expired'] += Booking.objects.filter(id__in=booking_ids).update(
+                status=Booking.Status.EXPIRED, hold_expires_at=None, updated_at=now
             )
-            slot.save(update_fields=['remaining_slots'])
+            summary['slots_restored'] += _restore_slot_capacity(booking_ids)
+            summary['batches'] += 1
+
+        if len(booking_ids) < batch_size:
+            break
+    return summary
+
+
+def expire_pending_bookings(batch_size=BATCH_SIZE):
+    """
+    Expire PENDING bookings whose slot date has passed.
+    Restores remaining_slots on the associated ExperienceSlot.
+
+    Bookings are claimed in chunks of `batch_size` and expired with a single
+    set-based UPDATE per chunk, so the run costs a handful of queries per
+    chunk instead of several per booking. Returns a summary of the run.
+    """
+    started = time.monotonic()
+    summary = {'expired': 0, 'slots_restored': 0, 'batches': 0}
+
+    _expire_in_batches(Q(slot__date__lt=timezone.now().date()), batch_size, summary)
+
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+    print(f"expire_pending_bookings: {summary}")
+    return summary
 
 
-def complete_confirmed_bookings():
+def release_expired_holds(batch_size=BATCH_SIZE):
+    """
+    Expire PENDING bookings whose seat hold (hold_expires_at) has run out and
+    give the seats back. The sweep reads the partial index on hold_expires_at,
+    so it only ever touches bookings that are still holding seats.
+    """
+    started = time.monotonic()
+    summary = {'expired': 0, 'slots_restored': 0, 'batches': 0}
+
+    _expire_in_batches(Q(hold_expires_at__lte=timezone.now()), batch_size, summary)
+
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+    print(f"release_expired_holds: {summary}")
+    return summary
+
+
+def _slot_end_expression():
+    """
+    The slot's end as an aware timestamp, computed in SQL:
+    timezone(<current tz>, slot.date + slot.end_time).
+    """
+    return Func(
+        Value(timezone.get_current_timezone_name()),
+        ExpressionWrapper(F('slot__date') + F('slot__end_time'), output_field=DateTimeField()),
+        function='timezone',
+        output_field=DateTimeField(),
+    )
+
+
+def complete_confirmed_bookings(batch_size=BATCH_SIZE):
     """
     Mark CONFIRMED bookings as COMPLETED once their slot end time has passed.
+
+    The end-time comparison runs in the database, so each chunk is a single
+    UPDATE and only rows that actually change are touched. Returns a summary
+    of the run.
     """
+    started = time.monotonic()
     now = timezone.now()
+    summary = {'completed': 0, 'batches': 0}
 
-    confirmed_bookings = Booking.objects.filter(
-        status=Booking.Status.CONFIRMED,
-        slot__date__lte=now.date(),
-    ).select_related('slot')
+    due = (
+        Booking.objects.filter(status=Booking.Status.CONFIRMED, slot__date__lte=timezone.localdate(now))
+        .annotate(slot_end=_slot_end_expression())
+        .filter(slot_end__lte=now)
+        .values('id')
+    )
 
-    for booking in confirmed_bookings:
-        slot = booking.slot
-        if not slot:
-            continue
+    while True:
+        completed = Booking.objects.filter(
+            id__in=due[:batch_size], status=Booking.Status.CONFIRMED
+        ).update(status=Booking.Status.COMPLETED, updated_at=now)
+        if not completed:
+            break
 
-        # Timezone-aware datetime from slot date + end_time
-        slot_end = timezone.make_aware(
-            timezone.datetime.combine(slot.date, slot.end_time)
-        )
+        summary['completed'] += completed
+        summary['batches'] += 1
+        if completed < batch_size:
+            break
 
-        if now >= slot_end:
-            booking.status = Booking.Status.COMPLETED
-            booking.save(update_fields=['status', 'updated_at'])
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+    print(f"complete_confirmed_bookings: {summary}")
+    return summary
 
 
 def deactivate_past_slots():
@@ -61,7 +153,10 @@ def deactivate_past_slots():
     """
     today = timezone.now().date()
 
-    ExperienceSlot.objects.filter(
+    past_slots = ExperienceSlot.objects.filter(
         date__lt=today,
         is_active=True,
-    ).update(is_active=False)
\ No newline at end of file
+    )
+    experience_ids = set(past_slots.values_list('experience_id', flat=True))
+    past_slots.update(is_active=False)
+    invalidate_availability(experience_ids)
@@ -1,3 +1,417 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
 
-# Create your tests here.
+from Booking.models import Booking
+from Booking.serializers import BookingCreateSerializer, BookingStatusUpdateSerializer
+from Booking.tasks import expire_pending_bookings, complete_confirmed_bookings, release_expired_holds
+from Experiences.models import Experience, ExperienceSlot
+
+User = get_user_model()
+
+
+def make_user(username, email, password="SecurePass123!", role="Tourist"):
+    return User.objects.create_user(username=username, email=email, password=password, role=role)
+
+
+def make_slot(experience, date, capacity=10, remaining_slots=None, start_time="09:00:00", end_time="12:00:00"):
+    return ExperienceSlot.objects.create(
+        experience=experience,
+        date=date,
+        start_time=start_time,
+        end_time=end_time,
+        capacity=capacity,
+        remaining_slots=capacity if remaining_slots is None else remaining_slots,
+        price=Decimal("25.00"),
+    )
+
+
+def make_booking(traveler, slot, guests=1, status=Booking.Status.PENDING):
+    return Booking.objects.create(
+        traveler=traveler,
+        slot=slot,
+        guests=guests,
+        experience_title=slot.experience.title,
+        price_per_guest=slot.price,
+        total_price=slot.price * guests,
+        status=status,
+    )
+
+
+class ExpirePendingBookingsTests(TestCase):
+    def setUp(self):
+        self.guide = make_user("guide1", "guide@example.com", role="Guide")
+        self.tourist = make_user("tourist1", "tourist@example.com")
+        self.experience = Experience.objects.create(title="Kigali City Walk", guide=self.guide)
+
+        today = timezone.now().date()
+        self.past_slot = make_slot(self.experience, today - timedelta(days=2), capacity=10, remaining_slots=4)
+        self.future_slot = make_slot(self.experience, today + timedelta(days=2), capacity=10, remaining_slots=8)
+
+    def test_expires_stale_pending_and_restores_capacity(self):
+        """Stale PENDING bookings expire and their guests are summed back onto the slot."""
+        print("Testing bulk expiry of stale pending bookings")
+        stale = [make_booking(self.tourist, self.past_slot, guests=g) for g in (2, 3)]
+        fresh = make_booking(self.tourist, self.future_slot, guests=2)
+
+        summary = expire_pending_bookings()
+
+        self.assertEqual(summary["expired"], 2)
+        self.assertEqual(summary["slots_restored"], 1)
+        for booking in stale:
+            booking.refresh_from_db()
+            self.assertEqual(booking.status, Booking.Status.EXPIRED)
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, Booking.Status.PENDING)
+
+        self.past_slot.refresh_from_db()
+        self.future_slot.refresh_from_db()
+        self.assertEqual(self.past_slot.remaining_slots, 9)
+        self.assertEqual(self.future_slot.remaining_slots, 8)
+
+    def test_restored_capacity_is_clamped(self):
+        """Restored seats never push remaining_slots above capacity."""
+        print("Testing bulk expiry clamps remaining slots at capacity")
+        make_booking(self.tourist, self.past_slot, guests=9)
+
+        expire_pending_bookings()
+
+        self.past_slot.refresh_from_db()
+        self.assertEqual(self.past_slot.remaining_slots, self.past_slot.capacity)
+
+    def test_processes_in_chunks(self):
+        """Every stale booking is expired even when it takes several chunks."""
+        print("Testing bulk expiry processes bookings in chunks")
+        for _ in range(5):
+            make_booking(self.tourist, self.past_slot, guests=1)
+        make_booking(self.tourist, self.past_slot, guests=1, status=Booking.Status.CONFIRMED)
+
+        summary = expire_pending_bookings(batch_size=2)
+
+        self.assertEqual(summary["expired"], 5)
+        self.assertEqual(summary["batches"], 3)
+        self.assertFalse(Booking.objects.filter(status=Booking.Status.PENDING).exists())
+        self.assertEqual(Booking.objects.filter(status=Booking.Status.CONFIRMED).count(), 1)
+        self.past_slot.refresh_from_db()
+        self.assertEqual(self.past_slot.remaining_slots, 9)
+
+    def test_run_with_nothing_to_expire(self):
+        """A run with no stale bookings reports zero counts."""
+        print("Testing bulk expiry with nothing to expire")
+        summary = expire_pending_bookings()
+
+        self.assertEqual(summary["expired"], 0)
+        self.assertEqual(summary["batches"], 0)
+        self.assertIn("duration_ms", summary)
+
+
+class CompleteConfirmedBookingsTests(TestCase):
+    def setUp(self):
+        self.guide = make_user("guide1", "guide@example.com", role="Guide")
+        self.tourist = make_user("tourist1", "tourist@example.com")
+        self.experience = Experience.objects.create(title="Kigali City Walk", guide=self.guide)
+
+        now = timezone.localtime()
+        today = now.date()
+        self.ended_slot = make_slot(self.experience, today - timedelta(days=1))
+        self.future_slot = make_slot(self.experience, today + timedelta(days=1))
+
+        # Same-day slots on either side of "now", kept away from midnight.
+        ended_today = (now - timedelta(hours=1)).time().replace(microsecond=0)
+        running_today = (now + timedelta(hours=1)).time().replace(microsecond=0)
+        self.same_day_slots = None
+        if ended_today < running_today:
+            self.same_day_slots = (
+                make_slot(self.experience, today, start_time="00:00:00", end_time=ended_today),
+                make_slot(self.experience, today, start_time="00:00:01", end_time=running_today),
+            )
+
+    def test_completes_only_bookings_whose_slot_has_ended(self):
+        """Bookings are completed based on slot date + end time, compared in SQL."""
+        print("Testing batched completion of confirmed bookings")
+        ended = make_booking(self.tourist, self.ended_slot, status=Booking.Status.CONFIRMED)
+        upcoming = make_booking(self.tourist, self.future_slot, status=Booking.Status.CONFIRMED)
+        pending = make_booking(self.tourist, self.ended_slot, status=Booking.Status.PENDING)
+
+        summary = complete_confirmed_bookings()
+
+        self.assertEqual(summary["completed"], 1)
+        ended.refresh_from_db()
+        upcoming.refresh_from_db()
+        pending.refresh_from_db()
+        self.assertEqual(ended.status, Booking.Status.COMPLETED)
+        self.assertEqual(upcoming.status, Booking.Status.CONFIRMED)
+        self.assertEqual(pending.status, Booking.Status.PENDING)
+
+    def test_same_day_slot_uses_end_time(self):
+        """A slot later today is left alone while one that ended earlier today completes."""
+        print("Testing completion compares slot end time on the same day")
+        if self.same_day_slots is None:
+            self.skipTest("Too close to midnight to build same-day slots.")
+        ended_slot, running_slot = self.same_day_slots
+        ended = make_booking(self.tourist, ended_slot, status=Booking.Status.CONFIRMED)
+        running = make_booking(self.tourist, running_slot, status=Booking.Status.CONFIRMED)
+
+        complete_confirmed_bookings()
+
+        ended.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual(ended.status, Booking.Status.COMPLETED)
+        self.assertEqual(running.status, Booking.Status.CONFIRMED)
+
+    def test_completes_in_chunks(self):
+        """All due bookings complete across several chunked UPDATEs."""
+        print("Testing batched completion processes bookings in chunks")
+        for _ in range(5):
+            make_booking(self.tourist, self.ended_slot, status=Booking.Status.CONFIRMED)
+
+        summary = complete_confirmed_bookings(batch_size=2)
+
+        self.assertEqual(summary["completed"], 5)
+        self.assertEqual(summary["batches"], 3)
+        self.assertFalse(Booking.objects.filter(status=Booking.Status.CONFIRMED).exists())
+
+
+def reserve(traveler, slot, guests):
+    """Run the booking create path the way BookingViewSet.create does."""
+    serializer = BookingCreateSerializer(
+        data={"slot_id": str(slot.id), "guests": guests},
+        context={"request": SimpleNamespace(user=traveler)},
+    )
+    serializer.is_valid(raise_exception=True)
+    return serializer.save(traveler=traveler)
+
+
+class BookingReservationTests(TestCase):
+    def setUp(self):
+        self.guide = make_user("guide1", "guide@example.com", role="Guide")
+        self.tourist = make_user("tourist1", "tourist@example.com")
+        experience = Experience.objects.create(title="Gorilla Trekking", guide=self.guide)
+        self.slot = make_slot(experience, timezone.now().date() + timedelta(days=7), capacity=8)
+
+    def test_reservation_decrements_capacity_without_locking_reads(self):
+        """Seats are taken with one conditional UPDATE, never SELECT ... FOR UPDATE."""
+        print("Testing booking reservation uses a conditional update")
+        with CaptureQueriesContext(connection) as queries:
+            booking = reserve(self.tourist, self.slot, 3)
+
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.remaining_slots, 5)
+        self.assertEqual(booking.total_price, Decimal("75.00"))
+        self.assertEqual(booking.slot.remaining_slots, 5)
+        self.assertFalse(any("FOR UPDATE" in query["sql"] for query in queries))
+
+    def test_insufficient_capacity_is_rejected(self):
+        """A request for more seats than remain fails and changes nothing."""
+        print("Testing booking reservation rejects overselling")
+        reserve(self.tourist, self.slot, 5)
+
+        slot = ExperienceSlot.objects.get(id=self.slot.id)
+        serializer = BookingCreateSerializer(
+            data={"slot_id": str(slot.id), "guests": 3},
+            context={"request": SimpleNamespace(user=self.tourist)},
+        )
+        serializer.is_valid(raise_exception=True)
+        # Another booking takes the last seats between validation and create.
+        ExperienceSlot.objects.filter(id=slot.id).update(remaining_slots=1)
+        with self.assertRaisesMessage(ValidationError, "Only 1 slots remaining."):
+            serializer.save(traveler=self.tourist)
+
+        self.assertEqual(Booking.objects.count(), 1)
+        self.assertEqual(ExperienceSlot.objects.get(id=slot.id).remaining_slots, 1)
+
+
+class ConcurrentBookingReservationTests(TransactionTestCase):
+    """Uses real commits because bookings race from separate threads."""
+
+    def test_concurrent_bookings_never_oversell(self):
+        """Many simultaneous bookings for one slot fill it exactly to capacity."""
+        print("Testing concurrent bookings never oversell a slot")
+        guide = make_user("guide1", "guide@example.com", role="Guide")
+        tourist = make_user("tourist1", "tourist@example.com")
+        slot = make_slot(
+            Experience.objects.create(title="Gorilla Trekking", guide=guide),
+            timezone.now().date() + timedelta(days=7), capacity=10,
+        )
+        requests = 30
+        start = threading.Barrier(requests)
+        outcomes = []
+        lock = threading.Lock()
+
+        def book():
+            try:
+                start.wait()
+                try:
+                    reserve(tourist, slot, 1)
+                    outcome = "booked"
+                except ValidationError:
+                    outcome = "rejected"
+                with lock:
+                    outcomes.append(outcome)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=book) for _ in range(requests)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        slot.refresh_from_db()
+        self.assertEqual(outcomes.count("booked"), 10)
+        self.assertEqual(outcomes.count("rejected"), requests - 10)
+        self.assertEqual(Booking.objects.filter(slot=slot).count(), 10)
+        self.assertEqual(slot.remaining_slots, 0)
+
+
+class ReleaseExpiredHoldsTests(TestCase):
+    def setUp(self):
+        self.guide = make_user("guide1", "guide@example.com", role="Guide")
+        self.tourist = make_user("tourist1", "tourist@example.com")
+        experience = Experience.objects.create(title="Gorilla Trekking", guide=self.guide)
+        self.slot = make_slot(experience, timezone.now().date() + timedelta(days=7), capacity=8)
+
+    def test_new_bookings_hold_seats_until_expiry(self):
+        """A new booking holds its seats for BOOKING_HOLD_MINUTES."""
+        print("Testing new bookings get a seat hold")
+        before = timezone.now()
+        with self.settings(BOOKING_HOLD_MINUTES=15):
+            booking = reserve(self.tourist, self.slot, 2)
+
+        self.assertGreaterEqual(booking.hold_expires_at, before + timedelta(minutes=15))
+        self.assertLessEqual(booking.hold_expires_at, timezone.now() + timedelta(minutes=15))
+
+    def test_expired_holds_release_their_seats(self):
+        """Only PENDING bookings whose hold has run out are expired."""
+        print("Testing expired seat holds are released")
+        expired = reserve(self.tourist, self.slot, 3)
+        live = reserve(self.tourist, self.slot, 2)
+        confirmed = reserve(self.tourist, self.slot, 1)
+        Booking.objects.filter(id=expired.id).update(hold_expires_at=timezone.now() - timedelta(minutes=1))
+        Booking.objects.filter(id=confirmed.id).update(
+            status=Booking.Status.CONFIRMED, hold_expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        summary = release_expired_holds()
+
+        self.assertEqual(summary["expired"], 1)
+        expired.refresh_from_db()
+        live.refresh_from_db()
+        self.slot.refresh_from_db()
+        self.assertEqual(expired.status, Booking.Status.EXPIRED)
+        self.assertIsNone(expired.hold_expires_at)
+        self.assertEqual(live.status, Booking.Status.PENDING)
+        self.assertEqual(Booking.objects.get(id=confirmed.id).status, Booking.Status.CONFIRMED)
+        self.assertEqual(self.slot.remaining_slots, 5)
+
+
+class BookingStatusSignalTests(TestCase):
+    def setUp(self):
+        self.guide = make_user("guide1", "guide@example.com", role="Guide")
+        self.tourist = make_user("tourist1", "tourist@example.com")
+        experience = Experience.objects.create(title="Gorilla Trekking", guide=self.guide)
+        self.slot = make_slot(experience, timezone.now().date() + timedelta(days=7), capacity=8)
+        self.booking_id = reserve(self.tourist, self.slot, 3).id
+
+    def test_save_without_release_costs_one_query(self):
+        """Saving a loaded booking doesn't re-read it to detect status changes."""
+        print("Testing booking save runs a single query")
+        booking = Booking.objects.get(id=self.booking_id)
+        booking.status = Booking.Status.CONFIRMED
+
+        with self.assertNumQueries(1):
+            booking.save()
+
+    def test_release_uses_select_related_slot(self):
+        """A booking loaded with its slot releases seats without fetching the slot again."""
+        print("Testing seat release reuses the loaded slot")
+        booking = Booking.objects.select_related('slot').get(id=self.booking_id)
+        booking.status = Booking.Status.CANCELLED
+
+        with CaptureQueriesContext(connection) as queries:
+            booking.save()
+
+        self.assertFalse(any(query["sql"].startswith("SELECT") for query in queries))
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.remaining_slots, 8)
+
+    def test_release_without_loaded_slot_reads_only_its_experience(self):
+        """Without a loaded slot, only the slot's experience id is read, not the whole row."""
+        print("Testing seat release looks up just the experience id")
+        booking = Booking.objects.get(id=self.booking_id)
+        booking.status = Booking.Status.CANCELLED
+
+        with CaptureQueriesContext(connection) as queries:
+            booking.save()
+
+        slot_reads = [
+            query["sql"] for query in queries
+            if query["sql"].startswith("SELECT") and ExperienceSlot._meta.db_table in query["sql"]
+        ]
+        self.assertEqual(len(slot_reads), 1)
+        self.assertNotIn("remaining_slots", slot_reads[0])
+
+    def test_partial_refresh_keeps_pending_status_change(self):
+        """Refreshing other fields doesn't hide a status change made before it."""
+        print("Testing partial refresh keeps the loaded status")
+        booking = Booking.objects.get(id=self.booking_id)
+        booking.status = Booking.Status.CANCELLED
+        booking.refresh_from_db(fields=["guests"])
+        booking.save()
+
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.remaining_slots, 8)
+
+    def test_cancelling_restores_seats_once(self):
+        """Cancelling through the status serializer gives the seats back exactly once."""
+        print("Testing cancellation restores seats once")
+        booking = Booking.objects.get(id=self.booking_id)
+        serializer = BookingStatusUpdateSerializer(
+            data={"status": Booking.Status.CANCELLED}, context={"booking": booking}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.update(booking, serializer.validated_data)
+        # Saving again without a status change releases nothing more
+        booking.save()
+
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.remaining_slots, 8)
+
+    def test_confirming_clears_the_hold(self):
+        """A booking confirmed through the status endpoint no longer reports a hold deadline."""
+        print("Testing confirmation clears the seat hold")
+        booking = Booking.objects.get(id=self.booking_id)
+        self.assertIsNotNone(booking.hold_expires_at)
+        serializer = BookingStatusUpdateSerializer(
+            data={"status": Booking.Status.CONFIRMED}, context={"booking": booking}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.update(booking, serializer.validated_data)
+
+        self.assertIsNone(Booking.objects.get(id=self.booking_id).hold_expires_at)
+
+    def test_stale_instance_cannot_release_twice(self):
+        """A second cancel on a stale copy is rejected instead of restoring seats again."""
+        print("Testing stale cancellation is rejected")
+        first = Booking.objects.get(id=self.booking_id)
+        stale = Booking.objects.get(id=self.booking_id)
+        for booking in (first, stale):
+            serializer = BookingStatusUpdateSerializer(
+                data={"status": Booking.Status.CANCELLED}, context={"booking": booking}
+            )
+            serializer.is_valid(raise_exception=True)
+            if booking is first:
+                serializer.update(booking, serializer.validated_data)
+            else:
+                with self.assertRaises(ValidationError):
+                    serializer.update(booking, serializer.validated_data)
+
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.remaining_slots, 8)
@@ -1,5 +1,5 @@
 from Utils.email import send_booking_confirmation, send_guide_new_booking_alert
-from Utils.calendar import add_event
+from Utils.calendar import queue_calendar_event
 
 
 def send_booking_notifications(booking):
@@ -12,7 +12,8 @@ def send_booking_notifications(booking):
                 experience_title=booking.experience_title,
                 booking_date=booking.slot.date.strftime("%B %d, %Y"),
                 start_time = booking.slot.start_time.strftime('%H:%M:%S'),
-                end_time = booking.slot.end_time.strftime('%H:%M:%S')
+                end_time = booking.slot.end_time.strftime('%H:%M:%S'),
+                dedupe_key=f"booking:{booking.id}:confirmed:tourist",
             )
         except Exception as e:
             print(f"Failed to send confirmation email: {e}")
@@ -24,12 +25,13 @@ def send_booking_notifications(booking):
                 guide_name=booking.slot.experience.guide.get_full_name(),
                 tourist_name=booking.traveler.get_full_name(),
                 experience_title=booking.experience_title,
-                booking_date=booking.slot.date.strftime("%B %d, %Y")
+                booking_date=booking.slot.date.strftime("%B %d, %Y"),
+                dedupe_key=f"booking:{booking.id}:confirmed:guide",
             )
         except Exception as e:
             print(f"Failed to send guide notification: {e}")
         
-        # Add to traveler's calendar (if authorized)
+        # Queue an event on the traveler's calendar (if authorized)
         try:
             if hasattr(booking.traveler, 'google_token'):
                 start_time = f"{booking.slot.date}T{booking.slot.start_time.strftime('%H:%M:%S')}"
@@ -39,13 +41,14 @@ def send_booking_notifications(booking):
                 if booking.slot.experience.location:
                     location_name = booking.slot.experience.location.place_name
                 
-                add_event(
+                queue_calendar_event(
                     user=booking.traveler,
                     title=booking.experience_title,
                     description=f"Booked with {booking.slot.experience.guide.get_full_name()}. {booking.guests} guest(s).",
                     start_datetime=start_time,
                     end_datetime=end_time,
-                    location=location_name
+                    location=location_name,
+                    booking=booking,
                 )
         except Exception as e:
-            print(f"Failed to add calendar event: {e}")
+            print(f"Failed to queue calendar event: {e}")
@@ -6,10 +6,15 @@ from django.shortcuts import get_object_or_404
 from django.db.models import Q
 from django.contrib.auth import get_user_model
 from Utils.email import send_booking_pending_alert, send_booking_cancellation, send_cancellation_alert
+from Utils.calendar import has_calendar_event, queue_calendar_delete
 from .models import Booking
 from Payment.models import Payment
 from Choices.models import PaymentStatus
-from .serializers import ( BookingCreateSerializer, BookingSerializer, BookingListSerializer, BookingStatusUpdateSerializer )
+from Choices.registry import get_by_code
+from .serializers import (
+    BookingCreateSerializer, BookingSerializer, BookingListSerializer, BookingStatusUpdateSerializer,
+    with_latest_payment_id,
+)
 
 
 User = get_user_model()
@@ -31,21 +36,20 @@ class BookingViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         user = self.request.user
 
+        bookings = Booking.objects.select_related(
+            'traveler', 'slot', 'slot__experience', 'slot__experience__guide',
+            'slot__experience__location'
+        )
+        if self.action != 'list':
+            bookings = with_latest_payment_id(bookings)
+
         if user.role == 'Admin':
-            return Booking.objects.select_related(
-                'traveler', 'slot', 'slot__experience', 'slot__experience__guide',
-                'slot__experience__location'
-            ).all().order_by('-created_at')
+            return bookings.all().order_by('-created_at')
 
         if user.role == 'Guide':
-            return Booking.objects.select_related(
-                'traveler', 'slot', 'slot__experience', 'slot__experience__location'
-            ).filter(slot__experience__guide=user).order_by('-created_at')
+            return bookings.filter(slot__experience__guide=user).order_by('-created_at')
 
-        return Booking.objects.select_related(
-            'slot', 'slot__experience', 'slot__experience__guide',
-            'slot__experience__location'
-        ).filter(traveler=user).order_by('-created_at')
+        return bookings.filter(traveler=user).order_by('-created_at')
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -73,16 +77,13 @@ class BookingViewSet(viewsets.ModelViewSet):
         # Create booking with PENDING status
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        booking = serializer.save()
-        booking.traveler = traveler
-        booking.status = Booking.Status.PENDING
-        booking.save()
+        booking = serializer.save(traveler=traveler)
 
         # Create associated payment (PENDING)
         payment = Payment.objects.create(
             booking=booking,
             amount=booking.slot.price * booking.guests,
-            payment_status=PaymentStatus.objects.get(code="PENDING")
+            payment_status=get_by_code(PaymentStatus, "PENDING")
         )
 
         # Send pending alert emails
@@ -94,12 +95,13 @@ class BookingViewSet(viewsets.ModelViewSet):
                 booking_date=booking.slot.date.strftime("%B %d, %Y"),
                 start_time=booking.slot.start_time.strftime("%I:%M %p"),
                 end_time=booking.slot.end_time.strftime("%I:%M %p"),
+                dedupe_key=f"booking:{booking.id}:pending",
             )
         except Exception as e:
             print(f"Failed to send pending booking emails: {e}")
 
+        booking.latest_payment_id = payment.id
         response_data = BookingSerializer(booking).data
-        response_data["payment_id"] = str(payment.id)
         return Response(response_data, status=status.HTTP_201_CREATED)
     
     def retrieve(self, request, *args, **kwargs):
@@ -238,7 +240,8 @@ class BookingViewSet(viewsets.ModelViewSet):
                 to=booking.traveler.email,
                 tourist_name=booking.traveler.get_full_name(),
                 experience_title=booking.experience_title,
-                booking_date=booking.slot.date.strftime("%B %d, %Y")
+                booking_date=booking.slot.date.strftime("%B %d, %Y"),
+                dedupe_key=f"booking:{booking.id}:cancelled:tourist",
             )
         except Exception as e:
             print(f"Failed to send cancellation email: {e}")
@@ -250,10 +253,18 @@ class BookingViewSet(viewsets.ModelViewSet):
                 guide_name=booking.slot.experience.guide.get_full_name(),
                 tourist_name=booking.traveler.get_full_name(),
                 experience_title=booking.experience_title,
-                booking_date=booking.slot.date.strftime("%B %d, %Y")
+                booking_date=booking.slot.date.strftime("%B %d, %Y"),
+                dedupe_key=f"booking:{booking.id}:cancelled:guide",
             )
         except Exception as e:
             print(f"Failed to send cancellation alert: {e}")
+
+        # Remove the event from the traveler's calendar
+        try:
+            if has_calendar_event(booking):
+                queue_calendar_delete(user=booking.traveler, booking=booking)
+        except Exception as e:
+            print(f"Failed to queue calendar event removal: {e}")
             
 
         
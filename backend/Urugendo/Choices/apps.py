@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ChoicesConfig(AppConfig):
     name = 'Choices'
+
+    def ready(self):
+        import Choices.signals
@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from Choices.models import (
     PaymentMethod, TravelPreference, Language, PaymentStatus, MobileProvider, PayoutStatus,
 )
+from Choices import registry
 
 class Command(BaseCommand):
     help = "Seed reference tables with initial data"
@@ -36,5 +37,8 @@ class Command(BaseCommand):
                 if created:
                     self.stdout.write(f"Created {model.__name__}: {entry}")
 
+        # Drop any lookup rows cached before seeding
+        registry.clear()
+
         self.stdout.write(self.style.SUCCESS("Reference data seeded successfully."))
         
\ No newline at end of file
@@ -0,0 +1,126 @@
+"""
+Cached access to the Choices lookup tables.
+
+Each table is read with one query on first use and served from memory
+afterwards. Like Utils.system_info, every table has a version token in the
+shared cache backend; a worker re-checks it every LOOKUP_TTL seconds and
+reloads the table only when it changed. Saving or deleting a row replaces
+the token (see Choices.signals), and seed_reference_data clears everything
+once it has run.
+
+A lookup miss reloads the table, in case the row was just added elsewhere,
+but at most once every MISS_RELOAD_INTERVAL seconds, so requests naming
+unknown ids can't force a reload each time.
+
+Usage:
+    from Choices.registry import get_by_code
+    pending = get_by_code(PaymentStatus, "PENDING")
+"""
+import threading
+import time
+import uuid
+from django.core.cache import cache
+from .models import PaymentMethod, TravelPreference, Language, PaymentStatus, MobileProvider, PayoutStatus
+
+LOOKUP_MODELS = (PaymentMethod, TravelPreference, Language, PaymentStatus, MobileProvider, PayoutStatus)
+
+# Seconds a worker serves a table from memory before checking its shared version.
+LOOKUP_TTL = 60
+# Minimum seconds between reloads of a table caused by lookup misses.
+MISS_RELOAD_INTERVAL = 30
+
+_lock = threading.Lock()
+_tables = {}
+
+
+def _version_key(model):
+    return f"choices:version:{model._meta.label_lower}"
+
+
+def _shared_version(model):
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        # add() so concurrent workers agree on a single token; the loser reads the winner's
+        version = uuid.uuid4().hex
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key)
+    return version
+
+
+def _build_table(model, version):
+    rows = list(model.objects.all())
+    now = time.monotonic()
+    return {
+        'rows': rows,
+        'by_id': {str(row.pk): row for row in rows},
+        'by_code': {row.code: row for row in rows if hasattr(row, 'code')},
+        'by_name': {row.name.lower(): row for row in rows if hasattr(row, 'name')},
+        'version': version,
+        'loaded_at': now,
+        'checked_at': now,
+    }
+
+
+def _get_table(model, reload=False):
+    table = _tables.get(model)
+    if table is not None and not reload and time.monotonic() - table['checked_at'] < LOOKUP_TTL:
+        return table
+
+    with _lock:
+        table = _tables.get(model)
+        if table is not None and not reload and time.monotonic() - table['checked_at'] < LOOKUP_TTL:
+            return table
+        version = _shared_version(model)
+        if table is None or reload or version != table['version']:
+            table = _tables[model] = _build_table(model, version)
+        else:
+            table['checked_at'] = time.monotonic()
+        return table
+
+
+def _lookup(model, index, key):
+    """
+    Look up a row by the given index. A miss reloads the table, in case the
+    row was added by another process, unless it was loaded within the last
+    MISS_RELOAD_INTERVAL seconds; then DoesNotExist is raised straight away.
+    """
+    table = _get_table(model)
+    row = table[index].get(key)
+    if row is None and time.monotonic() - table['loaded_at'] >= MISS_RELOAD_INTERVAL:
+        row = _get_table(model, reload=True)[index].get(key)
+    if row is None:
+        raise model.DoesNotExist(f"{model.__name__} matching {index[3:]}={key!r} does not exist.")
+    return row
+
+
+def get_by_code(model, code):
+    """Return the row whose `code` matches exactly (PaymentStatus, PayoutStatus, Language)."""
+    return _lookup(model, 'by_code', code)
+
+
+def get_by_name(model, name):
+    """Return the row whose `name` matches, ignoring case."""
+    return _lookup(model, 'by_name', str(name).lower())
+
+
+def get_by_id(model, pk):
+    """Return the row with the given primary key (UUID or its string form)."""
+    return _lookup(model, 'by_id', str(pk))
+
+
+def get_all(model):
+    """Return every row of the table, in the model's default ordering."""
+    return list(_get_table(model)['rows'])
+
+
+def clear(model=None):
+    """
+    Forget the cached rows of one table, or of every table, here and, via the
+    shared versions, in every other worker.
+    """
+    models = LOOKUP_MODELS if model is None else (model,)
+    cache.set_many({_version_key(m): uuid.uuid4().hex for m in models}, timeout=None)
+    with _lock:
+        for m in models:
+            _tables.pop(m, None)
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_save, post_delete
+from . import registry
+
+
+def clear_lookup_cache(sender, **kwargs):
+    """
+    Drop the cached copy of a lookup table, in every worker, whenever one of its rows changes.
+    """
+    registry.clear(sender)
+
+
+for model in registry.LOOKUP_MODELS:
+    post_save.connect(clear_lookup_cache, sender=model, dispatch_uid=f"clear_lookup_cache_{model.__name__}")
+    post_delete.connect(clear_lookup_cache, sender=model, dispatch_uid=f"clear_lookup_delete_{model.__name__}")
@@ -1,3 +1,81 @@
+from unittest.mock import patch
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from Choices import registry
+from Choices.models import Language, PaymentStatus, PayoutStatus
+
+
+class LookupRegistryTests(TestCase):
+    def setUp(self):
+        registry.clear()
+        self.pending = PaymentStatus.objects.create(code="PENDING")
+        self.english = Language.objects.create(name="English", code="en")
+
+    def test_rows_are_served_from_memory_after_first_load(self):
+        """Only the first lookup of a table hits the database (its shared version, then its rows)."""
+        print("Testing lookup registry caches tables in memory")
+        with self.assertNumQueries(2):
+            registry.get_by_code(PaymentStatus, "PENDING")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(registry.get_by_code(PaymentStatus, "PENDING"), self.pending)
+            self.assertEqual(registry.get_by_id(PaymentStatus, str(self.pending.id)), self.pending)
+            self.assertEqual(registry.get_all(PaymentStatus), [self.pending])
+
+    def test_lookup_by_name_ignores_case(self):
+        """get_by_name matches regardless of case; code and id lookups still work."""
+        print("Testing lookup registry name lookups")
+        self.assertEqual(registry.get_by_name(Language, "english"), self.english)
+        self.assertEqual(registry.get_by_code(Language, "en"), self.english)
+        self.assertEqual(registry.get_by_id(Language, self.english.id), self.english)
+
+    def test_save_and_delete_invalidate_the_table(self):
+        """Writes to a lookup table drop its cached copy."""
+        print("Testing lookup registry invalidation on save and delete")
+        registry.get_by_code(PaymentStatus, "PENDING")
+
+        completed = PaymentStatus.objects.create(code="COMPLETED")
+        with self.assertNumQueries(2):
+            self.assertEqual(registry.get_by_code(PaymentStatus, "COMPLETED"), completed)
+
+        completed.delete()
+        with self.assertRaises(PaymentStatus.DoesNotExist):
+            registry.get_by_code(PaymentStatus, "COMPLETED")
+
+    def test_missing_row_raises_does_not_exist(self):
+        """An unknown code raises the model's DoesNotExist, like .get() would."""
+        print("Testing lookup registry raises DoesNotExist for unknown codes")
+        with self.assertRaises(PayoutStatus.DoesNotExist):
+            registry.get_by_code(PayoutStatus, "PAID")
+
+    def test_misses_do_not_reload_a_freshly_loaded_table(self):
+        """Repeated lookups of an unknown id are answered from memory until MISS_RELOAD_INTERVAL passes."""
+        print("Testing lookup registry negative caching")
+        registry.get_by_code(PaymentStatus, "PENDING")
+
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                with self.assertRaises(PaymentStatus.DoesNotExist):
+                    registry.get_by_id(PaymentStatus, "00000000-0000-0000-0000-000000000000")
+
+        # Added by another process (no signal here), found once the table is old enough to reload.
+        PaymentStatus.objects.bulk_create([PaymentStatus(code="REFUNDED")])
+        with patch.object(registry, "MISS_RELOAD_INTERVAL", 0):
+            self.assertEqual(registry.get_by_code(PaymentStatus, "REFUNDED").code, "REFUNDED")
+
+    def test_other_workers_reload_when_the_shared_version_changes(self):
+        """A worker whose TTL expired reloads a table only if its shared version moved."""
+        print("Testing lookup registry reload on shared version change")
+        registry.get_by_code(PaymentStatus, "PENDING")
+
+        with patch.object(registry, "LOOKUP_TTL", 0):
+            # Version unchanged: only the version check runs.
+            with self.assertNumQueries(1):
+                registry.get_by_code(PaymentStatus, "PENDING")
+
+            # Simulate another worker saving a row.
+            PaymentStatus.objects.filter(id=self.pending.id).update(code="OPEN")
+            cache.set(registry._version_key(PaymentStatus), "changed-elsewhere", timeout=None)
+
+            self.assertEqual(registry.get_by_code(PaymentStatus, "OPEN").id, self.pending.id)
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ExperiencesConfig(AppConfig):
     name = 'Experiences'
+
+    def ready(self):
+        import Experiences.signals
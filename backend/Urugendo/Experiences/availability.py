@@ -0,0 +1,100 @@
+"""
+Per-day availability summaries for experiences.
+
+Summaries are computed with one aggregate query over ExperienceSlot and
+cached per experience and date range in this process's memory (the "local"
+cache). Each experience has a version token in the shared cache; changing
+its slots (or their remaining capacity) replaces the token, so every cached
+range for that experience is skipped from then on, in every process. A
+request costs one shared-cache read for the tokens.
+
+Usage:
+    from Experiences.availability import get_availability
+    days = get_availability([experience.id], start, end)[str(experience.id)]
+"""
+import uuid
+from django.core.cache import cache, caches
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from .models import ExperienceSlot
+
+# Seconds a computed summary is kept; invalidation normally happens sooner.
+AVAILABILITY_TTL = 60 * 60
+
+
+def _version_key(experience_id):
+    return f"availability:version:{experience_id}"
+
+
+def _summary_key(experience_id, version, start, end):
+    return f"availability:{experience_id}:{version}:{start.isoformat()}:{end.isoformat()}"
+
+
+def _versions(experience_ids):
+    keys = {experience_id: _version_key(experience_id) for experience_id in experience_ids}
+    found = cache.get_many(keys.values())
+    new = {key: uuid.uuid4().hex for key in keys.values() if key not in found}
+    if new:
+        cache.set_many(new, timeout=None)
+    return {experience_id: found.get(key) or new[key] for experience_id, key in keys.items()}
+
+
+def _compute(experience_ids, start, end):
+    """One aggregate query for every requested experience."""
+    rows = (
+        ExperienceSlot.objects.filter(experience_id__in=experience_ids, is_active=True, date__range=(start, end))
+        .values('experience_id', 'date')
+        .annotate(
+            slots=Count('id'),
+            available=Count('id', filter=Q(remaining_slots__gt=0)),
+            remaining=Sum('remaining_slots'),
+            min_price=Min('price', filter=Q(remaining_slots__gt=0)),
+        )
+        .order_by('experience_id', 'date')
+    )
+
+    summaries = {experience_id: {} for experience_id in experience_ids}
+    for row in rows:
+        summaries[str(row['experience_id'])][row['date'].isoformat()] = {
+            'slots': row['slots'],
+            'available': row['available'],
+            'remaining': row['remaining'],
+            'min_price': str(row['min_price']) if row['min_price'] is not None else None,
+        }
+    return summaries
+
+
+def get_availability(experience_ids, start, end):
+    """
+    Return {experience id: {ISO date: {slots, available, remaining, min_price}}}
+    for active slots between `start` and `end` (inclusive). Days without
+    slots are left out.
+    """
+    experience_ids = [str(experience_id) for experience_id in dict.fromkeys(experience_ids)]
+    versions = _versions(experience_ids)
+    keys = {experience_id: _summary_key(experience_id, versions[experience_id], start, end)
+            for experience_id in experience_ids}
+
+    summaries = caches['local']
+    cached = summaries.get_many(keys.values())
+    result = {experience_id: cached[key] for experience_id, key in keys.items() if key in cached}
+
+    missing = [experience_id for experience_id in experience_ids if experience_id not in result]
+    if missing:
+        computed = _compute(missing, start, end)
+        summaries.set_many({keys[experience_id]: computed[experience_id] for experience_id in missing},
+                           timeout=AVAILABILITY_TTL)
+        result.update(computed)
+
+    return {experience_id: result[experience_id] for experience_id in experience_ids}
+
+
+def invalidate_availability(experience_ids):
+    """
+    Forget cached summaries of the given experiences once the current
+    transaction commits, so readers can't re-cache the old rows meanwhile.
+    """
+    versions = {_version_key(experience_id): uuid.uuid4().hex for experience_id in set(experience_ids)}
+    if versions:
+        transaction.on_commit(lambda: cache.set_many(versions, timeout=None))
+
@@ -1,5 +1,8 @@
 import django_filters
-from .models import Experience
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+from .models import Experience, ExperienceSlot
 
 class ExperienceFilter(django_filters.FilterSet):
     # Filter by TravelPreference UUID
@@ -21,4 +24,78 @@ class ExperienceFilter(django_filters.FilterSet):
 
     class Meta:
         model = Experience
-        fields = ['expertise', 'expertise_name', 'guide_id']
\ No newline at end of file
+        fields = ['expertise', 'expertise_name', 'guide_id']
+
+class UUIDInFilter(django_filters.BaseInFilter, django_filters.UUIDFilter):
+    """Comma-separated list of UUIDs: ?language=<id>,<id>"""
+
+
+class ExperienceSearchFilter(django_filters.FilterSet):
+    """
+    Filters for GET /experiences/search/.
+
+    Many-to-many filters use EXISTS subqueries so results never need DISTINCT.
+    The slot filters (price range and dates) are applied together: one open,
+    upcoming slot of the experience has to satisfy all of them.
+    """
+    q = django_filters.CharFilter(method='filter_text')
+    language = UUIDInFilter(method='filter_related')
+    payment_method = UUIDInFilter(method='filter_related')
+    expertise = UUIDInFilter(method='filter_related')
+    location = django_filters.UUIDFilter(field_name='location_id')
+    guide_id = django_filters.UUIDFilter(field_name='guide_id')
+
+    min_price = django_filters.NumberFilter(method='filter_slots')
+    max_price = django_filters.NumberFilter(method='filter_slots')
+    date_from = django_filters.DateFilter(method='filter_slots')
+    date_to = django_filters.DateFilter(method='filter_slots')
+
+    # query parameter -> (m2m through model, column holding the related id)
+    RELATED = {
+        'language': (Experience.languages.through, 'language_id'),
+        'payment_method': (Experience.payment_methods.through, 'paymentmethod_id'),
+        'expertise': (Experience.expertise.through, 'travelpreference_id'),
+    }
+
+    class Meta:
+        model = Experience
+        fields = []
+
+    def filter_text(self, queryset, name, value):
+        query = SearchQuery(value, search_type='websearch', config='english')
+        return (
+            queryset.filter(search_vector=query)
+            .annotate(rank=SearchRank(F('search_vector'), query))
+            .order_by('-rank', '-created_at')
+        )
+
+    def filter_related(self, queryset, name, value):
+        through, column = self.RELATED[name]
+        return queryset.filter(Exists(
+            through.objects.filter(experience_id=OuterRef('pk'), **{f'{column}__in': value})
+        ))
+
+    def filter_slots(self, queryset, name, value):
+        # Combined in filter_queryset so all slot conditions hold for the same slot
+        return queryset
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        data = self.form.cleaned_data
+
+        conditions = {}
+        if data.get('min_price') is not None:
+            conditions['price__gte'] = data['min_price']
+        if data.get('max_price') is not None:
+            conditions['price__lte'] = data['max_price']
+        if data.get('date_to'):
+            conditions['date__lte'] = data['date_to']
+        if not conditions and not data.get('date_from'):
+            return queryset
+
+        conditions['date__gte'] = max(data.get('date_from') or timezone.localdate(), timezone.localdate())
+        return queryset.filter(Exists(
+            ExperienceSlot.objects.filter(
+                experience_id=OuterRef('pk'), is_active=True, remaining_slots__gt=0, **conditions
+            )
+        ))
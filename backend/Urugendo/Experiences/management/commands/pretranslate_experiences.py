@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from Experiences.tasks import TRANSLATION_BATCH_SIZE, translate_experiences
+from Utils.translate import SUPPORTED_LANGUAGES
+
+
+class Command(BaseCommand):
+    help = "Store translations for every active experience that is missing one or was edited since"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--languages", nargs="+", default=list(SUPPORTED_LANGUAGES), help="Target language codes")
+        parser.add_argument(
+            "--batch-size", type=int, default=TRANSLATION_BATCH_SIZE, help="Experiences translated per batch call"
+        )
+
+    def handle(self, *args, **options):
+        languages = options["languages"]
+        summary = translate_experiences(batch_size=options["batch_size"], languages=languages)
+        self.stdout.write(self.style.SUCCESS(
+            f"Translated {summary['experiences']} experiences into {', '.join(languages)} "
+            f"({summary['translations']} stored, {summary['missing']} missing)."
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Experiences', '0005_alter_experienceslot_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='experienceslot',
+            name='calendar_event_id',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:20
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Experiences', '0006_experienceslot_calendar_event_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='experience',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config='english', weight='A'), '||', django.contrib.postgres.search.SearchVector('description', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='experience_search_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['is_active', '-created_at'], name='experience_active_created_idx'),
+        ),
+    ]
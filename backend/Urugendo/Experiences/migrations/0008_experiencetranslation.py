@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Experiences', '0007_experience_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExperienceTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(max_length=10)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('experience', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='translations', to='Experiences.experience')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('experience', 'language'), name='unique_experience_translation')],
+            },
+        ),
+    ]
@@ -2,6 +2,8 @@ import uuid
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from Choices.models import PaymentMethod, TravelPreference, Language
 from Location.models import Location
 User = get_user_model()
@@ -36,12 +38,44 @@ class Experience(models.Model):
 
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full-text document for search, kept up to date by PostgreSQL on every write
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('title', weight='A', config='english')
+            + SearchVector('description', weight='B', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='experience_search_idx'),
+            models.Index(fields=['is_active', '-created_at'], name='experience_active_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} by {self.guide}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Text as stored, so Experiences.signals only queues a translation when it changes
+        instance._loaded_content = instance._content()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        if fields is None or {'title', 'description'} & set(fields):
+            self._loaded_content = self._content()
+
+    def _content(self):
+        """(title, description) as currently held, or None if either was deferred."""
+        if 'title' not in self.__dict__ or 'description' not in self.__dict__:
+            return None
+        return self.title, self.description
+
 class ExperienceSlot(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
 
@@ -61,6 +95,9 @@ class ExperienceSlot(models.Model):
 
     is_active = models.BooleanField(default=True)
 
+    # Id of the guide's Google Calendar event, set by Utils.tasks.sync_calendar_events.
+    calendar_event_id = models.CharField(max_length=255, blank=True)
+
     class Meta:
         constraints = [
             models.UniqueConstraint(
@@ -74,4 +111,25 @@ class ExperienceSlot(models.Model):
         ]
     
     def __str__(self):
-        return f"{self.experience.title} - {self.date} ({self.remaining_slots}/{self.capacity})"
\ No newline at end of file
+        return f"{self.experience.title} - {self.date} ({self.remaining_slots}/{self.capacity})"
+
+class ExperienceTranslation(models.Model):
+    """
+    An experience's title and description in one language, written by
+    Experiences.tasks.translate_experiences so reads never call the translator.
+    """
+    experience = models.ForeignKey(Experience, on_delete=models.CASCADE, related_name="translations")
+    language = models.CharField(max_length=10)
+
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["experience", "language"], name="unique_experience_translation")
+        ]
+
+    def __str__(self):
+        return f"{self.experience_id} [{self.language}]"
@@ -0,0 +1,59 @@
+"""
+Facet counts for experience search.
+
+Each facet is one aggregate over the many-to-many (or slot) table, limited
+to the experiences matched by the search, so counts reflect the current
+filters. Names come from the in-process Choices registry.
+
+Usage:
+    from Experiences.search import experience_facets
+    facets = experience_facets(ExperienceSearchFilter(params, queryset=...).qs)
+"""
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+from Choices.models import Language, PaymentMethod, TravelPreference
+from Choices.registry import get_by_id
+from .models import Experience, ExperienceSlot
+
+# facet name -> (m2m through model, column holding the related id, lookup model)
+RELATED_FACETS = {
+    'languages': (Experience.languages.through, 'language_id', Language),
+    'payment_methods': (Experience.payment_methods.through, 'paymentmethod_id', PaymentMethod),
+    'expertise': (Experience.expertise.through, 'travelpreference_id', TravelPreference),
+}
+
+
+def _related_facet(matched, through, column, model):
+    rows = (
+        through.objects.filter(experience_id__in=matched)
+        .values(column)
+        .annotate(count=Count('*'))
+        .order_by('-count')
+    )
+    facet = []
+    for row in rows:
+        try:
+            name = get_by_id(model, row[column]).name
+        except model.DoesNotExist:
+            continue
+        facet.append({'id': str(row[column]), 'name': name, 'count': row['count']})
+    return facet
+
+
+def experience_facets(queryset):
+    """
+    Return {'languages': [...], 'payment_methods': [...], 'expertise': [...],
+    'price': {'min', 'max'}} for the experiences in `queryset`. Prices cover
+    open, upcoming slots.
+    """
+    matched = queryset.order_by().values('pk')
+    facets = {
+        name: _related_facet(matched, through, column, model)
+        for name, (through, column, model) in RELATED_FACETS.items()
+    }
+
+    price = ExperienceSlot.objects.filter(
+        experience_id__in=matched, is_active=True, remaining_slots__gt=0, date__gte=timezone.localdate()
+    ).aggregate(min=Min('price'), max=Max('price'))
+    facets['price'] = {key: str(value) if value is not None else None for key, value in price.items()}
+    return facets
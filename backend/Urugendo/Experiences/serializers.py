@@ -1,10 +1,27 @@
+from datetime import timedelta
+from django.utils import timezone
 from rest_framework import serializers
 from Location.models import Location
 from Location.serializers import LocationSerializer
+from Pictures.models import ImageAsset
 from .models import Experience, ExperienceSlot
 
 
-class ExperienceSerializer(serializers.ModelSerializer):
+class TranslatedContentMixin:
+    """
+    Serve title and description from the translation the view prefetched
+    (ExperienceViewSet.with_translation), falling back to the original text.
+    """
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        translations = getattr(instance, 'selected_translations', None)
+        if translations:
+            data['title'] = translations[0].title
+            data['description'] = translations[0].description
+        return data
+
+
+class ExperienceSerializer(TranslatedContentMixin, serializers.ModelSerializer):
     location = LocationSerializer(read_only=True)
     location_id = serializers.PrimaryKeyRelatedField( queryset=Location.objects.all(),
         write_only=True, required=False, allow_null=True, source='location'
@@ -54,7 +71,7 @@ class ExperienceSlotSerializer(serializers.ModelSerializer):
     class Meta:
         model = ExperienceSlot
         fields = '__all__'
-        read_only_fields = ['id', 'experience', 'remaining_slots']
+        read_only_fields = ['id', 'experience', 'remaining_slots', 'calendar_event_id']
 
     def validate(self, data):
         if self.instance is None:
@@ -77,16 +94,160 @@ class ExperienceSlotSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Slot date cannot be in the past.")
         return value
 
-class ExperienceListSerializer(serializers.ModelSerializer):
+class SlotInputSerializer(serializers.Serializer):
+    """One slot in a bulk request."""
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    capacity = serializers.IntegerField(min_value=1)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+
+class SlotRecurrenceSerializer(serializers.Serializer):
+    """
+    Weekly recurrence, e.g. every Tuesday and Thursday 09:00-12:00 until the end of the season.
+    weekdays: 0 = Monday ... 6 = Sunday.
+    """
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    weekdays = serializers.ListField(child=serializers.IntegerField(min_value=0, max_value=6), allow_empty=False)
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    capacity = serializers.IntegerField(min_value=1)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+
+    def validate(self, data):
+        if data['end_date'] < data['start_date']:
+            raise serializers.ValidationError({"end_date": "End date must be on or after the start date."})
+        return data
+
+    def expand(self, data):
+        """The slots the rule describes, in date order."""
+        weekdays = set(data['weekdays'])
+        slot = {key: data[key] for key in ('start_time', 'end_time', 'capacity', 'price')}
+        day = data['start_date']
+        while day <= data['end_date']:
+            if day.weekday() in weekdays:
+                yield {'date': day, **slot}
+            day += timedelta(days=1)
+
+class ExperienceSlotBulkSerializer(serializers.Serializer):
+    """
+    Validates a bulk slot request: either a weekly `recurrence` rule or an
+    explicit `slots` list. validated_data['slots'] holds the expanded slots.
+    """
+    MAX_SLOTS = 1000
+
+    slots = SlotInputSerializer(many=True, required=False)
+    recurrence = SlotRecurrenceSerializer(required=False)
+    skip_existing = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if ('slots' in data) == ('recurrence' in data):
+            raise serializers.ValidationError("Provide either 'slots' or 'recurrence'.")
+
+        if 'recurrence' in data:
+            data['slots'] = list(SlotRecurrenceSerializer().expand(data.pop('recurrence')))
+
+        slots = data['slots']
+        if not slots:
+            raise serializers.ValidationError("No slots to create.")
+        if len(slots) > self.MAX_SLOTS:
+            raise serializers.ValidationError(f"At most {self.MAX_SLOTS} slots can be created per request.")
+
+        today = timezone.localdate()
+        errors = {}
+        seen = set()
+        for index, slot in enumerate(slots):
+            if slot['date'] < today:
+                errors[index] = "Slot date cannot be in the past."
+            elif slot['end_time'] <= slot['start_time']:
+                errors[index] = "End time must be after the start time."
+            elif (slot['date'], slot['start_time']) in seen:
+                errors[index] = "Duplicate slot in request."
+            seen.add((slot['date'], slot['start_time']))
+        if errors:
+            raise serializers.ValidationError({"slots": errors})
+
+        return data
+
+class CoverPhotoListSerializer(serializers.ListSerializer):
+    """Load the processed variants of every item's first photo with one query per page."""
+    def to_representation(self, data):
+        items = list(data.all() if hasattr(data, 'all') else data)
+        self.child.context['photo_variants'] = ImageAsset.variants_by_url(
+            item.photos[0] for item in items if item.photos
+        )
+        return super().to_representation(items)
+
+
+class ExperienceListSerializer(TranslatedContentMixin, serializers.ModelSerializer):
     """
     Lighter serializer for list views — no nested many-to-many data.
     """
     location = LocationSerializer(read_only=True)
     guide_name = serializers.CharField(source='guide.get_full_name', read_only=True)
+    thumbnail = serializers.SerializerMethodField()
     
     class Meta:
         model = Experience
         fields = [
             'id', 'title', 'description', 'location',
-            'guide_name', 'photos', 'is_active', 'created_at'
+            'guide_name', 'photos', 'thumbnail', 'is_active', 'created_at'
         ]
+        list_serializer_class = CoverPhotoListSerializer
+
+    def get_thumbnail(self, obj):
+        """
+        Thumbnail of the first photo as {"width", "height", "jpeg", "webp"}, or
+        None if it hasn't been processed (clients fall back to the photo itself).
+        """
+        if not obj.photos:
+            return None
+        variants = self.context.get('photo_variants')
+        if variants is None:
+            variants = ImageAsset.variants_by_url(obj.photos[:1])
+        return variants.get(obj.photos[0], {}).get('thumbnail')
+
+
+class ExperienceNearbySerializer(ExperienceListSerializer):
+    """List fields plus the distance from the search centre."""
+    distance_km = serializers.SerializerMethodField()
+
+    class Meta(ExperienceListSerializer.Meta):
+        fields = ExperienceListSerializer.Meta.fields + ['distance_km']
+
+    def get_distance_km(self, obj):
+        return round(obj.distance_km, 3)
+
+
+class NearbyQuerySerializer(serializers.Serializer):
+    """
+    Query parameters of GET /experiences/nearby/: a centre (lat, lng) with a
+    radius, or a map viewport as bbox=min_lng,min_lat,max_lng,max_lat.
+    """
+    MAX_RADIUS_KM = 200
+    MAX_BBOX_DEGREES = 10
+
+    lat = serializers.FloatField(min_value=-90, max_value=90, required=False)
+    lng = serializers.FloatField(min_value=-180, max_value=180, required=False)
+    radius_km = serializers.FloatField(min_value=0.01, max_value=MAX_RADIUS_KM, default=10)
+    bbox = serializers.CharField(required=False)
+
+    def validate_bbox(self, value):
+        try:
+            min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(','))
+        except ValueError:
+            raise serializers.ValidationError("Expected min_lng,min_lat,max_lng,max_lat.")
+        if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+            raise serializers.ValidationError("Invalid bounding box.")
+        if max_lng - min_lng > self.MAX_BBOX_DEGREES or max_lat - min_lat > self.MAX_BBOX_DEGREES:
+            raise serializers.ValidationError(f"The box can span at most {self.MAX_BBOX_DEGREES} degrees.")
+        return min_lat, min_lng, max_lat, max_lng
+
+    def validate(self, data):
+        has_centre = 'lat' in data and 'lng' in data
+        if not has_centre and 'bbox' not in data:
+            raise serializers.ValidationError("Provide lat and lng, or bbox.")
+        if has_centre and 'bbox' in data:
+            raise serializers.ValidationError("Provide either lat/lng or bbox, not both.")
+        return data
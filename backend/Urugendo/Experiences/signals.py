@@ -0,0 +1,33 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django_q.tasks import async_task
+from .availability import invalidate_availability
+from .models import Experience, ExperienceSlot
+
+
+@receiver(post_save, sender=ExperienceSlot)
+@receiver(post_delete, sender=ExperienceSlot)
+def handle_slot_change(sender, instance, **kwargs):
+    """
+    Drop cached availability of the slot's experience.
+    Bulk and queryset updates call invalidate_availability themselves.
+    """
+    invalidate_availability([instance.experience_id])
+
+
+@receiver(post_save, sender=Experience)
+def handle_experience_content_change(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Translate new or edited experience text in the background, once the save commits.
+    The text is compared with what was loaded (Experience.from_db), so saves that
+    leave title and description alone (soft delete, photo edits) queue nothing.
+    """
+    if update_fields is not None and not {'title', 'description'} & set(update_fields):
+        return
+    previous = getattr(instance, '_loaded_content', None)
+    instance._loaded_content = instance._content()
+    if not created and previous is not None and previous == instance._loaded_content:
+        return
+    experience_id = instance.id
+    transaction.on_commit(lambda: async_task("Experiences.tasks.translate_experiences", [experience_id]))
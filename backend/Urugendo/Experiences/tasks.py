@@ -0,0 +1,84 @@
+import time
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from Utils.translate import SUPPORTED_LANGUAGES, translate_batch
+from .models import Experience, ExperienceTranslation
+
+# Experiences translated per translate_batch call.
+TRANSLATION_BATCH_SIZE = 200
+
+
+def _stale_experiences(languages):
+    """Active experiences missing a translation, or edited since it was written, in any of `languages`."""
+    return (
+        Experience.objects.filter(is_active=True)
+        .annotate(fresh=Count(
+            'translations',
+            filter=Q(translations__language__in=languages, translations__updated_at__gte=F('updated_at')),
+        ))
+        .filter(fresh__lt=len(languages))
+    )
+
+
+def translate_experiences(experience_ids=None, batch_size=TRANSLATION_BATCH_SIZE, languages=None):
+    """
+    Store title/description translations for experiences in `languages`
+    (default: every supported language). With `experience_ids` (queued when
+    an experience is saved) only those are translated; without, it sweeps
+    every experience whose translations are missing or older than its last edit.
+
+    Texts go through Utils.translate.translate_batch, so unchanged content is
+    served from the translation cache and new content costs a few batched
+    requests. A language the translator returned nothing for is skipped for
+    that experience (and counted as missing), so the next sweep retries it.
+    Returns a summary of the run.
+    """
+    started = time.monotonic()
+    languages = list(languages or SUPPORTED_LANGUAGES)
+    summary = {'experiences': 0, 'translations': 0, 'missing': 0, 'batches': 0}
+
+    if experience_ids is not None:
+        pending = Experience.objects.filter(id__in=experience_ids, is_active=True)
+    else:
+        pending = _stale_experiences(languages)
+    pending = pending.order_by('id').values_list('id', 'title', 'description')
+
+    last_id = None
+    while True:
+        page = pending if last_id is None else pending.filter(id__gt=last_id)
+        rows = list(page[:batch_size])
+        if not rows:
+            break
+
+        texts = [text for _, title, description in rows for text in (title, description)]
+        translated = translate_batch(texts, languages)
+        now = timezone.now()
+        translations = []
+        for i, (experience_id, _, _) in enumerate(rows):
+            title, description = translated[2 * i], translated[2 * i + 1]
+            for language in languages:
+                if language not in title or language not in description:
+                    print(f"translate_experiences: no {language!r} translation for experience {experience_id}")
+                    summary['missing'] += 1
+                    continue
+                translations.append(ExperienceTranslation(
+                    experience_id=experience_id, language=language, updated_at=now,
+                    title=title[language][:255], description=description[language],
+                ))
+        ExperienceTranslation.objects.bulk_create(
+            translations,
+            update_conflicts=True,
+            unique_fields=['experience', 'language'],
+            update_fields=['title', 'description', 'updated_at'],
+        )
+
+        summary['experiences'] += len(rows)
+        summary['translations'] += len(translations)
+        summary['batches'] += 1
+        last_id = rows[-1][0]
+        if len(rows) < batch_size:
+            break
+
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+    print(f"translate_experiences: {summary}")
+    return summary
@@ -4,7 +4,7 @@ from unittest.mock import patch, MagicMock
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from datetime import datetime
+from datetime import date, datetime, timedelta
 User = get_user_model()
 
 
@@ -115,7 +115,7 @@ class ExperienceSlotCreateTests(TestCase):
         self.url = f"/experiences/{self.experience.pk}/slots/"
 
         self.valid_slot = {
-            "date": "2026-06-01",
+            "date": (date.today() + timedelta(days=30)).isoformat(),
             "start_time": "09:00:00",
             "end_time": "12:00:00",
             "capacity": 10,
@@ -123,15 +123,15 @@ class ExperienceSlotCreateTests(TestCase):
             "price": "25.00",
         }
 
-    @patch("Experiences.views.add_event")
-    def test_guide_owner_can_create_slot(self, mock_add_event):
+    @patch("Experiences.views.queue_calendar_event")
+    def test_guide_owner_can_create_slot(self, mock_queue_event):
         print("Testing guide owner can create slot")
         self.client.force_authenticate(user=self.guide)
         response = self.client.post(self.url, self.valid_slot, format="json")
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
-    @patch("Experiences.views.add_event")
-    def test_admin_can_create_slot(self, mock_add_event):
+    @patch("Experiences.views.queue_calendar_event")
+    def test_admin_can_create_slot(self, mock_queue_event):
         """An admin can create a slot for any experience."""
         print("Testing admin can create slot for any experience")
         self.client.force_authenticate(user=self.admin)
@@ -172,8 +172,8 @@ class ExperienceSlotCreateTests(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
-    @patch("Experiences.views.add_event")
-    def test_slot_missing_required_fields(self, mock_add_event):
+    @patch("Experiences.views.queue_calendar_event")
+    def test_slot_missing_required_fields(self, mock_queue_event):
         """Missing required slot fields returns 400."""
         print("Testing slot creation with missing required fields returns 400")
         self.client.force_authenticate(user=self.guide)
@@ -181,9 +181,9 @@ class ExperienceSlotCreateTests(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
-    @patch("Experiences.views.add_event")
-    def test_calendar_event_called_when_guide_has_google_token(self, mock_add_event):
-        """add_event is called when the guide has a google_token."""
+    @patch("Experiences.views.queue_calendar_event")
+    def test_calendar_event_called_when_guide_has_google_token(self, mock_queue_event):
+        """A calendar event is queued when the guide has a google_token."""
         print("Testing calendar event creation when guide has google token")
         from Users.models import GoogleOAuthToken
         GoogleOAuthToken.objects.create(
@@ -197,13 +197,495 @@ class ExperienceSlotCreateTests(TestCase):
         self.client.force_authenticate(user=self.guide)
         self.client.post(self.url, self.valid_slot, format="json")
 
-        mock_add_event.assert_called_once()
+        mock_queue_event.assert_called_once()
+        self.assertEqual(mock_queue_event.call_args.kwargs["slot"].experience, self.experience)
 
-    @patch("Experiences.views.add_event")
-    def test_calendar_event_not_called_without_google_token(self, mock_add_event):
-        """add_event is NOT called when the guide has no google_token."""
+    @patch("Experiences.views.queue_calendar_event")
+    def test_calendar_event_not_called_without_google_token(self, mock_queue_event):
+        """No calendar event is queued when the guide has no google_token."""
         print("Testing calendar event not created when guide has no google token")
         self.client.force_authenticate(user=self.guide)
         self.client.post(self.url, self.valid_slot, format="json")
 
-        mock_add_event.assert_not_called()
+        mock_queue_event.assert_not_called()
+
+class ExperienceSlotBulkCreateTests(TestCase):
+    def setUp(self):
+        from Experiences.models import Experience
+        self.client = APIClient()
+        self.guide = make_user("guide1", "guide@example.com", role="Guide")
+        self.other_guide = make_user("guide2", "guide2@example.com", role="Guide")
+        self.experience = Experience.objects.create(title="Kigali City Walk", guide=self.guide)
+        self.url = f"/experiences/{self.experience.pk}/slots/bulk/"
+        self.start = date.today() + timedelta(days=1)
+        self.recurrence = {
+            "start_date": self.start.isoformat(),
+            "end_date": (self.start + timedelta(days=90)).isoformat(),
+            "weekdays": [1, 3],
+            "start_time": "09:00:00",
+            "end_time": "12:00:00",
+            "capacity": 8,
+            "price": "25.00",
+        }
+
+    def _slot(self, days, start_time="09:00:00", end_time="12:00:00"):
+        return {
+            "date": (self.start + timedelta(days=days)).isoformat(), "start_time": start_time,
+            "end_time": end_time, "capacity": 5, "price": "30.00",
+        }
+
+    def test_recurrence_creates_every_occurrence_in_few_queries(self):
+        """A Tue/Thu rule over three months is created in one request and a handful of queries."""
+        print("Testing bulk slot creation from a recurrence rule")
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from Experiences.models import ExperienceSlot
+        expected = sum(
+            1 for day in range(91) if (self.start + timedelta(days=day)).weekday() in (1, 3)
+        )
+        self.client.force_authenticate(user=self.guide)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {"recurrence": self.recurrence}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], expected)
+        self.assertLessEqual(len(queries), 8)
+        slots = ExperienceSlot.objects.filter(experience=self.experience)
+        self.assertEqual(slots.count(), expected)
+        self.assertTrue(all(slot.date.weekday() in (1, 3) and slot.remaining_slots == 8 for slot in slots))
+
+    def test_conflicts_reject_the_request_unless_skipped(self):
+        """Clashes with existing slots fail the whole request, or are skipped on request."""
+        print("Testing bulk slot creation conflict handling")
+        from Experiences.models import ExperienceSlot
+        self.client.force_authenticate(user=self.guide)
+        self.client.post(self.url, {"slots": [self._slot(0)]}, format="json")
+
+        payload = {"slots": [self._slot(0), self._slot(0, "14:00:00", "17:00:00"), self._slot(1)]}
+        response = self.client.post(self.url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data["conflicts"]), 1)
+        self.assertEqual(ExperienceSlot.objects.count(), 1)
+
+        response = self.client.post(self.url, {**payload, "skip_existing": True}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data["created"], response.data["skipped"]), (2, 1))
+        self.assertEqual(ExperienceSlot.objects.count(), 3)
+
+    def test_invalid_requests_are_rejected(self):
+        """Past dates, duplicates and missing rules are validation errors."""
+        print("Testing bulk slot creation validation")
+        self.client.force_authenticate(user=self.guide)
+
+        past = {**self._slot(0), "date": (date.today() - timedelta(days=1)).isoformat()}
+        for payload in ({}, {"slots": [past]}, {"slots": [self._slot(0), self._slot(0)]},
+                        {"slots": [self._slot(0)], "recurrence": self.recurrence}):
+            response = self.client.post(self.url, payload, format="json")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, payload)
+
+    def test_other_guide_cannot_bulk_create(self):
+        """Only the owning guide (or an admin) can add slots."""
+        print("Testing other guide cannot bulk create slots")
+        self.client.force_authenticate(user=self.other_guide)
+        response = self.client.post(self.url, {"recurrence": self.recurrence}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_calendar_events_are_queued_together(self):
+        """Guides with a calendar get one queued event per new slot."""
+        print("Testing bulk slot creation queues calendar events")
+        from Users.models import GoogleOAuthToken
+        from Utils.models import CalendarSync
+        GoogleOAuthToken.objects.create(user=self.guide, access_token="fake_access", refresh_token="fake_refresh")
+        self.client.force_authenticate(user=self.guide)
+
+        response = self.client.post(self.url, {"slots": [self._slot(0), self._slot(1)]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(CalendarSync.objects.filter(user=self.guide, slot__isnull=False).count(), 2)
+
+
+class ExperienceAvailabilityTests(TestCase):
+    def setUp(self):
+        from Experiences.models import Experience, ExperienceSlot
+        self.client = APIClient()
+        self.guide = make_user("guide1", "guide@example.com", role="Guide")
+        self.experience = Experience.objects.create(title="Kigali City Walk", guide=self.guide)
+        self.other = Experience.objects.create(title="Nyungwe Canopy Walk", guide=self.guide)
+        self.day = date.today() + timedelta(days=3)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.morning = ExperienceSlot.objects.create(
+                experience=self.experience, date=self.day, start_time="09:00:00", end_time="12:00:00",
+                capacity=10, remaining_slots=4, price="40.00",
+            )
+            ExperienceSlot.objects.create(
+                experience=self.experience, date=self.day, start_time="14:00:00", end_time="17:00:00",
+                capacity=10, remaining_slots=6, price="30.00",
+            )
+            ExperienceSlot.objects.create(
+                experience=self.experience, date=self.day + timedelta(days=1), start_time="09:00:00",
+                end_time="12:00:00", capacity=10, remaining_slots=0, price="20.00",
+            )
+        self.url = f"/experiences/availability/?experience={self.experience.pk},{self.other.pk}"
+
+    def test_per_day_summary(self):
+        """Each day reports slot count, open slots, seats left and the cheapest open price."""
+        print("Testing availability calendar summary")
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["end"] - response.data["start"], timedelta(days=89))
+        days = response.data["experiences"][str(self.experience.pk)]
+        self.assertEqual(days[self.day.isoformat()],
+                         {"slots": 2, "available": 2, "remaining": 10, "min_price": "30.00"})
+        self.assertEqual(days[(self.day + timedelta(days=1)).isoformat()],
+                         {"slots": 1, "available": 0, "remaining": 0, "min_price": None})
+        self.assertEqual(response.data["experiences"][str(self.other.pk)], {})
+
+    def test_repeated_requests_are_served_from_cache(self):
+        """A second request for the same range costs only the read of the shared version tokens."""
+        print("Testing availability calendar is cached")
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        self.assertFalse(any("experienceslot" in query["sql"].lower() for query in queries))
+
+    def test_slot_changes_invalidate_the_cache(self):
+        """Saving a slot or bulk-creating slots refreshes the summary."""
+        print("Testing availability calendar invalidation")
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.morning.remaining_slots = 1
+            self.morning.save(update_fields=["remaining_slots"])
+        days = self.client.get(self.url).data["experiences"][str(self.experience.pk)]
+        self.assertEqual(days[self.day.isoformat()]["remaining"], 7)
+
+        self.client.force_authenticate(user=self.guide)
+        new_day = self.day + timedelta(days=5)
+        slot = {"date": new_day.isoformat(), "start_time": "09:00:00", "end_time": "12:00:00",
+                "capacity": 5, "price": "30.00"}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/experiences/{self.experience.pk}/slots/bulk/", {"slots": [slot]}, format="json")
+        days = self.client.get(self.url).data["experiences"][str(self.experience.pk)]
+        self.assertEqual(days[new_day.isoformat()]["remaining"], 5)
+
+    def test_invalid_parameters_are_rejected(self):
+        """Missing or malformed ids and bad ranges return 400."""
+        print("Testing availability calendar parameter validation")
+        base = "/experiences/availability/"
+        start = date.today()
+        for query in ("", "?experience=not-a-uuid",
+                      f"?experience={self.experience.pk}&start=tomorrow",
+                      f"?experience={self.experience.pk}&start={start}&end={start - timedelta(days=1)}",
+                      f"?experience={self.experience.pk}&start={start}&end={start + timedelta(days=400)}"):
+            response = self.client.get(base + query)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+
+class ExperienceSearchTests(TestCase):
+    def setUp(self):
+        from Choices.models import Language, PaymentMethod
+        from Experiences.models import Experience, ExperienceSlot
+        self.client = APIClient()
+        self.url = "/experiences/search/"
+        guide = make_user("guide1", "guide@example.com", role="Guide")
+        self.english = Language.objects.create(name="English", code="en")
+        self.french = Language.objects.create(name="French", code="fr")
+        self.momo = PaymentMethod.objects.create(name="Mobile Money")
+
+        self.gorillas = Experience.objects.create(
+            title="Gorilla trekking in Volcanoes", description="Hike to meet a gorilla family.", guide=guide
+        )
+        self.canopy = Experience.objects.create(
+            title="Nyungwe canopy walk", description="Chimpanzees and maybe a gorilla sighting on the way.",
+            guide=guide,
+        )
+        self.city = Experience.objects.create(title="Kigali city walk", description="Markets and museums.", guide=guide)
+        self.gorillas.languages.set([self.english, self.french])
+        self.canopy.languages.set([self.english])
+        self.gorillas.payment_methods.set([self.momo])
+
+        soon = date.today() + timedelta(days=5)
+        for experience, price, remaining in ((self.gorillas, "1500.00", 4), (self.canopy, "100.00", 6),
+                                             (self.city, "20.00", 0)):
+            ExperienceSlot.objects.create(experience=experience, date=soon, capacity=8,
+                                          remaining_slots=remaining, price=price)
+
+    def _ids(self, response):
+        return [row["id"] for row in response.data["results"]]
+
+    def test_text_search_ranks_title_matches_first(self):
+        """Matches in the title outrank matches in the description."""
+        print("Testing experience full-text search ranking")
+        response = self.client.get(self.url, {"q": "gorillas"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._ids(response), [str(self.gorillas.id), str(self.canopy.id)])
+
+    def test_filters_combine(self):
+        """Language, payment method and slot price/date filters narrow the results."""
+        print("Testing experience search filters")
+        self.assertEqual(
+            self._ids(self.client.get(self.url, {"language": str(self.french.id)})), [str(self.gorillas.id)]
+        )
+        self.assertEqual(
+            self._ids(self.client.get(self.url, {"payment_method": str(self.momo.id)})), [str(self.gorillas.id)]
+        )
+        # The city walk is sold out, so it has no open slot within any price range
+        self.assertEqual(
+            self._ids(self.client.get(self.url, {"max_price": "500"})), [str(self.canopy.id)]
+        )
+        later = (date.today() + timedelta(days=10)).isoformat()
+        self.assertEqual(self._ids(self.client.get(self.url, {"date_from": later})), [])
+
+    def test_facets_count_matched_experiences(self):
+        """Facets describe the experiences matching the current filters."""
+        print("Testing experience search facets")
+        facets = self.client.get(self.url, {"q": "gorilla"}).data["facets"]
+
+        self.assertEqual({row["name"]: row["count"] for row in facets["languages"]}, {"English": 2, "French": 1})
+        self.assertEqual([row["count"] for row in facets["payment_methods"]], [1])
+        self.assertEqual(facets["price"], {"min": "100.00", "max": "1500.00"})
+
+    def test_invalid_filters_are_rejected(self):
+        """Malformed ids, prices or dates return 400."""
+        print("Testing experience search validation")
+        for params in ({"language": "english"}, {"min_price": "cheap"}, {"date_from": "soon"}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class ExperienceNearbyTests(TestCase):
+    def setUp(self):
+        from Experiences.models import Experience
+        from Location.models import Location
+        self.client = APIClient()
+        self.url = "/experiences/nearby/"
+        guide = make_user("guide1", "guide@example.com", role="Guide")
+
+        def experience_at(title, lat, lng):
+            location = Location.objects.create(place_name=title, latitude=lat, longitude=lng)
+            return Experience.objects.create(title=title, guide=guide, location=location)
+
+        self.nyamirambo = experience_at("Nyamirambo walk", "-1.9800", "30.0400")
+        self.downtown = experience_at("Downtown Kigali", "-1.9441", "30.0619")
+        self.musanze = experience_at("Musanze caves", "-1.4998", "29.6349")
+        Experience.objects.create(title="No location", guide=guide)
+
+    def _titles(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.data)
+        return [row["title"] for row in response.data["results"]], response
+
+    def test_radius_search_sorts_by_distance(self):
+        """Only experiences within the radius are returned, nearest first."""
+        print("Testing nearby experiences radius search")
+        titles, response = self._titles({"lat": "-1.9441", "lng": "30.0619", "radius_km": "10"})
+
+        self.assertEqual(titles, ["Downtown Kigali", "Nyamirambo walk"])
+        self.assertEqual(response.data["results"][0]["distance_km"], 0)
+        self.assertAlmostEqual(response.data["results"][1]["distance_km"], 4.7, delta=0.3)
+
+        titles, _ = self._titles({"lat": "-1.9441", "lng": "30.0619", "radius_km": "100"})
+        self.assertEqual(titles, ["Downtown Kigali", "Nyamirambo walk", "Musanze caves"])
+
+    def test_bounding_box_search(self):
+        """A map viewport returns the experiences inside it, nearest to its centre first."""
+        print("Testing nearby experiences bounding box search")
+        titles, _ = self._titles({"bbox": "29.5,-2.0,29.8,-1.4"})
+
+        self.assertEqual(titles, ["Musanze caves"])
+
+    def test_invalid_parameters_are_rejected(self):
+        """Missing centres, oversized radii and malformed boxes return 400."""
+        print("Testing nearby experiences parameter validation")
+        for params in ({}, {"lat": "-1.9"}, {"lat": "-1.9", "lng": "30", "radius_km": "5000"},
+                       {"bbox": "30,-2,29,-1"}, {"bbox": "a,b,c,d"}, {"bbox": "0,0,40,40"}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+def fake_azure_translate(url, params=None, headers=None, json=None, timeout=None):
+    response = MagicMock()
+    response.json.return_value = [
+        {"translations": [{"text": f"[{lang}] {item['text']}", "to": lang} for lang in params["to"]]}
+        for item in json
+    ]
+    return response
+
+
+class ExperienceTranslationTests(TestCase):
+    def setUp(self):
+        from Experiences.models import Experience
+        self.client = APIClient()
+        self.guide = make_user("guide1", "guide@example.com", role="Guide")
+        self.experiences = [
+            Experience.objects.create(title=f"Walk {i}", description=f"Route {i}", guide=self.guide) for i in range(3)
+        ]
+
+    def _translate(self, experience_ids=None):
+        from Experiences.tasks import translate_experiences
+        with patch("Utils.translate._session.post", side_effect=fake_azure_translate) as post:
+            summary = translate_experiences(experience_ids)
+        return summary, post
+
+    def test_saving_text_queues_translation(self):
+        """Creating or editing title/description queues the background job after commit."""
+        print("Testing experience save queues translation")
+        experience = self.experiences[0]
+        with patch("Experiences.signals.async_task") as queue:
+            with self.captureOnCommitCallbacks(execute=True):
+                experience.title = "Renamed walk"
+                experience.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                experience.save(update_fields=["is_active"])
+
+        queue.assert_called_once_with("Experiences.tasks.translate_experiences", [experience.id])
+
+    def test_saving_without_text_changes_queues_nothing(self):
+        """Soft deletes and photo edits don't pay for a translation."""
+        print("Testing unchanged experience text is not retranslated")
+        from Experiences.models import Experience
+        experience = self.experiences[0]
+        self.client.force_authenticate(user=self.guide)
+
+        with patch("Experiences.signals.async_task") as queue:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.patch(
+                    f"/experiences/{experience.id}/", {"photos": ["https://example.com/a.jpg"]}, format="json"
+                )
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.delete(f"/experiences/{self.experiences[1].id}/")
+            with self.captureOnCommitCallbacks(execute=True):
+                loaded = Experience.objects.get(id=experience.id)
+                loaded.description = "Route 0"
+                loaded.save()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(Experience.objects.get(id=self.experiences[1].id).is_active)
+        queue.assert_not_called()
+
+    def test_sweep_translates_only_stale_experiences(self):
+        """The sweep translates missing and edited experiences in batched requests."""
+        print("Testing experience translation sweep")
+        from Experiences.models import ExperienceTranslation
+        summary, post = self._translate()
+
+        self.assertEqual(summary["experiences"], 3)
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(ExperienceTranslation.objects.count(), 9)
+
+        edited = self.experiences[1]
+        edited.description = "A new route"
+        edited.save()
+        summary, post = self._translate()
+
+        self.assertEqual(summary["experiences"], 1)
+        self.assertEqual(post.call_count, 1)
+        self.assertEqual(
+            ExperienceTranslation.objects.get(experience=edited, language="fr").description, "[fr] A new route"
+        )
+
+    def test_missing_language_is_skipped(self):
+        """A language the translator leaves out is skipped for that row instead of failing the batch."""
+        print("Testing experience translation with a missing language")
+        from Experiences.models import ExperienceTranslation
+        from Experiences.tasks import translate_experiences
+
+        def without_rw(url, params=None, headers=None, json=None, timeout=None):
+            response = fake_azure_translate(url, params=params, headers=headers, json=json, timeout=timeout)
+            for result in response.json.return_value:
+                result["translations"] = [t for t in result["translations"] if t["to"] != "rw"]
+            return response
+
+        with patch("Utils.translate._session.post", side_effect=without_rw):
+            summary = translate_experiences()
+
+        self.assertEqual(summary["translations"], 6)
+        self.assertEqual(summary["missing"], 3)
+        self.assertFalse(ExperienceTranslation.objects.filter(language="rw").exists())
+        self.assertEqual(self._translate()[0]["experiences"], 3)
+
+    def test_pretranslate_command_stores_translations(self):
+        """The management command fills ExperienceTranslation, not just the translation cache."""
+        print("Testing pretranslate_experiences command")
+        from io import StringIO
+        from django.core.management import call_command
+        from Experiences.models import ExperienceTranslation
+
+        out = StringIO()
+        with patch("Utils.translate._session.post", side_effect=fake_azure_translate):
+            call_command("pretranslate_experiences", "--languages", "fr", stdout=out)
+
+        self.assertEqual(ExperienceTranslation.objects.filter(language="fr").count(), 3)
+        self.assertFalse(ExperienceTranslation.objects.exclude(language="fr").exists())
+        self.assertIn("Translated 3 experiences into fr", out.getvalue())
+
+    def test_list_and_detail_serve_stored_translations(self):
+        """?lang= and Accept-Language pick the stored text without calling the translator."""
+        print("Testing experience list and detail in another language")
+        self._translate()
+        self.client.force_authenticate(user=make_user("tourist1", "tourist@example.com"))
+
+        with patch("Utils.translate._session.post") as post:
+            listing = self.client.get("/experiences/", {"lang": "fr"})
+            detail = self.client.get(f"/experiences/{self.experiences[0].id}/", HTTP_ACCEPT_LANGUAGE="rw-RW,en;q=0.5")
+            original = self.client.get("/experiences/")
+        post.assert_not_called()
+
+        self.assertEqual({row["title"] for row in listing.data["results"]}, {"[fr] Walk 0", "[fr] Walk 1", "[fr] Walk 2"})
+        self.assertEqual(detail.data["description"], "[rw] Route 0")
+        self.assertEqual(original.data["results"][0]["title"][:5], "Walk ")
+        self.assertIn("Accept-Language", listing["Vary"])
+
+    def test_owner_sees_original_text_unless_asking(self):
+        """The owning guide's Accept-Language doesn't replace their text; ?lang= still does."""
+        print("Testing owner sees untranslated experience")
+        self._translate()
+        self.client.force_authenticate(user=self.guide)
+        url = f"/experiences/{self.experiences[0].id}/"
+
+        detail = self.client.get(url, HTTP_ACCEPT_LANGUAGE="fr")
+        asked = self.client.get(url, {"lang": "fr"}, HTTP_ACCEPT_LANGUAGE="fr")
+
+        self.assertEqual(detail.data["title"], "Walk 0")
+        self.assertEqual(asked.data["title"], "[fr] Walk 0")
+
+    def test_update_returns_the_saved_text(self):
+        """An edit made with a language requested responds with the new text, not the old translation."""
+        print("Testing experience update ignores stored translations")
+        self._translate()
+        admin = make_user("admin1", "admin@example.com", role="Admin")
+        self.client.force_authenticate(user=admin)
+
+        with patch("Experiences.signals.async_task"):
+            response = self.client.patch(
+                f"/experiences/{self.experiences[0].id}/?lang=fr", {"title": "Sunset walk"}, format="json",
+                HTTP_ACCEPT_LANGUAGE="fr",
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "Sunset walk")
+        self.assertEqual(response.data["description"], "Route 0")
+
+    def test_language_switch_costs_one_query(self):
+        """Asking for a language adds a single prefetch query, however many rows are listed."""
+        print("Testing translated listing query count")
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        self._translate()
+
+        with CaptureQueriesContext(connection) as plain:
+            self.client.get("/experiences/")
+        with CaptureQueriesContext(connection) as translated:
+            self.client.get("/experiences/", {"lang": "fr"})
+
+        self.assertEqual(len(translated), len(plain) + 1)
@@ -14,6 +14,10 @@ urlpatterns = [
     path( '<uuid:exp_id>/slots/', ExperienceSlotViewSet.as_view({ 'get': 'list',
         'post': 'create', }), name='experience-slot-list'
     ),
+    # Bulk creation: /experiences/<exp_id>/slots/bulk/
+    path( '<uuid:exp_id>/slots/bulk/', ExperienceSlotViewSet.as_view({ 'post': 'bulk_create', }),
+        name='experience-slot-bulk'
+    ),
     path( '<uuid:exp_id>/slots/<uuid:pk>/', ExperienceSlotViewSet.as_view({
             'get': 'retrieve', 'put': 'update', 'patch': 'partial_update',
             'delete': 'destroy', }), name='experience-slot-detail'
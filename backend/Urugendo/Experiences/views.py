@@ -3,24 +3,47 @@ from rest_framework import serializers, viewsets, status
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
+from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import OrderingFilter   
 from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.utils.cache import patch_vary_headers
+from django.utils.translation.trans_real import parse_accept_lang_header
 from django.contrib.auth import get_user_model
-from .filters import ExperienceFilter
-from .models import Experience, ExperienceSlot
-from .serializers import ExperienceSerializer, ExperienceListSerializer, ExperienceSlotSerializer
+from .availability import get_availability, invalidate_availability
+from .filters import ExperienceFilter, ExperienceSearchFilter
+from .models import Experience, ExperienceSlot, ExperienceTranslation
+from .search import experience_facets
+from .serializers import (
+    ExperienceSerializer, ExperienceListSerializer, ExperienceSlotSerializer, ExperienceSlotBulkSerializer,
+    ExperienceNearbySerializer, NearbyQuerySerializer,
+)
+from Location.geo import bounding_box, distance_km
+from Utils.translate import SUPPORTED_LANGUAGES
 from Urugendo.permissions import IsGuideOwnerOrAdmin, IsAdmin, IsGuide
-from Utils.calendar import add_event
-from datetime import datetime
+from Utils.calendar import (
+    calendar_event, has_calendar_event, queue_calendar_event, queue_calendar_events, queue_calendar_update,
+    queue_calendar_delete,
+)
+import uuid
+from datetime import date, datetime, timedelta
 from django.utils import timezone
 User = get_user_model()
 
 
+def _slot_event_times(slot):
+    """The slot's start and end as ISO strings in the current timezone."""
+    start_dt = timezone.make_aware(datetime.combine(slot.date, slot.start_time))
+    end_dt = timezone.make_aware(datetime.combine(slot.date, slot.end_time))
+    return start_dt.isoformat(), end_dt.isoformat()
+
+
 class ExperienceViewSet(ModelViewSet):
     queryset = Experience.objects.select_related( "guide", "location"
     ).prefetch_related( "expertise", "languages", "payment_methods"
-    ).filter(is_active=True).distinct()
+    ).filter(is_active=True).defer("search_vector").distinct()
 
     permission_classes = [IsAuthenticated]
 
@@ -29,13 +52,62 @@ class ExperienceViewSet(ModelViewSet):
 
     ordering_fields = [ 'created_at', 'updated_at', 'title' ]
 
+    # Limits for the availability calendar
+    AVAILABILITY_DEFAULT_DAYS = 90
+    AVAILABILITY_MAX_DAYS = 366
+    AVAILABILITY_MAX_EXPERIENCES = 50
+
+    # Actions whose responses are served in the requested language
+    TRANSLATED_ACTIONS = ('list', 'retrieve', 'search', 'nearby')
+
     def get_serializer_class(self):
         if self.action == 'list':
             return ExperienceListSerializer
         return ExperienceSerializer
 
+    def get_language(self):
+        """
+        Language requested with ?lang= or, failing that, Accept-Language.
+        None when neither names a supported language, or for actions outside
+        TRANSLATED_ACTIONS (the original text is served).
+        """
+        if self.action not in self.TRANSLATED_ACTIONS:
+            return None
+        if not hasattr(self, '_language'):
+            requested = self.request.query_params.get('lang')
+            candidates = [requested] if requested else [
+                code for code, _ in parse_accept_lang_header(self.request.headers.get('Accept-Language', ''))
+            ]
+            self._language = next(
+                (code.split('-')[0].lower() for code in candidates if code.split('-')[0].lower() in SUPPORTED_LANGUAGES),
+                None,
+            )
+        return self._language
+
+    def with_translation(self, queryset):
+        """
+        Prefetch the stored translation in the requested language: one query per page, no translator calls.
+        A guide sees their own experiences in the original text unless they ask for a language with ?lang=.
+        """
+        language = self.get_language()
+        if language is None:
+            return queryset
+        translations = ExperienceTranslation.objects.filter(language=language)
+        user = self.request.user
+        if not self.request.query_params.get('lang') and user.is_authenticated:
+            translations = translations.exclude(experience__guide_id=user.id)
+        return queryset.prefetch_related(Prefetch('translations', queryset=translations, to_attr='selected_translations'))
+
+    def get_queryset(self):
+        return self.with_translation(super().get_queryset())
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        patch_vary_headers(response, ['Accept-Language'])
+        return response
+
     def get_permissions(self):
-        if self.action == 'list':
+        if self.action in ['list', 'availability', 'search', 'nearby']:
             return [AllowAny()]
         if self.action in ['update', 'partial_update', 'destroy']:
             return [IsAuthenticated(), IsGuideOwnerOrAdmin()]
@@ -62,6 +134,111 @@ class ExperienceViewSet(ModelViewSet):
         instance.is_active = False
         instance.save()
 
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        """
+        GET /experiences/search/?q=&language=&payment_method=&expertise=&location=
+                                 &min_price=&max_price=&date_from=&date_to=
+        Paginated, ranked full-text search over titles and descriptions with
+        facet counts (languages, payment methods, expertise, price range) for
+        the matched experiences.
+        """
+        base = (
+            Experience.objects.filter(is_active=True)
+            .select_related('guide', 'location')
+            .defer('search_vector')
+            .order_by('-created_at')
+        )
+        filterset = ExperienceSearchFilter(request.query_params, queryset=self.with_translation(base), request=request)
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        queryset = filterset.qs
+
+        page = self.paginate_queryset(queryset)
+        response = self.get_paginated_response(ExperienceListSerializer(page, many=True).data)
+        response.data['facets'] = experience_facets(queryset)
+        return response
+
+    @action(detail=False, methods=['get'], url_path='nearby')
+    def nearby(self, request):
+        """
+        GET /experiences/nearby/?lat=&lng=&radius_km=      (radius search, default 10 km)
+        GET /experiences/nearby/?bbox=min_lng,min_lat,max_lng,max_lat   (map viewport)
+        Experiences sorted by distance from the centre (or the box's centre), paginated.
+        """
+        params = NearbyQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+
+        if 'bbox' in data:
+            min_lat, min_lng, max_lat, max_lng = data['bbox']
+            lat, lng = (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+            radius_km = None
+        else:
+            lat, lng, radius_km = data['lat'], data['lng'], data['radius_km']
+            min_lat, min_lng, max_lat, max_lng = bounding_box(lat, lng, radius_km)
+
+        # The coordinate range is answered by location_lat_lng_idx; distances
+        # are only computed for the rows inside it.
+        queryset = (
+            Experience.objects.filter(
+                is_active=True,
+                location__latitude__range=(min_lat, max_lat),
+                location__longitude__range=(min_lng, max_lng),
+            )
+            .select_related('guide', 'location')
+            .defer('search_vector')
+            .annotate(distance_km=distance_km(lat, lng, 'location__latitude', 'location__longitude'))
+        )
+        if radius_km is not None:
+            queryset = queryset.filter(distance_km__lte=radius_km)
+        queryset = self.with_translation(queryset.order_by('distance_km', 'id'))
+
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(ExperienceNearbySerializer(page, many=True).data)
+
+    @action(detail=False, methods=['get'], url_path='availability')
+    def availability(self, request):
+        """
+        GET /experiences/availability/?experience=<id>[,<id>...]&start=YYYY-MM-DD&end=YYYY-MM-DD
+        Per-day slot count, seats left and lowest open price for each experience.
+        The range defaults to 90 days from today.
+        """
+        raw_ids = [
+            value.strip()
+            for param in request.query_params.getlist('experience')
+            for value in param.split(',') if value.strip()
+        ]
+        if not raw_ids:
+            return Response({"experience": "At least one experience id is required."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(raw_ids) > self.AVAILABILITY_MAX_EXPERIENCES:
+            return Response({"experience": f"At most {self.AVAILABILITY_MAX_EXPERIENCES} experiences per request."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            experience_ids = [uuid.UUID(value) for value in raw_ids]
+        except ValueError:
+            return Response({"experience": "Experience ids must be UUIDs."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            start = date.fromisoformat(request.query_params['start']) if 'start' in request.query_params \
+                else timezone.localdate()
+            end = date.fromisoformat(request.query_params['end']) if 'end' in request.query_params \
+                else start + timedelta(days=self.AVAILABILITY_DEFAULT_DAYS - 1)
+        except ValueError:
+            return Response({"detail": "Dates must be in YYYY-MM-DD format."}, status=status.HTTP_400_BAD_REQUEST)
+        if end < start:
+            return Response({"end": "Must not be before start."}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days >= self.AVAILABILITY_MAX_DAYS:
+            return Response({"end": f"The range can span at most {self.AVAILABILITY_MAX_DAYS} days."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({
+            "start": start,
+            "end": end,
+            "experiences": get_availability(experience_ids, start, end),
+        })
+
 class ExperienceSlotViewSet(ModelViewSet):
     """
     Nested ViewSet for managing slots under a specific experience.
@@ -95,7 +272,7 @@ class ExperienceSlotViewSet(ModelViewSet):
         return queryset
 
     def get_permissions(self):
-        if self.action in ['create', 'update', 'partial_update', 'destroy']:
+        if self.action in ['create', 'bulk_create', 'update', 'partial_update', 'destroy']:
             return [IsAuthenticated(), (IsAdmin | IsGuide)()]
         return [IsAuthenticated()]
 
@@ -123,28 +300,99 @@ class ExperienceSlotViewSet(ModelViewSet):
         serializer.is_valid(raise_exception=True)
         serializer.save(experience=experience)
         slot = serializer.instance
-        # Add event to Google Calendar for the guide, if authorized
+        # Queue an event on the guide's Google Calendar, if authorized
         if hasattr(experience.guide, 'google_token'):
             try:
-                start_dt = datetime.combine(slot.date, slot.start_time)
-                end_dt = datetime.combine(slot.date, slot.end_time)
-
-                # Make timezone aware
-                start_dt = timezone.make_aware(start_dt)
-                end_dt = timezone.make_aware(end_dt)
-
-                add_event(
+                start_datetime, end_datetime = _slot_event_times(slot)
+                queue_calendar_event(
                     user=experience.guide,
                     title=f"{experience.title} Slot",
                     description=f"Experience: {experience.title}\nSlot ID: {slot.id}",
-                    start_datetime=start_dt.isoformat(),
-                    end_datetime=end_dt.isoformat(),
+                    start_datetime=start_datetime,
+                    end_datetime=end_datetime,
                     location=experience.location.place_name if experience.location else "",
+                    slot=slot,
                 )
             except Exception as e:
-                print(f"Failed to add calendar event for guide: {e}")
+                print(f"Failed to queue calendar event for guide: {e}")
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    def bulk_create(self, request, *args, **kwargs):
+        """
+        POST /experiences/<exp_id>/slots/bulk/
+        Create many slots in one transaction from a weekly `recurrence` rule or
+        an explicit `slots` list. Slots clashing with an existing slot (same
+        date and start time) are rejected, or skipped with skip_existing=true.
+        """
+        experience = self._get_experience()
+
+        if not self._is_authorized_for_experience(request, experience):
+            return Response(
+                {"detail": "You can only create slots for your own experiences."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = ExperienceSlotBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        requested = serializer.validated_data['slots']
+
+        # One query covers the unique_experience_slot_start constraint for the whole request
+        existing = set(
+            ExperienceSlot.objects.filter(experience=experience, date__in={slot['date'] for slot in requested})
+            .values_list('date', 'start_time')
+        )
+        conflicts = [slot for slot in requested if (slot['date'], slot['start_time']) in existing]
+        if conflicts and not serializer.validated_data['skip_existing']:
+            return Response(
+                {
+                    "detail": "Some slots clash with existing slots.",
+                    "conflicts": [{"date": slot['date'], "start_time": slot['start_time']} for slot in conflicts],
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        slots = [
+            ExperienceSlot(experience=experience, remaining_slots=slot['capacity'], **slot)
+            for slot in requested if (slot['date'], slot['start_time']) not in existing
+        ]
+        try:
+            with transaction.atomic():
+                ExperienceSlot.objects.bulk_create(slots, batch_size=500)
+            # bulk_create sends no post_save signals
+            invalidate_availability([experience.id])
+        except IntegrityError:
+            return Response(
+                {"detail": "Slots were added concurrently for the same times. Please retry."},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        # Queue the guide's calendar events with one insert
+        if slots and hasattr(experience.guide, 'google_token'):
+            try:
+                location = experience.location.place_name if experience.location else ""
+                queue_calendar_events(
+                    calendar_event(
+                        experience.guide,
+                        f"{experience.title} Slot",
+                        f"Experience: {experience.title}\nSlot ID: {slot.id}",
+                        *_slot_event_times(slot),
+                        location=location,
+                        slot=slot,
+                    )
+                    for slot in slots
+                )
+            except Exception as e:
+                print(f"Failed to queue calendar events for guide: {e}")
+
+        return Response(
+            {
+                "created": len(slots),
+                "skipped": len(conflicts),
+                "slots": ExperienceSlotSerializer(slots, many=True).data,
+            },
+            status=status.HTTP_201_CREATED
+        )
+
     def update(self, request, *args, **kwargs):
         experience = self._get_experience()
 
@@ -159,6 +407,17 @@ class ExperienceSlotViewSet(ModelViewSet):
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        # Move the guide's calendar event along with the slot
+        if {'date', 'start_time', 'end_time'} & set(serializer.validated_data):
+            try:
+                if has_calendar_event(instance):
+                    start_datetime, end_datetime = _slot_event_times(instance)
+                    queue_calendar_update(
+                        user=experience.guide, slot=instance,
+                        start_datetime=start_datetime, end_datetime=end_datetime,
+                    )
+            except Exception as e:
+                print(f"Failed to queue calendar event update for guide: {e}")
         return Response(serializer.data)
 
     def partial_update(self, request, *args, **kwargs):
@@ -177,6 +436,11 @@ class ExperienceSlotViewSet(ModelViewSet):
         instance = self.get_object()
         instance.is_active = False
         instance.save()
+        try:
+            if has_calendar_event(instance):
+                queue_calendar_delete(user=experience.guide, slot=instance)
+        except Exception as e:
+            print(f"Failed to queue calendar event removal for guide: {e}")
         return Response(
             {"detail": "Slot deleted successfully."},
             status=status.HTTP_204_NO_CONTENT
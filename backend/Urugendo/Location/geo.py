@@ -0,0 +1,48 @@
+"""
+Distance helpers for radius and map (bounding box) searches.
+
+Queries first narrow rows with a latitude/longitude range, which the
+location_lat_lng_idx index answers, and only then compute great-circle
+distances for the remaining rows.
+
+Usage:
+    from Location.geo import bounding_box, distance_km
+    min_lat, min_lng, max_lat, max_lng = bounding_box(lat, lng, radius_km)
+    qs = qs.filter(latitude__range=(min_lat, max_lat), longitude__range=(min_lng, max_lng))
+    qs = qs.annotate(distance=distance_km(lat, lng))
+"""
+import math
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cast, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def bounding_box(lat, lng, radius_km):
+    """
+    (min_lat, min_lng, max_lat, max_lng) of a box containing every point
+    within `radius_km` of (lat, lng). Longitude is not wrapped at ±180.
+    """
+    lat_delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(lat))
+    lng_delta = 180.0 if cos_lat < 1e-6 else min(180.0, lat_delta / cos_lat)
+    return (
+        max(-90.0, lat - lat_delta),
+        max(-180.0, lng - lng_delta),
+        min(90.0, lat + lat_delta),
+        min(180.0, lng + lng_delta),
+    )
+
+
+def distance_km(lat, lng, lat_field='latitude', lng_field='longitude'):
+    """Haversine distance in km from (lat, lng) to the row's coordinates, as a query expression."""
+    row_lat = Radians(Cast(F(lat_field), FloatField()))
+    row_lng = Radians(Cast(F(lng_field), FloatField()))
+    origin_lat = math.radians(lat)
+    origin_lng = math.radians(lng)
+
+    a = (
+        Power(Sin((row_lat - Value(origin_lat)) / 2), 2)
+        + Value(math.cos(origin_lat)) * Cos(row_lat) * Power(Sin((row_lng - Value(origin_lng)) / 2), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(a))
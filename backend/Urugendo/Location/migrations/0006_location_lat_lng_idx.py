@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-18 16:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Location', '0005_alter_location_latitude_alter_location_longitude'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='location',
+            index=models.Index(fields=['latitude', 'longitude'], name='location_lat_lng_idx'),
+        ),
+    ]
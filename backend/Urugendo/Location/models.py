@@ -8,6 +8,12 @@ class Location(models.Model):
     place_name = models.CharField(max_length=255)
     place_id = models.CharField(max_length=255, blank=True)
 
+    class Meta:
+        indexes = [
+            # Range scans for nearby and map searches (see Location.geo)
+            models.Index(fields=["latitude", "longitude"], name="location_lat_lng_idx"),
+        ]
+
     def google_maps_url(self):
         return f"https://www.google.com/maps?q={self.latitude},{self.longitude}"
 
@@ -4,6 +4,7 @@ from unittest.mock import patch
 from rest_framework.test import APIClient
 from rest_framework import status
 from decimal import Decimal
+from Utils.geocoding import GeocodingRateLimited
 
 User = get_user_model()
 
@@ -66,6 +67,18 @@ class GeocodeViewTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_502_BAD_GATEWAY)
         self.assertIn("error", response.data)
 
+    @patch("Location.views.geocode_place")
+    def test_geocode_rate_limited(self, mock_geocode):
+        """A lookup refused by the geocoding rate limiter returns 429."""
+        print("Testing geocode rate limited case...")
+        mock_geocode.side_effect = GeocodingRateLimited("Too many geocoding requests.")
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.post(self.url, {"place_name": "Kigali"}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response["Retry-After"], "1")
+
     def test_geocode_missing_place_name(self):
         """Missing place_name field returns 400."""
         print("Testing geocode missing place_name case...")
@@ -3,7 +3,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
-from Utils.geocoding import geocode_place, reverse_geocode
+from Utils.geocoding import GeocodingRateLimited, geocode_place, reverse_geocode
 from .models import Location
 from .serializers import GeocodeRequestSerializer, LocationSaveSerializer, LocationSerializer
 
@@ -25,6 +25,8 @@ class GeocodeView(APIView):
             return Response(result)
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except GeocodingRateLimited as e:
+            return Response({"error": str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS, headers={"Retry-After": "1"})
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_502_BAD_GATEWAY)
 
@@ -79,5 +81,7 @@ class ReverseGeocodeView(APIView):
             return Response({**result, "latitude": lat, "longitude": lng})
         except ValueError as e:
             return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except GeocodingRateLimited as e:
+            return Response({"error": str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS, headers={"Retry-After": "1"})
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_502_BAD_GATEWAY)
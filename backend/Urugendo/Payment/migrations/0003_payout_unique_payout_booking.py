@@ -0,0 +1,21 @@
+# Generated by Django 6.0.2 on 2026-10-18 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Booking', '0004_booking_booking_boo_status_86e50e_idx'),
+        ('Choices', '0004_alter_language_options_alter_mobileprovider_options_and_more'),
+        ('Payment', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='payout',
+            constraint=models.UniqueConstraint(fields=('booking',), name='unique_payout_booking'),
+        ),
+    ]
@@ -70,6 +70,9 @@ class Payout(models.Model):
     class Meta:
         ordering = ['-payout_date']
         unique_together = ('booking', 'provider_payout_id')
+        constraints = [
+            models.UniqueConstraint(fields=['booking'], name='unique_payout_booking'),
+        ]
     
     def __str__(self):
         return f"Payout {self.id} to Guide {self.guide.id} for Amount {self.amount}"
@@ -1,4 +1,6 @@
+from decimal import Decimal
 from rest_framework import serializers
+from django.db.models import Prefetch
 from Booking.models import Booking
 from .models import Payment, Payout
 from Profile.models import Guide
@@ -6,10 +8,23 @@ from Booking.serializers import BookingSerializer
 from Choices.models import PayoutStatus
 from Choices.serializers import PaymentMethodSerializer, PaymentStatusSerializer, MobileProviderSerializer
 from django.contrib.auth import get_user_model
-from Utils.system_info import get_system_setting
+from Utils.system_info import get_decimal_setting
 
 User = get_user_model()
 
+def with_serializer_relations(queryset):
+    """
+    Load everything PaymentSerializer (and its nested BookingSerializer) reads,
+    so a page of payments costs a constant number of queries.
+    """
+    return queryset.select_related(
+        'booking', 'booking__traveler', 'booking__slot', 'booking__slot__experience',
+        'booking__slot__experience__location', 'payment_method', 'payment_status', 'provider',
+    ).prefetch_related(
+        Prefetch('booking__payments', queryset=Payment.objects.only('id', 'booking_id', 'payment_date')),
+    )
+
+
 class PaymentSerializer(serializers.ModelSerializer):
     booking = BookingSerializer(read_only=True)
     payment_method = PaymentMethodSerializer(read_only=True)
@@ -45,7 +60,7 @@ class PayoutSerializer(serializers.ModelSerializer):
         if not obj.booking:
             return None
         total = obj.booking.total_price
-        fee_rate = float(get_system_setting("PlatformFee", 0.10))
+        fee_rate = float(get_decimal_setting("PlatformFee", Decimal("0.10")))
         platform_fee = round(float(total) * fee_rate, 2)
         return {
             'experience_title': obj.booking.experience_title,
@@ -1,5 +1,6 @@
 import uuid
 from Choices.models import PaymentStatus, PaymentMethod, MobileProvider
+from Choices.registry import get_by_code
 from Payment.models import Payment
 
 STATUS_MAP = {
@@ -35,7 +36,7 @@ class MockPaymentService:
 
         payment.payment_method = payment_method
         payment.provider = payment_provider
-        payment.payment_status = PaymentStatus.objects.get(code=status_str)
+        payment.payment_status = get_by_code(PaymentStatus, status_str)
         payment.provider_payment_id = f"mock_{uuid.uuid4()}"
         payment.save()
 
@@ -43,6 +44,7 @@ class MockPaymentService:
         booking = payment.booking
         if status_str == "COMPLETED":
             booking.status = "CONFIRMED"
+            booking.hold_expires_at = None
         elif status_str in ["FAILED", "REFUNDED"]:
             booking.status = "PENDING"
         booking.save()
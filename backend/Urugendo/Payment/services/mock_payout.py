@@ -1,5 +1,6 @@
 import uuid
 from Choices.models import PayoutStatus, MobileProvider
+from Choices.registry import get_by_code
 from Payment.models import Payout
 
 # Mock responses by mobile number
@@ -22,7 +23,7 @@ class MockPayoutService:
         """
         status_str = PAYOUT_STATUS_MAP.get(phone_number, "PAID")
 
-        payout.status = PayoutStatus.objects.get(code=status_str)
+        payout.status = get_by_code(PayoutStatus, status_str)
         payout.provider_payout_id = f"mock_{uuid.uuid4()}"
         payout.save(update_fields=['status', 'provider_payout_id', 'updated_at'])
 
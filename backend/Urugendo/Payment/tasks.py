@@ -1,62 +1,197 @@
-from django.db import transaction
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
 from Booking.models import Booking
 from .models import Payout
 from Choices.models import PayoutStatus
-from Profile.models import Guide
-from .serializers import PayoutSerializer
+from Choices.registry import get_by_code
+from Utils.models import TaskWatermark
 from .services.mock_payout import MockPayoutService
-from Utils.system_info import get_system_setting
+from Utils.system_info import get_decimal_setting
 
+# Completed bookings read per chunk when generating payouts.
+PAYOUT_BATCH_SIZE = 500
 
+# TaskWatermark holding the updated_at of the last completed booking processed.
+PAYOUT_WATERMARK_KEY = "PayoutWatermark"
 
-def create_payouts_for_completed_bookings():
-    pending_status = PayoutStatus.objects.get(code='PENDING')
-    fee_rate = float(get_system_setting("PlatformFee", 0.10))
+# Re-scan this far behind the watermark so completions committed late are not missed.
+PAYOUT_WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Payouts claimed per transaction, and threads used to disburse them.
+PAYOUT_CLAIM_SIZE = 50
+PAYOUT_MAX_WORKERS = 4
+
+# A payout still PROCESSING this long after it was claimed was left by a worker that
+# crashed or hit the django-q timeout.
+PAYOUT_PROCESSING_TIMEOUT = timedelta(minutes=15)
+
+
+def _get_payout_watermark():
+    return TaskWatermark.objects.filter(name=PAYOUT_WATERMARK_KEY).values_list('value', flat=True).first()
+
+
+def _set_payout_watermark(value):
+    TaskWatermark.objects.update_or_create(name=PAYOUT_WATERMARK_KEY, defaults={'value': value})
+
+
+def create_payouts_for_completed_bookings(batch_size=PAYOUT_BATCH_SIZE, full_scan=False):
+    """
+    Create a PENDING payout for every COMPLETED booking that does not have one.
+
+    Only bookings updated since the stored watermark are scanned (pass
+    full_scan=True to backfill everything). Bookings are read in keyset
+    chunks and payouts are inserted with bulk_create; the unique constraint
+    on Payout.booking keeps overlapping or concurrent runs idempotent.
+    Returns a summary of the run.
+    """
+    started = time.monotonic()
+    pending_status = get_by_code(PayoutStatus, 'PENDING')
+    fee_rate = float(get_decimal_setting("PlatformFee", Decimal("0.10")))
+    watermark = None if full_scan else _get_payout_watermark()
+    summary = {'scanned': 0, 'created': 0}
 
     completed_bookings = Booking.objects.filter(
         status=Booking.Status.COMPLETED,
-    ).exclude(
-        payouts__isnull=False
-    ).select_related('slot__experience__guide')
+    ).select_related('slot__experience__guide').order_by('updated_at', 'id')
 
-    for booking in completed_bookings:
-        guide = booking.slot.experience.guide if booking.slot else None
-        if not guide:
-            continue
+    if watermark:
+        completed_bookings = completed_bookings.filter(updated_at__gte=watermark - PAYOUT_WATERMARK_OVERLAP)
 
-        net_amount = round(float(booking.total_price) * (1 - fee_rate), 2)
+    high_water = watermark
+    last = None
+    while True:
+        chunk_qs = completed_bookings
+        if last:
+            chunk_qs = chunk_qs.filter(
+                Q(updated_at__gt=last.updated_at) | Q(updated_at=last.updated_at, id__gt=last.id)
+            )
+        chunk = list(chunk_qs[:batch_size])
+        if not chunk:
+            break
 
-        with transaction.atomic():
-            Payout.objects.get_or_create(
+        already_paid = set(
+            Payout.objects.filter(booking__in=chunk).values_list('booking_id', flat=True)
+        )
+        payouts = [
+            Payout(
                 booking=booking,
-                defaults={
-                    'guide': guide,
-                    'amount': net_amount,
-                    'status': pending_status,
-                }
+                guide=booking.slot.experience.guide,
+                amount=round(float(booking.total_price) * (1 - fee_rate), 2),
+                status=pending_status,
             )
+            for booking in chunk
+            if booking.slot and booking.id not in already_paid
+        ]
+        Payout.objects.bulk_create(payouts, ignore_conflicts=True)
+        # Ids are generated client-side, so rows skipped on conflict (a concurrent run) are simply not found.
+        created = Payout.objects.filter(id__in=[payout.id for payout in payouts]).count() if payouts else 0
 
-def process_pending_payouts():
-    pending_status = PayoutStatus.objects.get(code='PENDING')
-    processing_status = PayoutStatus.objects.get(code='PROCESSING')
-    failed_status = PayoutStatus.objects.get(code='FAILED')
+        summary['scanned'] += len(chunk)
+        summary['created'] += created
+        last = chunk[-1]
+        if high_water is None or last.updated_at > high_water:
+            high_water = last.updated_at
 
-    payouts = Payout.objects.filter(status=pending_status).select_related('guide')
+        if len(chunk) < batch_size:
+            break
 
-    for payout in payouts:
-        profile = PayoutSerializer().get_guide_detail(payout)
-        phone_number = profile.phone_number if profile else None
+    if high_water and high_water != watermark:
+        _set_payout_watermark(high_water)
+
+    summary['watermark'] = high_water.isoformat() if high_water else None
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+    print(f"create_payouts_for_completed_bookings: {summary}")
+    return summary
 
-        if not phone_number:
-            # Leave as PENDING until the guide adds a phone number
-            continue
 
-        # Only lock once we know we can actually process it
+def _claim_pending_payouts(pending_status, processing_status, claim_size):
+    """
+    Claim up to `claim_size` PENDING payouts whose guide has a phone number and
+    flip them to PROCESSING in the same transaction. SKIP LOCKED lets parallel
+    workers claim disjoint batches, so a payout is never disbursed twice.
+    """
+    with transaction.atomic():
+        payouts = list(
+            Payout.objects.select_for_update(skip_locked=True, of=('self',))
+            .select_related('guide__guide_profile')
+            .filter(status=pending_status, guide__guide_profile__isnull=False)
+            .exclude(guide__guide_profile__phone_number='')
+            .order_by('payout_date')[:claim_size]
+        )
+        if payouts:
+            Payout.objects.filter(id__in=[payout.id for payout in payouts]).update(
+                status=processing_status, updated_at=timezone.now()
+            )
+    for payout in payouts:
         payout.status = processing_status
-        payout.save(update_fields=['status', 'updated_at'])
+    return payouts
+
+
+def _fail_stale_payouts(processing_status, failed_status):
+    """
+    Mark payouts stuck in PROCESSING for PAYOUT_PROCESSING_TIMEOUT as FAILED.
+    They are not retried: the provider may already have paid them, so an
+    admin has to check before sending the money again. Returns the count.
+    """
+    return Payout.objects.filter(
+        status=processing_status, updated_at__lt=timezone.now() - PAYOUT_PROCESSING_TIMEOUT
+    ).update(status=failed_status, updated_at=timezone.now())
+
+
+def _disburse_payout(payout):
+    try:
+        return MockPayoutService.process_payout(payout, payout.guide.guide_profile.phone_number)
+    finally:
+        # Worker threads get their own connection; don't leak it.
+        connection.close()
+
+
+def process_pending_payouts(claim_size=PAYOUT_CLAIM_SIZE, max_workers=PAYOUT_MAX_WORKERS):
+    """
+    Disburse PENDING payouts to guides.
+
+    Payouts are claimed in batches and handed to a bounded thread pool that
+    calls the payout provider concurrently. Several django-q workers can run
+    this at once. Payouts whose guide has no phone number stay PENDING, and
+    payouts an earlier run left in PROCESSING are marked FAILED first
+    (counted as 'stale'). Returns a summary of the run.
+    """
+    started = time.monotonic()
+    pending_status = get_by_code(PayoutStatus, 'PENDING')
+    processing_status = get_by_code(PayoutStatus, 'PROCESSING')
+    failed_status = get_by_code(PayoutStatus, 'FAILED')
+    summary = {'claimed': 0, 'processed': 0, 'failed': 0}
+    summary['stale'] = _fail_stale_payouts(processing_status, failed_status)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            payouts = _claim_pending_payouts(pending_status, processing_status, claim_size)
+            if not payouts:
+                break
+            summary['claimed'] += len(payouts)
+
+            futures = {executor.submit(_disburse_payout, payout): payout for payout in payouts}
+            failed_ids = []
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                    summary['processed'] += 1
+                except Exception as e:
+                    print(f"Failed to process payout {futures[future].id}: {e}")
+                    failed_ids.append(futures[future].id)
+
+            if failed_ids:
+                Payout.objects.filter(id__in=failed_ids).update(status=failed_status, updated_at=timezone.now())
+                summary['failed'] += len(failed_ids)
+
+            if len(payouts) < claim_size:
+                break
 
-        try:
-            MockPayoutService.process_payout(payout, phone_number)
-        except Exception:
-            payout.status = failed_status
-            payout.save(update_fields=['status', 'updated_at'])
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+    print(f"process_pending_payouts: {summary}")
+    return summary
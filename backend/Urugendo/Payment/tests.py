@@ -1,3 +1,324 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from Booking.models import Booking
+from Choices.models import PaymentMethod, PaymentStatus, PayoutStatus
+from Experiences.models import Experience, ExperienceSlot
+from Payment.models import Payment, Payout
+from Payment.services.mock_payout import MockPayoutService
+from Payment.tasks import create_payouts_for_completed_bookings, process_pending_payouts, PAYOUT_WATERMARK_KEY
+from Profile.models import Guide
+from System.models import SystemInfo
+from Utils.models import TaskWatermark
+from Utils.system_info import SETTINGS_VERSION_KEY
+
+User = get_user_model()
+
+
+def make_user(username, email, password="SecurePass123!", role="Tourist"):
+    return User.objects.create_user(username=username, email=email, password=password, role=role)
+
+
+def make_slot(experience, days_from_today=-1):
+    return ExperienceSlot.objects.create(
+        experience=experience,
+        date=timezone.now().date() + timedelta(days=days_from_today),
+        capacity=10,
+        remaining_slots=10,
+        price=Decimal("25.00"),
+    )
+
+
+def make_booking(traveler, slot, guests=1, status=Booking.Status.COMPLETED):
+    return Booking.objects.create(
+        traveler=traveler,
+        slot=slot,
+        guests=guests,
+        experience_title=slot.experience.title,
+        price_per_guest=slot.price,
+        total_price=slot.price * guests,
+        status=status,
+    )
+
+
+class CreatePayoutsTests(TestCase):
+    def setUp(self):
+        for code in ["PENDING", "PROCESSING", "PAID", "FAILED"]:
+            PayoutStatus.objects.create(code=code)
+        SystemInfo.objects.create(key="PlatformFee", value="0.10")
+
+        self.guide = make_user("guide1", "guide@example.com", role="Guide")
+        self.tourist = make_user("tourist1", "tourist@example.com")
+        self.experience = Experience.objects.create(title="Kigali City Walk", guide=self.guide)
+        self.slot = make_slot(self.experience)
+
+    def test_creates_one_payout_per_completed_booking(self):
+        """Completed bookings get a PENDING payout net of the platform fee."""
+        print("Testing payout generation for completed bookings")
+        completed = make_booking(self.tourist, self.slot, guests=2)
+        make_booking(self.tourist, self.slot, status=Booking.Status.CONFIRMED)
+
+        summary = create_payouts_for_completed_bookings()
+
+        self.assertEqual(summary["scanned"], 1)
+        self.assertEqual(summary["created"], 1)
+        payout = Payout.objects.get()
+        self.assertEqual(payout.booking, completed)
+        self.assertEqual(payout.guide, self.guide)
+        self.assertEqual(payout.amount, Decimal("45.00"))
+        self.assertEqual(payout.status.code, "PENDING")
+
+    def test_rerun_does_not_duplicate_payouts(self):
+        """Running twice never creates a second payout for the same booking."""
+        print("Testing payout generation is idempotent")
+        make_booking(self.tourist, self.slot)
+
+        create_payouts_for_completed_bookings()
+        summary = create_payouts_for_completed_bookings(full_scan=True)
+
+        self.assertEqual(summary["created"], 0)
+        self.assertEqual(Payout.objects.count(), 1)
+
+    def test_watermark_limits_scan_to_new_completions(self):
+        """Bookings completed well before the watermark are not rescanned."""
+        print("Testing payout generation only scans past the watermark")
+        old = make_booking(self.tourist, self.slot)
+        settings_version = cache.get(SETTINGS_VERSION_KEY)
+        create_payouts_for_completed_bookings()
+        self.assertTrue(TaskWatermark.objects.filter(name=PAYOUT_WATERMARK_KEY).exists())
+        # Recording progress must not invalidate cached SystemInfo settings.
+        self.assertEqual(cache.get(SETTINGS_VERSION_KEY), settings_version)
+
+        # Push the processed booking far behind the watermark overlap window.
+        Booking.objects.filter(id=old.id).update(updated_at=timezone.now() - timedelta(days=1))
+        TaskWatermark.objects.filter(name=PAYOUT_WATERMARK_KEY).update(value=timezone.now())
+        new = make_booking(self.tourist, self.slot)
+
+        summary = create_payouts_for_completed_bookings()
+
+        self.assertEqual(summary["scanned"], 1)
+        self.assertEqual(summary["created"], 1)
+        self.assertTrue(Payout.objects.filter(booking=new).exists())
+
+    def test_summary_groups_payouts_by_status(self):
+        """The payout summary keeps its status__name key, filled with the status code."""
+        print("Testing payout summary response")
+        for _ in range(2):
+            make_booking(self.tourist, self.slot)
+        create_payouts_for_completed_bookings()
+        client = APIClient()
+        client.force_authenticate(user=self.guide)
+
+        response = client.get("/payments/payouts/summary/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [dict(row) for row in response.data],
+            [{"status__name": "PENDING", "total": Decimal("45.00"), "count": 2}],
+        )
+
+    def test_processes_in_chunks(self):
+        """Every completed booking gets a payout across several chunks."""
+        print("Testing payout generation processes bookings in chunks")
+        for _ in range(5):
+            make_booking(self.tourist, self.slot)
+
+        summary = create_payouts_for_completed_bookings(batch_size=2)
+
+        self.assertEqual(summary["scanned"], 5)
+        self.assertEqual(summary["created"], 5)
+        self.assertEqual(Payout.objects.count(), 5)
+
+
+class ProcessPendingPayoutsTests(TransactionTestCase):
+    """Uses real commits because payouts are disbursed from worker threads."""
+
+    def setUp(self):
+        self.statuses = {
+            code: PayoutStatus.objects.create(code=code) for code in ["PENDING", "PROCESSING", "PAID", "FAILED"]
+        }
+
+        self.guide = make_user("guide1", "guide@example.com", role="Guide")
+        Guide.objects.create(user_id=self.guide, phone_number="0780000002")
+        self.guide_without_profile = make_user("guide2", "guide2@example.com", role="Guide")
+
+        self.tourist = make_user("tourist1", "tourist@example.com")
+        experience = Experience.objects.create(title="Kigali City Walk", guide=self.guide)
+        self.slot = make_slot(experience)
+
+    def _make_payout(self, guide):
+        booking = make_booking(self.tourist, self.slot)
+        return Payout.objects.create(
+            guide=guide, booking=booking, amount=Decimal("22.50"), status=self.statuses["PENDING"]
+        )
+
+    def test_pays_claimable_payouts_and_skips_guides_without_phone(self):
+        """Payouts for guides with a phone number are paid; others stay PENDING."""
+        print("Testing payout worker pool pays claimable payouts")
+        payable = [self._make_payout(self.guide) for _ in range(3)]
+        waiting = self._make_payout(self.guide_without_profile)
+
+        summary = process_pending_payouts(claim_size=2, max_workers=2)
+
+        self.assertEqual(summary["claimed"], 3)
+        self.assertEqual(summary["processed"], 3)
+        self.assertEqual(summary["failed"], 0)
+        for payout in payable:
+            payout.refresh_from_db()
+            self.assertEqual(payout.status.code, "PAID")
+            self.assertTrue(payout.provider_payout_id)
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.status.code, "PENDING")
+
+    def test_provider_errors_mark_payout_failed(self):
+        """A payout whose disbursement raises is marked FAILED."""
+        print("Testing payout worker pool marks provider errors as failed")
+        payout = self._make_payout(self.guide)
+
+        with patch.object(MockPayoutService, "process_payout", side_effect=Exception("Provider down")):
+            summary = process_pending_payouts()
+
+        self.assertEqual(summary["failed"], 1)
+        payout.refresh_from_db()
+        self.assertEqual(payout.status.code, "FAILED")
+
+    def test_payouts_stranded_in_processing_are_failed(self):
+        """Payouts a crashed run left PROCESSING are failed, not paid again; fresh claims are left alone."""
+        print("Testing stale PROCESSING payouts are marked failed")
+        stranded = self._make_payout(self.guide)
+        in_flight = self._make_payout(self.guide)
+        Payout.objects.filter(id=stranded.id).update(
+            status=self.statuses["PROCESSING"], updated_at=timezone.now() - timedelta(hours=1)
+        )
+        Payout.objects.filter(id=in_flight.id).update(status=self.statuses["PROCESSING"])
+
+        with patch.object(MockPayoutService, "process_payout") as disburse:
+            summary = process_pending_payouts()
+
+        disburse.assert_not_called()
+        self.assertEqual(summary["stale"], 1)
+        stranded.refresh_from_db()
+        in_flight.refresh_from_db()
+        self.assertEqual(stranded.status.code, "FAILED")
+        self.assertEqual(in_flight.status.code, "PROCESSING")
+
+    def test_parallel_runs_never_pay_twice(self):
+        """Concurrent workers claim disjoint batches, so each payout is disbursed once."""
+        print("Testing parallel payout workers never double pay")
+        payouts = [self._make_payout(self.guide) for _ in range(8)]
+        calls = []
+        lock = threading.Lock()
+        original = MockPayoutService.process_payout
+
+        def counting_process_payout(payout, phone_number):
+            with lock:
+                calls.append(payout.id)
+            return original(payout, phone_number)
+
+        def run_worker():
+            from django.db import connection
+            try:
+                process_pending_payouts(claim_size=2, max_workers=2)
+            finally:
+                connection.close()
+
+        with patch.object(MockPayoutService, "process_payout", side_effect=counting_process_payout):
+            workers = [threading.Thread(target=run_worker) for _ in range(3)]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+        self.assertEqual(sorted(calls), sorted(payout.id for payout in payouts))
+        self.assertEqual(Payout.objects.filter(status__code="PAID").count(), 8)
+
+
+class PaymentListQueryCountTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.pending = PaymentStatus.objects.create(code="PENDING")
+        self.guide = make_user("guide1", "guide@example.com", role="Guide")
+        self.tourist = make_user("tourist1", "tourist@example.com")
+        self.slot = make_slot(Experience.objects.create(title="Kigali City Walk", guide=self.guide), days_from_today=3)
+        self.client.force_authenticate(user=self.tourist)
+
+    def _make_payments(self, count):
+        for _ in range(count):
+            booking = make_booking(self.tourist, self.slot, status=Booking.Status.PENDING)
+            Payment.objects.create(booking=booking, amount=booking.total_price, payment_status=self.pending)
+
+    def _list_query_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/payments/")
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.data["results"]
+
+    def test_payment_list_query_count_does_not_grow_with_rows(self):
+        """Listing payments costs the same number of queries for 1 or 10 rows."""
+        print("Testing payment list avoids per-row queries")
+        self._make_payments(1)
+        small_count, _ = self._list_query_count()
+
+        self._make_payments(9)
+        large_count, results = self._list_query_count()
+
+        self.assertEqual(len(results), 10)
+        self.assertEqual(small_count, large_count)
+        for payment in results:
+            self.assertEqual(payment["booking"]["payment_id"], payment["id"])
+
+
+class PayHeldBookingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for code in ["PENDING", "COMPLETED", "FAILED"]:
+            PaymentStatus.objects.create(code=code)
+        self.method = PaymentMethod.objects.create(name="Mobile Money")
+        self.guide = make_user("guide1", "guide@example.com", role="Guide")
+        self.tourist = make_user("tourist1", "tourist@example.com")
+        self.slot = make_slot(Experience.objects.create(title="Gorilla Trekking", guide=self.guide), days_from_today=3)
+        self.booking = make_booking(self.tourist, self.slot, status=Booking.Status.PENDING)
+        self.payment = Payment.objects.create(
+            booking=self.booking, amount=self.booking.total_price,
+            payment_status=PaymentStatus.objects.get(code="PENDING"),
+        )
+        self.client.force_authenticate(user=self.tourist)
+
+    def _pay(self):
+        return self.client.post(
+            f"/payments/{self.payment.id}/pay/", {"method_id": str(self.method.id), "number": "0780000002"},
+            format="json",
+        )
+
+    def test_paying_a_live_hold_confirms_the_booking(self):
+        """A completed payment within the hold confirms the booking and clears the hold."""
+        print("Testing payment converts a seat hold into a confirmed booking")
+        Booking.objects.filter(id=self.booking.id).update(hold_expires_at=timezone.now() + timedelta(minutes=10))
+
+        response = self._pay()
+
+        self.assertEqual(response.status_code, 200)
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.status, Booking.Status.CONFIRMED)
+        self.assertIsNone(self.booking.hold_expires_at)
+
+    def test_paying_an_expired_hold_is_rejected(self):
+        """Once the hold has run out the payment is refused and nothing is charged."""
+        print("Testing payment is rejected after the seat hold expires")
+        Booking.objects.filter(id=self.booking.id).update(hold_expires_at=timezone.now() - timedelta(minutes=1))
+
+        response = self._pay()
+
+        self.assertEqual(response.status_code, 409)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.payment_status.code, "PENDING")
+        self.assertEqual(Booking.objects.get(id=self.booking.id).status, Booking.Status.PENDING)
@@ -2,24 +2,30 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.http import Http404
+from django.db import transaction
+from django.utils import timezone
 from .models import Payment, Payout
 from Choices.models import PaymentMethod, MobileProvider, PayoutStatus
+from Choices.registry import get_by_code, get_by_id
 from .services.mock_payment import MockPaymentService
-from .serializers import PaymentSerializer, PayoutSerializer
+from .serializers import PaymentSerializer, PayoutSerializer, with_serializer_relations
+from Booking.models import Booking
 from Booking.utils import send_booking_notifications
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Count
+from django.db.models import F, Sum, Count
 
 
 class PaymentViewSet(viewsets.ModelViewSet):
     serializer_class = PaymentSerializer
+
     def get_queryset(self):
         user = self.request.user
-        return Payment.objects.filter(booking__traveler=user)
+        return with_serializer_relations(Payment.objects.filter(booking__traveler=user))
 
     @action(detail=True, methods=["post"], url_path="pay")
     def pay(self, request, pk=None):
-        payment = get_object_or_404(Payment, id=pk)
+        payment = get_object_or_404(with_serializer_relations(Payment.objects.all()), id=pk)
 
         if payment.booking.traveler != request.user:
             return Response(
@@ -38,13 +44,34 @@ class PaymentViewSet(viewsets.ModelViewSet):
             )
         
         # Safely get method and provider
-        method = get_object_or_404(PaymentMethod, id=method_id)
-        provider = get_object_or_404(MobileProvider, id=provider_id) if provider_id else None
+        try:
+            method = get_by_id(PaymentMethod, method_id)
+            provider = get_by_id(MobileProvider, provider_id) if provider_id else None
+        except (PaymentMethod.DoesNotExist, MobileProvider.DoesNotExist):
+            raise Http404("Payment method or provider not found.")
         
-        # Process payment
-        result = MockPaymentService.process_payment(payment, method, number, provider)
-
         booking = payment.booking
+        with transaction.atomic():
+            # Lock the booking so release_expired_holds can't expire it mid-payment
+            # (the sweep skips locked rows), then check the seat hold is still live.
+            booking.refresh_from_db(
+                fields=['status', 'hold_expires_at'], from_queryset=Booking.objects.select_for_update(of=('self',))
+            )
+            hold_expired = booking.hold_expires_at is not None and booking.hold_expires_at <= timezone.now()
+            if booking.status == Booking.Status.EXPIRED or hold_expired:
+                return Response(
+                    {"detail": "The seat hold for this booking has expired. Please book again."},
+                    status=status.HTTP_409_CONFLICT
+                )
+            if booking.status != Booking.Status.PENDING:
+                return Response(
+                    {"detail": f"Booking is {booking.status.lower()} and can't be paid."},
+                    status=status.HTTP_409_CONFLICT
+                )
+
+            # Process payment; a completed payment turns the hold into a confirmed booking
+            result = MockPaymentService.process_payment(payment, method, number, provider)
+
         if result.get("status") == "COMPLETED":
             send_booking_notifications(booking)
 
@@ -90,8 +117,9 @@ class PayoutViewSet(viewsets.ModelViewSet):
     def mark_paid(self, request, pk=None):
         """Shortcut action to mark a payout as paid."""
         payout = self.get_object()
-        paid_status = PayoutStatus.objects.filter(name__iexact='paid').first()
-        if not paid_status:
+        try:
+            paid_status = get_by_code(PayoutStatus, 'PAID')
+        except PayoutStatus.DoesNotExist:
             return Response({'detail': 'Paid status not configured.'}, status=status.HTTP_400_BAD_REQUEST)
         payout.status = paid_status
         payout.save(update_fields=['status', 'updated_at'])
@@ -101,7 +129,8 @@ class PayoutViewSet(viewsets.ModelViewSet):
     def summary(self, request):
         """Return total payout amounts grouped by status for the current user."""
         qs = self.get_queryset()
-        data = qs.values('status__name').annotate(
+        # PayoutStatus has no name; its code is served under the key clients already read.
+        data = qs.values(status__name=F('status__code')).annotate(
             total=Sum('amount'),
             count=Count('id')
         ).order_by('status__name')
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PicturesConfig(AppConfig):
     name = 'Pictures'
+
+    def ready(self):
+        import Pictures.signals
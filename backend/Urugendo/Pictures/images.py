@@ -0,0 +1,109 @@
+"""
+Resized, metadata-free variants of uploaded images.
+
+Every upload is decoded once, rotated upright from its EXIF orientation and
+re-encoded at each size in SIZES as both WebP and JPEG. Re-encoding drops
+EXIF (including GPS position), XMP and ICC data, and nothing is ever scaled
+up, so the largest variant is also the maximum stored dimension.
+
+Usage:
+    from Pictures.images import render_variants
+    for variant in render_variants(uploaded_file):
+        storage.upload(f"{image_id}-{variant.size}.{variant.extension}", variant.data)
+"""
+from dataclasses import dataclass
+from io import BytesIO
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Longest side in pixels of each variant, smallest first.
+SIZES = {"thumbnail": 320, "card": 800, "full": 2048}
+
+# Pillow format, file extension, content type and encoder options per output format.
+FORMATS = {
+    "webp": ("WEBP", "webp", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "jpg", "image/jpeg", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+# Sources with more pixels than this are rejected before they are decoded.
+MAX_SOURCE_PIXELS = 50_000_000
+
+
+class InvalidImage(ValueError):
+    """The upload is not an image Pillow can decode, or is too large to process."""
+
+
+@dataclass
+class Variant:
+    size: str
+    format: str
+    extension: str
+    content_type: str
+    width: int
+    height: int
+    data: bytes
+
+
+def check_image(source):
+    """
+    Raise InvalidImage unless `source` starts with the header of an image
+    Pillow can decode that has at most MAX_SOURCE_PIXELS pixels. Only the
+    header is read, so this is cheap enough to run before staging an upload.
+    Returns the opened (not yet decoded) image.
+    """
+    if hasattr(source, "seek"):
+        source.seek(0)
+    try:
+        image = Image.open(source)
+    except (UnidentifiedImageError, Image.DecompressionBombError) as e:
+        raise InvalidImage(str(e))
+
+    if image.width * image.height > MAX_SOURCE_PIXELS:
+        raise InvalidImage(f"Images can have at most {MAX_SOURCE_PIXELS} pixels.")
+    return image
+
+
+def _open(source):
+    image = check_image(source)
+
+    # Let the JPEG decoder scale down while decoding; far cheaper than decoding full size.
+    full = SIZES["full"]
+    image.draft("RGB", (full, full))
+    try:
+        image = ImageOps.exif_transpose(image)
+    except OSError as e:
+        raise InvalidImage(str(e))
+
+    if image.mode in ("RGBA", "LA", "P"):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        return background
+    return image.convert("RGB")
+
+
+def _encode(image, fmt):
+    pil_format, _, _, options = FORMATS[fmt]
+    buffer = BytesIO()
+    # No exif/icc_profile arguments: the encoded file carries pixels only.
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def render_variants(source):
+    """
+    Return a Variant for every size in SIZES and format in FORMATS.
+    `source` is a file-like object (an upload, or bytes wrapped in BytesIO).
+    Raises InvalidImage when the source can't be decoded.
+    """
+    image = _open(source)
+
+    variants = []
+    # Largest first, each size shrunk in place from the previous one.
+    for size, longest_side in sorted(SIZES.items(), key=lambda item: -item[1]):
+        image.thumbnail((longest_side, longest_side), Image.Resampling.LANCZOS)
+        for fmt, (_, extension, content_type, _) in FORMATS.items():
+            variants.append(Variant(
+                size=size, format=fmt, extension=extension, content_type=content_type,
+                width=image.width, height=image.height, data=_encode(image, fmt),
+            ))
+    return variants
@@ -0,0 +1,67 @@
+import uuid
+from django.conf import settings
+from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+class ImageAsset(models.Model):
+    """
+    An uploaded image and the variants Pictures.images rendered from it.
+    `url` is the full-size JPEG, the URL stored on profiles and experiences;
+    once READY, `variants` maps each size to {"width", "height", "jpeg", "webp"}.
+    """
+    class Status(models.TextChoices):
+        PROCESSING = "PROCESSING", "Processing"
+        READY = "READY", "Ready"
+        FAILED = "FAILED", "Failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='image_assets')
+    bucket = models.CharField(max_length=100)
+    url = models.URLField(max_length=500, unique=True)
+
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PROCESSING)
+    variants = models.JSONField(default=dict, blank=True)
+    # Original waiting in PICTURES_STAGING_BUCKET for the worker (large uploads only).
+    staging_path = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+
+    # When a profile or experience saved `url` (Pictures.signals), and when
+    # Pictures.tasks.collect_orphaned_images last found nothing using it any more.
+    attached_at = models.DateTimeField(null=True, blank=True)
+    detached_at = models.DateTimeField(null=True, blank=True)
+    # Last visit of collect_orphaned_images, which works through the assets a page per run.
+    checked_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['checked_at'], name='imageasset_checked_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.bucket}/{self.id} ({self.status})"
+
+    @classmethod
+    def variants_by_url(cls, urls):
+        """{url: variants} of the READY assets among `urls`, in one query."""
+        urls = [url for url in set(urls) if url]
+        if not urls:
+            return {}
+        return dict(cls.objects.filter(url__in=urls, status=cls.Status.READY).values_list('url', 'variants'))
+
+    @classmethod
+    def mark_attached(cls, urls):
+        """Record that a profile or experience now uses `urls`, in one query."""
+        urls = [url for url in set(urls) if url]
+        if not urls:
+            return 0
+        now = timezone.now()
+        return cls.objects.filter(url__in=urls).filter(
+            models.Q(attached_at__isnull=True) | models.Q(detached_at__isnull=False)
+        ).update(attached_at=Coalesce('attached_at', Value(now)), detached_at=None)
@@ -1,8 +1,15 @@
 from rest_framework import serializers
+from .models import ImageAsset
 
 class ProfileImageUploadSerializer(serializers.Serializer):
     image = serializers.ImageField()
 
 
 class ExperienceImageUploadSerializer(serializers.Serializer):
-    image = serializers.ImageField()
\ No newline at end of file
+    image = serializers.ImageField()
+
+class ImageAssetSerializer(serializers.ModelSerializer):
+    """Upload responses; `url` is the key upload endpoints returned before assets existed, so keep it."""
+    class Meta:
+        model = ImageAsset
+        fields = ['id', 'url', 'status', 'variants', 'error']
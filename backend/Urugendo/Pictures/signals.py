@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from Experiences.models import Experience
+from .models import ImageAsset
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def attach_profile_picture(sender, instance, update_fields=None, **kwargs):
+    """Mark the asset behind a saved profile picture as attached, so it is never collected as an orphan."""
+    if update_fields is not None and 'profile_picture' not in update_fields:
+        return
+    ImageAsset.mark_attached([instance.profile_picture])
+
+
+@receiver(post_save, sender=Experience)
+def attach_experience_photos(sender, instance, update_fields=None, **kwargs):
+    """Mark the assets behind an experience's saved photos as attached."""
+    if update_fields is not None and 'photos' not in update_fields:
+        return
+    ImageAsset.mark_attached(instance.photos)
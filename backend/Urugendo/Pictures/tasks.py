@@ -0,0 +1,277 @@
+import time
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from io import BytesIO
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django_q.tasks import async_task
+from django.utils.dateparse import parse_datetime
+from Experiences.models import Experience
+from Users.models import User
+from .images import FORMATS, SIZES, InvalidImage
+from .models import ImageAsset
+from .supabase_client import supabase
+from .utils import image_key, store_variants, variant_path
+
+# Entries listed per storage request, and paths removed per remove call
+# (Supabase accepts at most 1000 of either).
+LIST_PAGE_SIZE = 1000
+REMOVE_BATCH_SIZE = 1000
+# Images a profile or experience stopped using are kept this long after that is
+# first noticed, and ORPHAN_BATCH_SIZE images are checked per run of the collector.
+ORPHAN_GRACE_PERIOD = timedelta(days=1)
+ORPHAN_BATCH_SIZE = 500
+# Large uploads still PROCESSING after this long were given up on by the worker (timeouts, retries spent).
+STALLED_UPLOAD_AFTER = timedelta(hours=1)
+
+
+def process_image_asset(asset_id, delete_old=False):
+    """
+    Render and upload the variants of an image staged by
+    Pictures.utils.upload_image_to_supabase, then delete the staged original.
+    With `delete_old`, remove_replaced_images is queued once the asset is READY.
+
+    An original that can't be decoded leaves the asset FAILED. Storage errors
+    propagate so django-q retries the task; variants are upserted, so a retry
+    overwrites whatever the failed run uploaded. Returns a summary of the run.
+    """
+    started = time.monotonic()
+    summary = {'processed': 0, 'failed': 0}
+
+    asset = ImageAsset.objects.filter(id=asset_id, status=ImageAsset.Status.PROCESSING).first()
+    if asset is not None:
+        staging = supabase.storage.from_(settings.PICTURES_STAGING_BUCKET)
+        try:
+            store_variants(asset, BytesIO(staging.download(asset.staging_path)))
+            summary['processed'] += 1
+        except InvalidImage as e:
+            asset.status = ImageAsset.Status.FAILED
+            asset.error = str(e)
+            summary['failed'] += 1
+
+        staging.remove([asset.staging_path])
+        asset.staging_path = ""
+        asset.save(update_fields=['status', 'variants', 'error', 'staging_path', 'updated_at'])
+        if delete_old and asset.status == ImageAsset.Status.READY:
+            transaction.on_commit(lambda: async_task(
+                "Pictures.tasks.remove_replaced_images", str(asset.owner_id), asset.bucket, str(asset.id)
+            ))
+
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+    print(f"process_image_asset: {summary}")
+    return summary
+
+
+def _list_all(storage, folder=""):
+    """Every entry directly inside `folder` of a bucket, fetched a page at a time."""
+    offset = 0
+    while True:
+        page = storage.list(folder, {
+            "limit": LIST_PAGE_SIZE, "offset": offset, "sortBy": {"column": "name", "order": "asc"},
+        })
+        yield from page
+        if len(page) < LIST_PAGE_SIZE:
+            return
+        offset += LIST_PAGE_SIZE
+
+
+def _list_files(storage):
+    """(path, entry) of every file in a bucket laid out as "<user>/<file>"; top-level entries are per-user folders."""
+    for folder in _list_all(storage):
+        if folder.get('id'):
+            continue
+        for entry in _list_all(storage, folder['name']):
+            if entry.get('id'):
+                yield f"{folder['name']}/{entry['name']}", entry
+
+
+def _remove(storage, paths, summary):
+    """Remove `paths` with as few requests as the storage API allows."""
+    for start in range(0, len(paths), REMOVE_BATCH_SIZE):
+        storage.remove(paths[start:start + REMOVE_BATCH_SIZE])
+        summary['requests'] += 1
+    summary['removed'] += len(paths)
+
+
+def _asset_ids(keys):
+    """ImageAsset ids of image keys ("<user>/<image>"); keys of older uploads may not be UUIDs."""
+    ids = []
+    for key in keys:
+        try:
+            ids.append(uuid.UUID(key.rsplit("/", 1)[-1]))
+        except ValueError:
+            pass
+    return ids
+
+
+def remove_replaced_images(user_id, bucket_name, keep_image_id):
+    """
+    Remove the images in a user's folder that were replaced by `keep_image_id`,
+    with one listing and one batched remove call, along with their ImageAsset
+    rows. Queued by Pictures.utils.upload_image_to_supabase (delete_old=True).
+
+    Images whose asset was created at or after the kept one's are left alone,
+    so a slow run can't delete a newer upload: upload_image_to_supabase
+    saves the asset before writing any file. Files stored at or after that
+    time are kept too, whatever their asset says. Returns a summary of the run.
+    """
+    started = time.monotonic()
+    summary = {'removed': 0, 'requests': 0}
+
+    kept = ImageAsset.objects.filter(id=keep_image_id).first()
+    if kept is not None:
+        newer = ImageAsset.objects.filter(owner_id=user_id, bucket=bucket_name, created_at__gte=kept.created_at)
+        keep = {f"{user_id}/{image_id}" for image_id in newer.values_list('id', flat=True)}
+
+        storage = supabase.storage.from_(bucket_name)
+        replaced = []
+        for entry in _list_all(storage, user_id):
+            if not entry.get('id'):
+                continue
+            path = f"{user_id}/{entry['name']}"
+            uploaded_at = parse_datetime(entry.get('created_at') or '')
+            if uploaded_at is not None and uploaded_at >= kept.created_at:
+                keep.add(image_key(path))
+            else:
+                replaced.append(path)
+        _remove(storage, [path for path in replaced if image_key(path) not in keep], summary)
+        ImageAsset.objects.filter(
+            owner_id=user_id, bucket=bucket_name, created_at__lt=kept.created_at
+        ).exclude(id__in=_asset_ids(keep)).delete()
+
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+    print(f"remove_replaced_images: {summary}")
+    return summary
+
+
+def _referenced(urls):
+    """The subset of `urls` a profile or an experience currently uses, in two queries."""
+    referenced = set(User.objects.filter(profile_picture__in=urls).values_list('profile_picture', flat=True))
+    for photos in Experience.objects.filter(photos__overlap=urls).values_list('photos', flat=True):
+        referenced.update(photos)
+    return referenced
+
+
+def _anything_referenced():
+    return (
+        User.objects.exclude(profile_picture__isnull=True).exclude(profile_picture='').exists()
+        or Experience.objects.exclude(photos=[]).exists()
+    )
+
+
+def collect_orphaned_images(grace_period=ORPHAN_GRACE_PERIOD, batch_size=ORPHAN_BATCH_SIZE, dry_run=False,
+                            max_orphan_ratio=None):
+    """
+    Delete images no profile or experience uses any more, going by each
+    ImageAsset's attach state rather than its age. An image is an orphan once:
+    - it was attached (Pictures.signals) and nothing has used it for
+      `grace_period` since a run first found it unused, or
+    - it was never attached within PICTURES_UNATTACHED_EXPIRY_DAYS of its
+      upload (0 keeps such images forever).
+    Every candidate's URL is checked against profiles and experiences first,
+    and assets found in use are (re)marked attached.
+
+    Each run visits the `batch_size` assets checked least recently, so the
+    work is spread over runs and stays well within the django-q timeout.
+    Orphans are printed, their variants removed in batched calls and their
+    rows deleted.
+
+    Nothing is changed, and summary['aborted'] is set, when no profile or
+    experience uses any image at all, or when the orphans found would be more
+    than `max_orphan_ratio` (default PICTURES_ORPHAN_MAX_RATIO) of all
+    assets; either usually means references were read wrong, not that the
+    images are unused. With `dry_run` nothing is changed either.
+    Returns a summary of the run.
+    """
+    started = time.monotonic()
+    now = timezone.now()
+    if max_orphan_ratio is None:
+        max_orphan_ratio = settings.PICTURES_ORPHAN_MAX_RATIO
+    unattached_days = settings.PICTURES_UNATTACHED_EXPIRY_DAYS
+    summary = {'checked': 0, 'orphans': 0, 'removed': 0, 'requests': 0, 'aborted': False}
+
+    assets = list(
+        ImageAsset.objects.exclude(status=ImageAsset.Status.PROCESSING)
+        .order_by(F('checked_at').asc(nulls_first=True), 'id')[:batch_size]
+    )
+    referenced = _referenced([asset.url for asset in assets]) if assets else set()
+
+    orphans = []
+    for asset in assets:
+        asset.checked_at = now
+        if asset.url in referenced:
+            asset.attached_at = asset.attached_at or now
+            asset.detached_at = None
+        elif asset.attached_at is not None:
+            asset.detached_at = asset.detached_at or now
+            if asset.detached_at <= now - grace_period:
+                orphans.append(asset)
+        elif unattached_days and asset.created_at <= now - timedelta(days=unattached_days):
+            orphans.append(asset)
+    summary['checked'] = len(assets)
+    summary['orphans'] = len(orphans)
+
+    if orphans and (not _anything_referenced() or len(orphans) > max_orphan_ratio * ImageAsset.objects.count()):
+        print(f"collect_orphaned_images: left {len(orphans)} orphans of {len(assets)} checked images alone; "
+              "references look wrong")
+        summary['aborted'] = True
+    elif dry_run:
+        print(f"collect_orphaned_images: would remove {[asset.url for asset in orphans]}")
+    else:
+        by_bucket = defaultdict(list)
+        for asset in orphans:
+            by_bucket[asset.bucket].extend(
+                variant_path(asset.owner_id, asset.id, size, fmt) for size in SIZES for fmt in FORMATS
+            )
+        for bucket_name, paths in by_bucket.items():
+            print(f"collect_orphaned_images: removing {len(paths)} files from {bucket_name}: {paths}")
+            _remove(supabase.storage.from_(bucket_name), paths, summary)
+        ImageAsset.objects.filter(id__in=[asset.id for asset in orphans]).delete()
+
+        orphan_ids = {asset.id for asset in orphans}
+        ImageAsset.objects.bulk_update(
+            [asset for asset in assets if asset.id not in orphan_ids],
+            ['checked_at', 'attached_at', 'detached_at'],
+        )
+
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+    print(f"collect_orphaned_images: {summary}")
+    return summary
+
+
+def sweep_stalled_uploads(stalled_after=STALLED_UPLOAD_AFTER):
+    """
+    Clean up after large uploads the worker never finished (see
+    process_image_asset): assets still PROCESSING `stalled_after` since their
+    last change are marked FAILED, and their originals, along with any other
+    object in PICTURES_STAGING_BUCKET that old and not waiting for a worker
+    (left by a request that failed after staging), are removed.
+    Returns a summary of the run.
+    """
+    started = time.monotonic()
+    cutoff = timezone.now() - stalled_after
+    summary = {'failed': 0, 'removed': 0, 'requests': 0}
+
+    stalled = ImageAsset.objects.filter(status=ImageAsset.Status.PROCESSING, updated_at__lt=cutoff)
+    summary['failed'] = stalled.update(
+        status=ImageAsset.Status.FAILED, error="Processing did not finish.", staging_path="", updated_at=timezone.now()
+    )
+
+    waiting = set(
+        ImageAsset.objects.filter(status=ImageAsset.Status.PROCESSING).exclude(staging_path='')
+        .values_list('staging_path', flat=True)
+    )
+    staging = supabase.storage.from_(settings.PICTURES_STAGING_BUCKET)
+    leftovers = []
+    for path, entry in _list_files(staging):
+        uploaded_at = parse_datetime(entry.get('created_at') or '')
+        if path not in waiting and uploaded_at is not None and uploaded_at < cutoff:
+            leftovers.append(path)
+    _remove(staging, leftovers, summary)
+
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+    print(f"sweep_stalled_uploads: {summary}")
+    return summary
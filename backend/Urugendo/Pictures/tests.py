@@ -1,3 +1,522 @@
-from django.test import TestCase
+import json
+import uuid
+import threading
+import tracemalloc
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from unittest.mock import patch
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+from supabase import create_client
 
-# Create your tests here.
+from Experiences.models import Experience
+from Pictures import supabase_client, tasks
+from Pictures.images import SIZES
+from Pictures.utils import image_key
+from Pictures.models import ImageAsset
+from Pictures.views import upload_experience_image
+from Users.models import User
+
+
+class FakeBucket:
+    def __init__(self, name, supabase):
+        self.name = name
+        self.supabase = supabase
+        self.objects = supabase.objects
+
+    def upload(self, path, file, file_options=None):
+        self.objects[(self.name, path)] = file.read() if hasattr(file, "read") else file
+        self.supabase.uploaded_at[(self.name, path)] = timezone.now()
+
+    def download(self, path):
+        return self.objects[(self.name, path)]
+
+    def get_public_url(self, path):
+        return f"https://storage.test/storage/v1/object/public/{self.name}/{path}"
+
+    def list(self, folder="", options=None):
+        """Direct children of `folder`: files, and sub-folders without an id, as Supabase lists them."""
+        prefix = f"{folder}/" if folder else ""
+        entries = {}
+        for (bucket, path), uploaded_at in self.supabase.uploaded_at.items():
+            if bucket != self.name or not path.startswith(prefix):
+                continue
+            name, _, rest = path[len(prefix):].partition("/")
+            entries[name] = {"name": name, "id": None} if rest else {
+                "name": name, "id": path, "created_at": uploaded_at.isoformat(),
+            }
+        options = options or {}
+        offset = options.get("offset", 0)
+        return sorted(entries.values(), key=lambda entry: entry["name"])[offset:offset + options.get("limit", 100)]
+
+    def remove(self, paths):
+        self.supabase.remove_calls.append((self.name, list(paths)))
+        for path in paths:
+            self.objects.pop((self.name, path), None)
+            self.supabase.uploaded_at.pop((self.name, path), None)
+
+
+class FakeSupabase:
+    """In-memory stand-in for the Supabase storage client."""
+    def __init__(self):
+        self.objects = {}
+        self.uploaded_at = {}
+        self.remove_calls = []
+        self.storage = self
+
+    def from_(self, bucket):
+        return FakeBucket(bucket, self)
+
+
+def photo_upload(width=3000, height=2000, name="photo.jpg"):
+    """A JPEG carrying EXIF (camera model and a rotation) like a phone photo."""
+    exif = Image.Exif()
+    exif[0x0110] = "Test Phone"  # Model
+    exif[0x0112] = 6  # Orientation: rotate 90° clockwise
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), (30, 120, 200)).save(buffer, "JPEG", exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+class ImagePipelineTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.guide = User.objects.create_user(username="guide", password="pass", role=User.Role.GUIDE)
+        self.client.force_authenticate(user=self.guide)
+
+        self.supabase = FakeSupabase()
+        for target in ("Pictures.utils.supabase", "Pictures.tasks.supabase"):
+            patcher = patch(target, self.supabase)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _upload(self, image):
+        return self.client.post(reverse("upload-experience-image"), {"image": image}, format="multipart")
+
+    def test_small_upload_is_resized_and_stripped_in_the_request(self):
+        """Every size is stored as WebP and JPEG, upright, within its bounds and without EXIF."""
+        print("Testing inline image variant rendering")
+        response = self._upload(photo_upload())
+        self.assertEqual(response.status_code, 201)
+        # Clients written before variants existed read only `url`.
+        self.assertTrue(response.data["url"].endswith("-full.jpg"))
+        self.assertNotIn("Location", response)
+
+        asset = ImageAsset.objects.get(id=response.data["id"])
+        self.assertEqual(asset.status, ImageAsset.Status.READY)
+        self.assertEqual(response.data["url"], asset.variants["full"]["jpeg"])
+        self.assertEqual(len(self.supabase.objects), len(SIZES) * 2)
+
+        for size, longest_side in SIZES.items():
+            variant = asset.variants[size]
+            # Orientation 6 turns the 3000x2000 landscape into a portrait.
+            self.assertEqual(variant["height"], longest_side)
+            self.assertLess(variant["width"], variant["height"])
+            for fmt in ("jpeg", "webp"):
+                path = variant[fmt].removeprefix("https://storage.test/storage/v1/object/public/experience_pictures/")
+                stored = Image.open(BytesIO(self.supabase.objects[("experience_pictures", path)]))
+                self.assertEqual(stored.size, (variant["width"], variant["height"]))
+                self.assertEqual(len(stored.getexif()), 0)
+
+    @override_settings(PICTURES_INLINE_MAX_BYTES=1024)
+    def test_large_upload_is_processed_by_a_worker(self):
+        """Large files are staged and queued; the worker renders them and drops the original."""
+        print("Testing background processing of large uploads")
+        with patch("Pictures.utils.async_task") as queued, self.captureOnCommitCallbacks(execute=True):
+            response = self._upload(photo_upload())
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], ImageAsset.Status.PROCESSING)
+        asset = ImageAsset.objects.get(id=response.data["id"])
+        queued.assert_called_once_with("Pictures.tasks.process_image_asset", asset.id, False)
+        self.assertEqual([bucket for bucket, _ in self.supabase.objects], ["upload_staging"])
+
+        summary = tasks.process_image_asset(asset.id)
+
+        self.assertEqual(summary["processed"], 1)
+        asset.refresh_from_db()
+        self.assertEqual(asset.status, ImageAsset.Status.READY)
+        self.assertEqual(asset.url, response.data["url"])
+        self.assertEqual(asset.staging_path, "")
+        self.assertEqual({bucket for bucket, _ in self.supabase.objects}, {"experience_pictures"})
+
+    @override_settings(PICTURES_INLINE_MAX_BYTES=1024)
+    def test_processing_upload_can_be_polled(self):
+        """A 202 points at the asset's status, which only its owner can read."""
+        print("Testing polling a background upload")
+        with patch("Pictures.utils.async_task"):
+            response = self._upload(photo_upload())
+        asset_id = response.data["id"]
+
+        status_url = reverse("image-asset-detail", args=[asset_id])
+        self.assertTrue(response["Location"].endswith(status_url))
+        self.assertEqual(self.client.get(status_url).data["status"], ImageAsset.Status.PROCESSING)
+
+        tasks.process_image_asset(asset_id)
+        polled = self.client.get(status_url)
+        self.assertEqual(polled.data["status"], ImageAsset.Status.READY)
+        self.assertEqual(polled.data["url"], response.data["url"])
+
+        other = User.objects.create_user(username="other", password="pass")
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(status_url).status_code, 404)
+
+    @override_settings(PICTURES_INLINE_MAX_BYTES=1024)
+    def test_oversized_image_is_rejected_before_staging(self):
+        """An image with too many pixels is refused from its header; nothing is staged or queued."""
+        print("Testing large uploads are checked before staging")
+        with patch("Pictures.images.MAX_SOURCE_PIXELS", 1000), patch("Pictures.utils.async_task") as queued:
+            response = self._upload(photo_upload())
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("image", response.data)
+        self.assertEqual(self.supabase.objects, {})
+        self.assertFalse(ImageAsset.objects.exists())
+        queued.assert_not_called()
+
+    @override_settings(PICTURES_INLINE_MAX_BYTES=1024)
+    def test_stalled_uploads_are_swept(self):
+        """Assets the worker never finished fail, and old staging objects nobody waits for are removed."""
+        print("Testing stalled upload sweep")
+        with patch("Pictures.utils.async_task"):
+            stalled = self._upload(photo_upload()).data
+            waiting = self._upload(photo_upload()).data
+        staging = self.supabase.from_("upload_staging")
+        staging.upload(f"{self.guide.id}/abandoned", b"left by a failed request")
+        staging.upload(f"{self.guide.id}/in-flight", b"staged a moment ago")
+
+        two_hours_ago = timezone.now() - timedelta(hours=2)
+        ImageAsset.objects.filter(id=stalled["id"]).update(updated_at=two_hours_ago)
+        for key in (("upload_staging", f"{self.guide.id}/{stalled['id']}"),
+                    ("upload_staging", f"{self.guide.id}/{waiting['id']}"),
+                    ("upload_staging", f"{self.guide.id}/abandoned")):
+            self.supabase.uploaded_at[key] = two_hours_ago
+
+        summary = tasks.sweep_stalled_uploads()
+
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(summary["removed"], 2)
+        asset = ImageAsset.objects.get(id=stalled["id"])
+        self.assertEqual(asset.status, ImageAsset.Status.FAILED)
+        self.assertEqual(asset.staging_path, "")
+        self.assertEqual(ImageAsset.objects.get(id=waiting["id"]).status, ImageAsset.Status.PROCESSING)
+        self.assertEqual(
+            {path for bucket, path in self.supabase.objects if bucket == "upload_staging"},
+            {f"{self.guide.id}/{waiting['id']}", f"{self.guide.id}/in-flight"},
+        )
+
+    def test_list_returns_thumbnails_with_one_query(self):
+        """ExperienceListSerializer resolves every cover photo's thumbnail in a single query."""
+        print("Testing experience list thumbnails")
+        from Experiences.serializers import ExperienceListSerializer
+
+        urls = [self._upload(photo_upload(400, 300)).data["url"] for _ in range(3)]
+        for index, url in enumerate(urls + ["https://example.com/legacy.jpg"]):
+            Experience.objects.create(guide=self.guide, title=f"Experience {index}", description="d", photos=[url])
+
+        experiences = list(Experience.objects.select_related("guide", "location").order_by("title"))
+        with self.assertNumQueries(1):
+            data = ExperienceListSerializer(experiences, many=True).data
+
+        for item, url in zip(data, urls):
+            asset = ImageAsset.objects.get(url=url)
+            self.assertEqual(item["thumbnail"], asset.variants["thumbnail"])
+        self.assertIsNone(data[3]["thumbnail"])
+
+
+class ImageCleanupTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username="traveler", password="pass")
+        self.client.force_authenticate(user=self.user)
+
+        self.supabase = FakeSupabase()
+        for target in ("Pictures.utils.supabase", "Pictures.tasks.supabase"):
+            patcher = patch(target, self.supabase)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _upload(self, url_name):
+        return self.client.post(reverse(url_name), {"image": photo_upload(400, 300)}, format="multipart").data
+
+    def _keys(self, bucket):
+        return {image_key(path) for stored_bucket, path in self.supabase.objects if stored_bucket == bucket}
+
+    def _stored_paths(self):
+        return set(self.supabase.objects)
+
+    def _files(self, image):
+        return [(bucket, path) for bucket, path in self.supabase.objects if image["id"] in path]
+
+    def test_profile_replacement_cleans_up_in_one_batched_call(self):
+        """Replacing a profile picture queues the cleanup; the job removes every old file in one call."""
+        print("Testing background removal of replaced profile pictures")
+        first = self._upload("upload-profile-image")
+        with patch("Pictures.utils.async_task") as queued, self.captureOnCommitCallbacks(execute=True):
+            second = self._upload("upload-profile-image")
+
+        # Nothing was removed during the request.
+        self.assertEqual(self.supabase.remove_calls, [])
+        queued.assert_called_once_with(
+            "Pictures.tasks.remove_replaced_images", str(self.user.id), "profile_pictures", second["id"]
+        )
+
+        summary = tasks.remove_replaced_images(str(self.user.id), "profile_pictures", second["id"])
+
+        self.assertEqual(summary["removed"], len(SIZES) * 2)
+        self.assertEqual(len(self.supabase.remove_calls), 1)
+        self.assertEqual(self._keys("profile_pictures"), {f"{self.user.id}/{second['id']}"})
+        self.assertFalse(ImageAsset.objects.filter(id=first["id"]).exists())
+
+        # A late run for the first upload must not delete the newer picture.
+        tasks.remove_replaced_images(str(self.user.id), "profile_pictures", first["id"])
+        self.assertEqual(self._keys("profile_pictures"), {f"{self.user.id}/{second['id']}"})
+
+    @override_settings(PICTURES_INLINE_MAX_BYTES=1024)
+    def test_staged_replacement_removes_old_picture_only_once_ready(self):
+        """A large new profile picture replaces the old one only after the worker has made it READY."""
+        print("Testing staged profile replacement waits for processing")
+        old = self.client.post(
+            reverse("upload-profile-image"), {"image": photo_upload(40, 30)}, format="multipart"
+        ).data
+        with patch("Pictures.utils.async_task") as queued, self.captureOnCommitCallbacks(execute=True):
+            broken = self._upload("upload-profile-image")
+            ready = self._upload("upload-profile-image")
+        self.assertEqual(
+            [call.args[0] for call in queued.call_args_list], ["Pictures.tasks.process_image_asset"] * 2
+        )
+
+        # The first staged original turns out to be undecodable.
+        self.supabase.objects[("upload_staging", f"{self.user.id}/{broken['id']}")] = b"not an image"
+        with patch("Pictures.tasks.async_task") as queued, self.captureOnCommitCallbacks(execute=True):
+            tasks.process_image_asset(broken["id"], True)
+        queued.assert_not_called()
+        self.assertIn(f"{self.user.id}/{old['id']}", self._keys("profile_pictures"))
+
+        with patch("Pictures.tasks.async_task") as queued, self.captureOnCommitCallbacks(execute=True):
+            tasks.process_image_asset(ready["id"], True)
+        queued.assert_called_once_with(
+            "Pictures.tasks.remove_replaced_images", str(self.user.id), "profile_pictures", ready["id"]
+        )
+
+    def test_replacement_keeps_files_of_an_upload_still_in_progress(self):
+        """Files stored after the kept image was created survive, even before their asset is visible."""
+        print("Testing replaced image cleanup spares in-flight uploads")
+        first = self._upload("upload-profile-image")
+        second = self._upload("upload-profile-image")
+        # A third upload has written its files but its asset row isn't committed yet.
+        in_flight = f"{self.user.id}/in-flight"
+        self.supabase.from_("profile_pictures").upload(f"{in_flight}-full.jpg", b"new")
+
+        tasks.remove_replaced_images(str(self.user.id), "profile_pictures", second["id"])
+
+        self.assertEqual(self._keys("profile_pictures"), {f"{self.user.id}/{second['id']}", in_flight})
+        self.assertFalse(ImageAsset.objects.filter(id=first["id"]).exists())
+
+    def test_rejected_inline_image_leaves_no_asset(self):
+        """An image refused while rendering in the request doesn't leave a PROCESSING asset behind."""
+        print("Testing rejected inline uploads are not recorded")
+        with patch("Pictures.images.MAX_SOURCE_PIXELS", 1000):
+            response = self.client.post(
+                reverse("upload-experience-image"), {"image": photo_upload(400, 300)}, format="multipart"
+            )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ImageAsset.objects.exists())
+        self.assertEqual(self.supabase.objects, {})
+
+    def test_saving_a_url_marks_its_asset_attached(self):
+        """Profiles and experiences saving an uploaded URL mark the asset as in use."""
+        print("Testing image attach state")
+        picture = self._upload("upload-profile-image")
+        photo = self._upload("upload-experience-image")
+        self.assertFalse(ImageAsset.objects.filter(attached_at__isnull=False).exists())
+
+        self.user.profile_picture = picture["url"]
+        self.user.save()
+        Experience.objects.create(guide=self.user, title="Hike", description="d", photos=[photo["url"]])
+
+        self.assertEqual(ImageAsset.objects.filter(attached_at__isnull=False).count(), 2)
+
+    def test_garbage_collector_collects_only_images_no_longer_used(self):
+        """Detached images go after the grace period; drafts are kept until the unattached expiry."""
+        print("Testing orphaned image collection")
+        kept, dropped, draft, expired = (self._upload("upload-experience-image") for _ in range(4))
+        experience = Experience.objects.create(
+            guide=self.user, title="Hike", description="d", photos=[kept["url"], dropped["url"]]
+        )
+        experience.photos = [kept["url"]]
+        experience.save()
+        ImageAsset.objects.filter(id__in=[draft["id"], expired["id"]]).update(
+            created_at=timezone.now() - timedelta(days=3)
+        )
+        ImageAsset.objects.filter(id=expired["id"]).update(created_at=timezone.now() - timedelta(days=31))
+
+        expired_paths = sorted(path for _, path in self._files(expired))
+
+        # The first run notices the dropped photo is unused but keeps it for the grace period.
+        summary = tasks.collect_orphaned_images()
+        self.assertEqual((summary["checked"], summary["orphans"]), (4, 1))
+        self.assertEqual(
+            [(bucket, sorted(paths)) for bucket, paths in self.supabase.remove_calls],
+            [("experience_pictures", expired_paths)],
+        )
+        self.assertIsNotNone(ImageAsset.objects.get(id=dropped["id"]).detached_at)
+
+        ImageAsset.objects.filter(id=dropped["id"]).update(detached_at=timezone.now() - timedelta(days=2))
+        summary = tasks.collect_orphaned_images()
+
+        self.assertEqual(summary["removed"], len(SIZES) * 2)
+        self.assertEqual(self._keys("experience_pictures"), {
+            f"{self.user.id}/{kept['id']}", f"{self.user.id}/{draft['id']}",
+        })
+        self.assertEqual(set(ImageAsset.objects.values_list("id", flat=True)), {
+            uuid.UUID(kept["id"]), uuid.UUID(draft["id"]),
+        })
+
+    def test_garbage_collector_pages_across_runs(self):
+        """Each run checks a bounded batch, starting with the images checked least recently."""
+        print("Testing orphaned image collection in pages")
+        images = [self._upload("upload-experience-image") for _ in range(3)]
+        Experience.objects.create(guide=self.user, title="Hike", description="d", photos=[i["url"] for i in images])
+
+        self.assertEqual(tasks.collect_orphaned_images(batch_size=2)["checked"], 2)
+        self.assertEqual(ImageAsset.objects.filter(checked_at__isnull=True).count(), 1)
+        tasks.collect_orphaned_images(batch_size=2)
+
+        self.assertFalse(ImageAsset.objects.filter(checked_at__isnull=True).exists())
+
+    def test_garbage_collector_dry_run_changes_nothing(self):
+        """A dry run reports the orphans without touching storage or assets."""
+        print("Testing orphaned image collection dry run")
+        photo = self._upload("upload-experience-image")
+        self._upload("upload-experience-image")
+        Experience.objects.create(guide=self.user, title="Hike", description="d", photos=[photo["url"]])
+        ImageAsset.objects.update(created_at=timezone.now() - timedelta(days=31))
+        stored = self._stored_paths()
+
+        summary = tasks.collect_orphaned_images(dry_run=True, max_orphan_ratio=1)
+
+        self.assertEqual(summary["orphans"], 1)
+        self.assertEqual(summary["removed"], 0)
+        self.assertEqual(self._stored_paths(), stored)
+        self.assertEqual(ImageAsset.objects.count(), 2)
+        self.assertFalse(ImageAsset.objects.filter(checked_at__isnull=False).exists())
+
+    def test_garbage_collector_aborts_when_references_look_wrong(self):
+        """Nothing is deleted when no image is used at all, or when too many look orphaned."""
+        print("Testing orphaned image collection safety guard")
+        photo = self._upload("upload-experience-image")
+        for _ in range(2):
+            self._upload("upload-experience-image")
+        ImageAsset.objects.update(created_at=timezone.now() - timedelta(days=31))
+        stored = self._stored_paths()
+
+        # No profile or experience uses any image.
+        self.assertTrue(tasks.collect_orphaned_images()["aborted"])
+        self.assertEqual(self._stored_paths(), stored)
+
+        # Two of three images orphaned is over the default ratio, but within a looser one.
+        Experience.objects.create(guide=self.user, title="Hike", description="d", photos=[photo["url"]])
+        self.assertTrue(tasks.collect_orphaned_images()["aborted"])
+        self.assertEqual(self._stored_paths(), stored)
+
+        summary = tasks.collect_orphaned_images(max_orphan_ratio=0.8)
+        self.assertFalse(summary["aborted"])
+        self.assertEqual(summary["removed"], len(SIZES) * 2 * 2)
+
+
+class StorageStandInHandler(BaseHTTPRequestHandler):
+    """Accepts Supabase storage uploads, reading bodies in small chunks and keeping only their size."""
+    def do_POST(self):
+        remaining = int(self.headers["Content-Length"])
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 64 * 1024)))
+        self.server.uploads[self.path] = int(self.headers["Content-Length"])
+
+        body = json.dumps({"Key": self.path.split("/object/", 1)[1]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def padded_photo_upload(total_bytes):
+    """A valid JPEG padded with trailing bytes (ignored by decoders) to `total_bytes`."""
+    buffer = BytesIO()
+    Image.new("RGB", (64, 48), (200, 40, 40)).save(buffer, "JPEG")
+    data = buffer.getvalue()
+    return SimpleUploadedFile("large.jpg", data + b"\0" * (total_bytes - len(data)), content_type="image/jpeg")
+
+
+@override_settings(PICTURES_MAX_UPLOAD_BYTES=32 * 1024 * 1024)
+class StreamingUploadTests(TestCase):
+    def setUp(self):
+        self.guide = User.objects.create_user(username="guide", password="pass", role=User.Role.GUIDE)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StorageStandInHandler)
+        self.server.uploads = {}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        client = create_client(f"http://127.0.0.1:{self.server.server_port}", supabase_client.SUPABASE_KEY)
+        patcher = patch("Pictures.utils.supabase", client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _request(self, image):
+        request = APIRequestFactory().post("/pictures/upload/experience/", {"image": image}, format="multipart")
+        force_authenticate(request, user=self.guide)
+        return request
+
+    def test_large_upload_streams_with_bounded_memory(self):
+        """A 24 MB upload reaches storage in full while the request allocates only a few MB."""
+        print("Testing streamed uploads stay within a memory ceiling")
+        size = 24 * 1024 * 1024
+        # Build the multipart body first so only the server-side handling is measured.
+        request = self._request(padded_photo_upload(size))
+
+        tracemalloc.start()
+        try:
+            with patch("Pictures.utils.async_task"):
+                response = upload_experience_image(request)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(response.status_code, 202)
+        [(path, received)] = self.server.uploads.items()
+        self.assertTrue(path.startswith("/storage/v1/object/upload_staging/"))
+        self.assertGreater(received, size)
+        self.assertLess(peak, 4 * 1024 * 1024)
+
+    @override_settings(PICTURES_MAX_UPLOAD_BYTES=1024 * 1024)
+    def test_oversized_upload_is_refused(self):
+        """Bodies over the limit get 413 and nothing is sent to storage."""
+        print("Testing upload size limit")
+        response = upload_experience_image(self._request(padded_photo_upload(2 * 1024 * 1024)))
+
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.server.uploads, {})
+
+    @override_settings(PICTURES_MAX_UPLOAD_BYTES=1024 * 1024)
+    def test_size_limit_holds_while_parsing(self):
+        """A file that slips past the Content-Length check is stopped once it passes the limit."""
+        print("Testing upload size limit while parsing")
+        # Within the multipart allowance of the header check, but over the limit itself.
+        request = self._request(padded_photo_upload(1024 * 1024 + 16 * 1024))
+
+        response = upload_experience_image(request)
+
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(self.server.uploads, {})
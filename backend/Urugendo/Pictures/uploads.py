@@ -0,0 +1,78 @@
+"""
+Size limits for image uploads, enforced while the request body is parsed.
+
+A request whose Content-Length already exceeds PICTURES_MAX_UPLOAD_BYTES is
+refused before any of its body is read. Otherwise MaxSizeUploadHandler counts
+each file's bytes as Django parses them and stops at the limit, so an
+oversized file is never buffered in full, in memory or on disk.
+
+Usage:
+    @api_view(['POST'])
+    @limit_upload_size
+    def upload_view(request): ...
+"""
+from functools import wraps
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+from rest_framework import status
+from rest_framework.response import Response
+
+# Room for the multipart boundaries and form fields around the file itself.
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    """
+    Pass chunks on to the next handler until a file grows past `max_bytes`,
+    then stop the upload and set `exceeded`.
+    """
+    def __init__(self, request=None, max_bytes=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes
+        self.received = 0
+        self.exceeded = False
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            self.exceeded = True
+            # Drain (and drop) the rest of the body so the client gets our response.
+            raise StopUpload(connection_reset=False)
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def _too_large(max_bytes):
+    return Response(
+        {"error": f"Images can be at most {max_bytes // (1024 * 1024)} MB."},
+        status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    )
+
+
+def limit_upload_size(view):
+    """Refuse uploads larger than PICTURES_MAX_UPLOAD_BYTES with 413 (apply below @api_view)."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        max_bytes = settings.PICTURES_MAX_UPLOAD_BYTES
+        try:
+            content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            content_length = 0
+        if content_length > max_bytes + MULTIPART_OVERHEAD:
+            return _too_large(max_bytes)
+
+        # Must run before request.data is first read.
+        handler = MaxSizeUploadHandler(request._request, max_bytes)
+        request.upload_handlers.insert(0, handler)
+
+        response = view(request, *args, **kwargs)
+        if handler.exceeded:
+            return _too_large(max_bytes)
+        return response
+    return wrapper
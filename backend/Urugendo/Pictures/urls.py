@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import upload_profile_image, upload_experience_image
+from .views import upload_profile_image, upload_experience_image, image_asset_detail
 
 urlpatterns = [
     path('upload/profile/', upload_profile_image, name='upload-profile-image'),
     path('upload/experience/', upload_experience_image, name='upload-experience-image'),
-]
\ No newline at end of file
+    path('assets/<uuid:asset_id>/', image_asset_detail, name='image-asset-detail'),
+]
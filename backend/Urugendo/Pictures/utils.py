@@ -1,41 +1,130 @@
 import uuid
+from django.conf import settings
+from django.db import transaction
+from django_q.tasks import async_task
+from .images import FORMATS, SIZES, InvalidImage, check_image, render_variants
+from .models import ImageAsset
 from .supabase_client import supabase
 
+# Variants never change once written (a new image gets a new path), so browsers may cache them for a year.
+VARIANT_CACHE_CONTROL = "31536000"
+
+
+def variant_path(user_id, image_id, size, fmt):
+    """Storage path of one variant, e.g. "<user>/<image>-card.webp"."""
+    return f"{user_id}/{image_id}-{size}.{FORMATS[fmt][1]}"
+
+
+def image_key(path):
+    """
+    The part of a storage path shared by all variants of one image:
+    "<user>/<image>-card.webp" -> "<user>/<image>". Paths of images uploaded
+    before variants existed ("<user>/<image>.jpg") lose only their extension.
+    """
+    stem = path.rsplit(".", 1)[0]
+    for size in SIZES:
+        if stem.endswith(f"-{size}"):
+            return stem[:-len(size) - 1]
+    return stem
+
+
+def stream_to_storage(bucket_name, path, uploaded_file):
+    """
+    Upload a Django UploadedFile without reading it into memory. Files Django
+    spooled to disk (above FILE_UPLOAD_MAX_MEMORY_SIZE) are sent from their
+    temporary file, which the HTTP client streams in 64 KiB chunks; smaller
+    ones are already in memory and are sent as they are.
+    """
+    options = {"content-type": uploaded_file.content_type or "application/octet-stream"}
+    storage = supabase.storage.from_(bucket_name)
+    if hasattr(uploaded_file, 'temporary_file_path'):
+        with open(uploaded_file.temporary_file_path(), 'rb') as source:
+            storage.upload(path, source, options)
+    else:
+        uploaded_file.seek(0)
+        storage.upload(path, uploaded_file.read(), options)
+
+
+def store_variants(asset, source):
+    """
+    Render the variants of `source`, upload them to the asset's bucket and
+    mark the asset READY. The caller saves the asset.
+    Raises Pictures.images.InvalidImage before anything is uploaded if the source can't be decoded.
+    """
+    storage = supabase.storage.from_(asset.bucket)
+    variants = {}
+    for variant in render_variants(source):
+        path = variant_path(asset.owner_id, asset.id, variant.size, variant.format)
+        # upsert so a retried worker run can overwrite what a failed one left behind
+        storage.upload(path, variant.data, {
+            "content-type": variant.content_type, "cache-control": VARIANT_CACHE_CONTROL, "upsert": "true",
+        })
+        entry = variants.setdefault(variant.size, {"width": variant.width, "height": variant.height})
+        entry[variant.format] = storage.get_public_url(path)
+
+    asset.variants = variants
+    asset.status = ImageAsset.Status.READY
+    asset.error = ""
+
+
 def upload_image_to_supabase(image_file, bucket_name, user_id, delete_old=False):
     """
-    Upload an image to Supabase storage and optionally delete old images after successful upload.
+    Upload an image to Supabase storage as resized WebP and JPEG variants
+    (see Pictures.images) and optionally delete old images after successful upload.
+
+    The asset row is saved PROCESSING before any file is written, so the
+    cleanup jobs in Pictures.tasks never see files without their asset.
+    Files up to PICTURES_INLINE_MAX_BYTES are processed during the request.
+    Larger ones have their header checked (Pictures.images.check_image), are
+    staged in PICTURES_STAGING_BUCKET and processed by
+    Pictures.tasks.process_image_asset; their asset stays PROCESSING until then.
+    With delete_old, the user's other images in the bucket are removed by
+    Pictures.tasks.remove_replaced_images once the new one is READY: queued
+    from here for inline uploads, and by process_image_asset for staged ones,
+    so an upload that fails never leaves the user without their old image.
 
     Args:
-        image_file: Django InMemoryUploadedFile
+        image_file: Django UploadedFile
         bucket_name: str, Supabase bucket name
         user_id: str, user identifier for folder
         delete_old: bool, whether to delete previous images after upload
 
     Returns:
-        public_url (str): URL of the uploaded image
-    """
-    # Generate unique image ID and path
-    image_id = str(uuid.uuid4())
-    file_ext = image_file.name.split('.')[-1]
-    file_path = f"{user_id}/{image_id}.{file_ext}"
+        ImageAsset: the saved asset; `asset.url` is the full-size JPEG URL
 
-    # Upload new image
-    bytes_data = image_file.read()
-    supabase.storage.from_(bucket_name).upload(file_path, bytes_data)
+    Raises:
+        Pictures.images.InvalidImage: the file isn't an image that can be processed; nothing is stored
+    """
+    # Generate unique image ID; every variant path is derived from it
+    image_id = uuid.uuid4()
+    asset = ImageAsset(
+        id=image_id, owner_id=user_id, bucket=bucket_name,
+        url=supabase.storage.from_(bucket_name).get_public_url(variant_path(user_id, image_id, "full", "jpeg")),
+    )
 
-    public_url = supabase.storage.from_(bucket_name).get_public_url(file_path)
+    if image_file.size > settings.PICTURES_INLINE_MAX_BYTES:
+        # Refuse what the worker would fail on before the upload is staged and answered with 202
+        check_image(image_file)
+        # Stage the original (metadata and all) privately; the worker deletes it when done
+        asset.staging_path = f"{user_id}/{image_id}"
+        asset.save()
+        stream_to_storage(settings.PICTURES_STAGING_BUCKET, asset.staging_path, image_file)
+        transaction.on_commit(lambda: async_task("Pictures.tasks.process_image_asset", image_id, delete_old))
+        return asset
+    else:
+        asset.save()
+        try:
+            store_variants(asset, image_file)
+        except InvalidImage:
+            asset.delete()
+            raise
+        # Left PROCESSING if storage fails; Pictures.tasks.sweep_stalled_uploads marks it FAILED
+        asset.save(update_fields=['status', 'variants', 'error', 'updated_at'])
 
-    # Delete old images if requested
+    # The asset is READY: delete old images if requested, in the background once it is committed
     if delete_old:
-        try:
-            existing_files = supabase.storage.from_(bucket_name).list(user_id)
-            # Remove any file that is not the newly uploaded one
-            for file in existing_files:
-                existing_file_path = f"{user_id}/{file['name']}"
-                if existing_file_path != file_path:
-                    supabase.storage.from_(bucket_name).remove([existing_file_path])
-        except Exception as e:
-            # Not fatal, just log
-            print(f"Could not delete previous images: {e}")
-
-    return public_url
\ No newline at end of file
+        transaction.on_commit(lambda: async_task(
+            "Pictures.tasks.remove_replaced_images", str(user_id), bucket_name, str(image_id)
+        ))
+
+    return asset
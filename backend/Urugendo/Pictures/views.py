@@ -2,26 +2,67 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from .images import InvalidImage
+from .models import ImageAsset
+from .uploads import limit_upload_size
 from .utils import upload_image_to_supabase
-from .serializers import ProfileImageUploadSerializer, ExperienceImageUploadSerializer
+from .serializers import ProfileImageUploadSerializer, ExperienceImageUploadSerializer, ImageAssetSerializer
 from .supabase_client import supabase
 import uuid
 
 
+def _asset_response(request, asset):
+    """
+    201 with the variants once processed; 202 while a worker is still resizing a large upload,
+    with a Location header to poll (image_asset_detail) until the asset is READY or FAILED.
+    """
+    if asset.status == ImageAsset.Status.READY:
+        return Response(ImageAssetSerializer(asset).data, status=status.HTTP_201_CREATED)
+    location = request.build_absolute_uri(reverse('image-asset-detail', args=[asset.id]))
+    return Response(ImageAssetSerializer(asset).data, status=status.HTTP_202_ACCEPTED, headers={'Location': location})
+
+
+# Uploaded image status
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def image_asset_detail(request, asset_id):
+    """
+    GET /pictures/assets/{id}/
+    Status and variants of one of the caller's uploads; `error` says why a FAILED one couldn't be processed.
+    """
+    asset = get_object_or_404(ImageAsset, id=asset_id, owner=request.user)
+    return Response(ImageAssetSerializer(asset).data)
+
+
 # Profile Image Upload
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@limit_upload_size
 def upload_profile_image(request):
+    """
+    POST /pictures/upload/profile/   (multipart, field `image`)
+    201: the image is stored. The body keeps the `url` key (the full-size JPEG to save as
+         the profile picture) and adds `id`, `status` ("READY"), `variants` and `error`.
+    202: files over PICTURES_INLINE_MAX_BYTES are resized in the background. The body is the
+         same with `status` "PROCESSING"; `url` only resolves once the image is READY. Poll
+         the Location header (GET /pictures/assets/{id}/) until `status` is READY, or FAILED
+         with the reason in `error`.
+    400: not an image, or one too large to process. 413: the upload exceeds PICTURES_MAX_UPLOAD_BYTES.
+    """
     serializer = ProfileImageUploadSerializer(data=request.data)
     if serializer.is_valid():
         image_file = serializer.validated_data['image']
         user_id = str(request.user.id)
 
         try:
-            public_url = upload_image_to_supabase( image_file=image_file,
+            asset = upload_image_to_supabase( image_file=image_file,
                 bucket_name='profile_pictures', user_id=user_id, delete_old=True
             )
-            return Response({"url": public_url}, status=status.HTTP_201_CREATED)
+            return _asset_response(request, asset)
+        except InvalidImage as e:
+            return Response({"image": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -30,18 +71,31 @@ def upload_profile_image(request):
 # Experience Image Upload
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@limit_upload_size
 def upload_experience_image(request):
+    """
+    POST /pictures/upload/experience/   (multipart, field `image`)
+    201: the image is stored. The body keeps the `url` key (the full-size JPEG to save as
+         an experience photo) and adds `id`, `status` ("READY"), `variants` and `error`.
+    202: files over PICTURES_INLINE_MAX_BYTES are resized in the background. The body is the
+         same with `status` "PROCESSING"; `url` only resolves once the image is READY. Poll
+         the Location header (GET /pictures/assets/{id}/) until `status` is READY, or FAILED
+         with the reason in `error`.
+    400: not an image, or one too large to process. 413: the upload exceeds PICTURES_MAX_UPLOAD_BYTES.
+    """
     serializer = ExperienceImageUploadSerializer(data=request.data)
     if serializer.is_valid():
         image_file = serializer.validated_data['image']
         user_id = str(request.user.id)
 
         try:
-            public_url = upload_image_to_supabase(
+            asset = upload_image_to_supabase(
                 image_file=image_file, bucket_name='experience_pictures',
                 user_id=user_id, delete_old=False
             )
-            return Response({"url": public_url}, status=status.HTTP_201_CREATED)
+            return _asset_response(request, asset)
+        except InvalidImage as e:
+            return Response({"image": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
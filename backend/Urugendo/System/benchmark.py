@@ -0,0 +1,523 @@
+"""
+Query-count, latency and response-size benchmarks for the API.
+
+seed_dataset() builds a synthetic dataset, run_benchmarks() requests every
+endpoint in ENDPOINTS through the test client and check_budgets() compares
+the results with the checked-in baseline (benchmark_baseline.json).
+Every API route and method is either in ENDPOINTS or in NOT_BENCHMARKED
+with the reason; System.tests compares both with the URL resolver.
+Query counts and response sizes are always enforced. Latency depends on the
+machine, so p95 budgets are only checked on request (--latency-tolerance).
+Everything runs inside a transaction that is rolled back, with external
+services (Gmail, Calendar, Supabase, Google Maps, Azure) stubbed out.
+
+Usage:
+    python manage.py benchmark_endpoints --scale 20 --iterations 10
+    python manage.py benchmark_endpoints --latency-tolerance 1.5
+"""
+import io
+import itertools
+import json
+import math
+import random
+import time
+import uuid
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from urllib.parse import urlsplit
+
+import requests
+from PIL import Image
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, resolve
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from Booking.models import Booking
+from Choices import registry
+from Choices.models import PaymentMethod, TravelPreference, Language, PaymentStatus, MobileProvider, PayoutStatus
+from Experiences.models import Experience, ExperienceSlot
+from Location.models import Location
+from Payment.models import Payment, Payout
+from Pictures.models import ImageAsset
+from Profile.models import Tourist, Guide, Admin
+from Review.models import Review
+from System.models import SystemInfo
+from Utils.system_info import invalidate_system_settings
+
+User = get_user_model()
+
+BASELINE_PATH = Path(__file__).resolve().parent / "benchmark_baseline.json"
+
+# Each call gives the writes below a date no earlier request used, so creating slots never clashes.
+_fresh_day = itertools.count(60)
+_fresh_week = itertools.count()
+
+
+def _new_slot():
+    return {"date": str(timezone.localdate() + timedelta(days=next(_fresh_day))), "start_time": "09:00",
+            "end_time": "12:00", "capacity": 10, "price": "25.00"}
+
+
+def _new_week_of_slots():
+    start = timezone.localdate() + timedelta(days=365 + 7 * next(_fresh_week))
+    return {"recurrence": {"start_date": str(start), "end_date": str(start + timedelta(days=6)),
+                           "weekdays": [0, 2, 4], "start_time": "09:00", "end_time": "12:00",
+                           "capacity": 10, "price": "25.00"}}
+
+
+def _new_image():
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), (200, 120, 40)).save(buffer, "JPEG")
+    return {"image": SimpleUploadedFile("benchmark.jpg", buffer.getvalue(), content_type="image/jpeg")}
+
+
+# (name, method, path, role, body). Paths are formatted with the ids returned by seed_dataset().
+# A callable body is called for every request, for writes that need a fresh slot date or
+# upload each time; bodies holding a file are sent as multipart, the others as JSON.
+ENDPOINTS = [
+    ("welcome", "get", "/", None, None),
+    ("users-list", "get", "/users/", "admin", None),
+    ("users-me", "get", "/users/me/", "tourist", None),
+    ("users-detail", "get", "/users/{tourist_id}/", "admin", None),
+    ("users-update", "patch", "/users/{tourist_id}/", "tourist", {"first_name": "Tourist"}),
+    ("calendar-status", "get", "/users/calendar/status/", "guide", None),
+    ("profiles-list", "get", "/profiles/get_profiles/", "admin", None),
+    ("profiles-detail", "get", "/profiles/{guide_id}/", "tourist", None),
+    ("profiles-update", "patch", "/profiles/{guide_id}/", "guide", {"bio": "Local guide"}),
+    ("pictures-upload-profile", "post", "/pictures/upload/profile/", "tourist", _new_image),
+    ("pictures-upload-experience", "post", "/pictures/upload/experience/", "guide", _new_image),
+    ("pictures-asset-detail", "get", "/pictures/assets/{asset_id}/", "guide", None),
+    ("experiences-list", "get", "/experiences/", "tourist", None),
+    ("experiences-create", "post", "/experiences/", "guide",
+     {"title": "Benchmark walk", "description": "Benchmark experience", "location_id": "{location_id}"}),
+    ("experiences-detail", "get", "/experiences/{experience_id}/", "tourist", None),
+    ("experiences-update", "patch", "/experiences/{experience_id}/", "guide", {"is_active": True}),
+    ("experience-availability", "get", "/experiences/availability/?experience={experience_id}", "tourist", None),
+    ("experiences-search", "get", "/experiences/search/?q=experience", "tourist", None),
+    ("experiences-nearby", "get", "/experiences/nearby/?lat=-1.9536&lng=30.0928", "tourist", None),
+    ("experience-slots-list", "get", "/experiences/{experience_id}/slots/", "tourist", None),
+    ("experience-slots-create", "post", "/experiences/{experience_id}/slots/", "guide", _new_slot),
+    ("experience-slots-bulk", "post", "/experiences/{experience_id}/slots/bulk/", "guide", _new_week_of_slots),
+    ("experience-slots-detail", "get", "/experiences/{experience_id}/slots/{slot_id}/", "tourist", None),
+    ("experience-slots-update", "patch", "/experiences/{experience_id}/slots/{slot_id}/", "guide",
+     {"price": "25.00"}),
+    ("all-slots-list", "get", "/experiences/all_slots/", "guide", None),
+    ("all-slots-detail", "get", "/experiences/all_slots/{slot_id}/", "guide", None),
+    ("bookings-list", "get", "/bookings/", "tourist", None),
+    ("bookings-list-guide", "get", "/bookings/", "guide", None),
+    ("bookings-list-admin", "get", "/bookings/", "admin", None),
+    ("bookings-create", "post", "/bookings/", "tourist", {"slot_id": "{open_slot_id}", "guests": 1}),
+    ("bookings-detail", "get", "/bookings/{booking_id}/", "tourist", None),
+    ("bookings-by-slot", "get", "/bookings/slot/{slot_id}/", "guide", None),
+    ("bookings-upcoming", "get", "/bookings/upcoming/", "tourist", None),
+    ("bookings-past", "get", "/bookings/past/", "tourist", None),
+    ("payments-list", "get", "/payments/", "tourist", None),
+    ("payments-detail", "get", "/payments/{payment_id}/", "tourist", None),
+    ("payouts-list", "get", "/payments/payouts/", "guide", None),
+    ("payouts-list-admin", "get", "/payments/payouts/", "admin", None),
+    ("payouts-detail", "get", "/payments/payouts/{payout_id}/", "guide", None),
+    ("payouts-update", "patch", "/payments/payouts/{payout_id}/", "guide", {"account_name": "Benchmark Guide"}),
+    ("payouts-mark-paid", "post", "/payments/payouts/{payout_id}/mark-paid/", "admin", None),
+    ("payouts-summary", "get", "/payments/payouts/summary/", "guide", None),
+    ("choices-payment-methods", "get", "/choices/payments/", "tourist", None),
+    ("choices-travel-preferences", "get", "/choices/travel_preferences/", "tourist", None),
+    ("choices-languages", "get", "/choices/languages/", "tourist", None),
+    ("choices-payment-statuses", "get", "/choices/payment_statuses/", "tourist", None),
+    ("choices-mobile-providers", "get", "/choices/mobile_providers/", "tourist", None),
+    ("choices-payout-statuses", "get", "/choices/payout_statuses/", "tourist", None),
+    ("reviews-list", "get", "/reviews/", "tourist", None),
+    ("reviews-detail", "get", "/reviews/{review_id}/", "tourist", None),
+    ("reviews-update", "patch", "/reviews/{review_id}/", "tourist", {"comment": "Benchmark review"}),
+    ("locations-geocode", "post", "/locations/geocode/", "guide", {"place_name": "Kigali Convention Centre"}),
+    ("locations-reverse-geocode", "post", "/locations/reverse-geocode/", "guide",
+     {"latitude": -1.9536, "longitude": 30.0928}),
+    ("locations-save", "post", "/locations/save/", "guide",
+     {"place_name": "Kigali, Rwanda", "latitude": "-1.953600", "longitude": "30.092800"}),
+]
+
+_ONE_SHOT = "Changes state once; a repeated request measures only the refusal."
+_DELETE = "Deletes or deactivates a seeded row the other endpoints read."
+_PUT = "Same view code as the PATCH benchmarked for this route."
+
+# (view name, method) of the API routes left out of ENDPOINTS on purpose. The view name is
+# the URL name, or the view's dotted path for unnamed routes (see api_routes()).
+NOT_BENCHMARKED = {
+    ("api-root", "get"): "DRF's browsable index of the router's routes.",
+    ("register", "post"): "Password hashing dominates and is slow by design; sends mail.",
+    ("login", "post"): "Password hashing dominates and is slow by design.",
+    ("verify-email", "get"): "Needs a signed one-time token.",
+    ("resend-verification-email", "post"): "Sends the verification mail again.",
+    ("token_refresh", "post"): "simplejwt's view; needs a refresh token.",
+    ("calendar-authorize", "get"): "Redirects into Google's OAuth consent flow.",
+    ("calendar-callback", "get"): "Google's OAuth redirect target; needs an authorization code.",
+    ("calendar-disconnect", "delete"): "Revokes the Google token; " + _ONE_SHOT,
+    ("user-list", "post"): "Always 405; accounts are created through register.",
+    ("user-detail", "put"): _PUT,
+    ("user-detail", "delete"): _DELETE,
+    ("profile-list", "post"): "One profile per user; " + _ONE_SHOT,
+    ("profile-detail", "put"): _PUT,
+    ("profile-detail", "delete"): _DELETE,
+    ("experience-detail", "put"): _PUT,
+    ("experience-detail", "delete"): _DELETE,
+    ("experience-slot-detail", "put"): _PUT,
+    ("experience-slot-detail", "delete"): _DELETE,
+    ("booking-detail", "put"): "Clients change bookings through the status and cancel routes.",
+    ("booking-detail", "patch"): "Clients change bookings through the status and cancel routes.",
+    ("booking-detail", "delete"): "Cancels the booking; " + _ONE_SHOT,
+    ("booking-update-status", "patch"): "Status transitions; " + _ONE_SHOT,
+    ("payments-list", "post"): "Payments are created with their booking (bookings-create).",
+    ("payments-detail", "put"): "Payments change through the pay route.",
+    ("payments-detail", "patch"): "Payments change through the pay route.",
+    ("payments-detail", "delete"): _DELETE,
+    ("payments-pay", "post"): "Pays a pending booking; " + _ONE_SHOT,
+    ("payout-list", "post"): "One payout per booking; " + _ONE_SHOT,
+    ("payout-detail", "put"): _PUT,
+    ("payout-detail", "delete"): _DELETE,
+    ("review-list", "post"): "One review per traveler and experience; " + _ONE_SHOT,
+    ("review-detail", "put"): _PUT,
+    ("review-detail", "delete"): _DELETE,
+}
+
+_GEOCODE_RESPONSE = {
+    "status": "OK",
+    "results": [{
+        "formatted_address": "KG 2 Roundabout, Kigali, Rwanda",
+        "place_id": "benchmark-place",
+        "geometry": {"location": {"lat": -1.9536, "lng": 30.0928}},
+    }],
+}
+
+
+def _fake_http_request(session, method, url, *args, **kwargs):
+    """Answer outbound HTTP calls with canned payloads instead of hitting the network."""
+    if "maps.googleapis.com" in url:
+        payload = _GEOCODE_RESPONSE
+    elif "microsofttranslator.com" in url:
+        texts = kwargs.get("json") or [{"text": ""}]
+        targets = (kwargs.get("params") or {}).get("to") or ["en"]
+        targets = [targets] if isinstance(targets, str) else targets
+        payload = [
+            {
+                "language": "en",
+                "detectedLanguage": {"language": "en", "score": 1.0},
+                "translations": [{"text": item["text"], "to": lang} for lang in targets],
+            }
+            for item in texts
+        ]
+    else:
+        raise RuntimeError(f"Unexpected network call during benchmark: {method} {url}")
+
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = json.dumps(payload).encode()
+    return response
+
+
+@contextmanager
+def stub_external_services():
+    """Replace every external service the API talks to with an in-process fake."""
+    with ExitStack() as stack:
+        stack.enter_context(patch("requests.sessions.Session.request", _fake_http_request))
+        stack.enter_context(patch("Utils.google_clients.get_gmail_service", return_value=MagicMock()))
+        stack.enter_context(patch("Utils.calendar.get_calendar_service", return_value=MagicMock()))
+        storage = MagicMock()
+        storage.storage.from_.return_value.get_public_url.side_effect = lambda path: f"https://storage.test/{path}"
+        stack.enter_context(patch("Pictures.utils.supabase", storage))
+        yield
+
+
+def _seed_reference_data():
+    codes = {
+        PaymentStatus: ["PENDING", "COMPLETED", "FAILED", "REFUNDED"],
+        PayoutStatus: ["PENDING", "PROCESSING", "PAID", "FAILED"],
+    }
+    names = {
+        PaymentMethod: ["Mobile", "Credit", "Debit"],
+        TravelPreference: ["Adventure", "Cultural", "Relaxation", "Eco-Tourism", "Luxury"],
+        MobileProvider: ["MTN", "Airtel"],
+    }
+    for model, values in codes.items():
+        for code in values:
+            model.objects.get_or_create(code=code)
+    for model, values in names.items():
+        for name in values:
+            model.objects.get_or_create(name=name)
+    for name, code in [("English", "en"), ("French", "fr"), ("Kinyarwanda", "rw")]:
+        Language.objects.get_or_create(name=name, code=code)
+    SystemInfo.objects.get_or_create(key="PlatformFee", defaults={"value": "0.10"})
+    registry.clear()
+    invalidate_system_settings()
+
+
+def _make_users(prefix, count, role, password):
+    return User.objects.bulk_create([
+        User(
+            username=f"bench_{prefix}_{i}", email=f"bench_{prefix}_{i}@example.com", password=password,
+            role=role, first_name=prefix.title(), last_name=str(i), is_active=True, is_verified=True,
+        )
+        for i in range(count)
+    ])
+
+
+def seed_dataset(scale=20, seed=0):
+    """
+    Create a synthetic dataset. `scale` is the number of tourists; guides,
+    experiences, slots, bookings, payments, payouts and reviews grow with it.
+    The first admin, guide and tourist own enough rows to fill a page of
+    results and are the ones the benchmarks authenticate as.
+
+    Returns the users and ids the ENDPOINTS paths are formatted with.
+    """
+    rng = random.Random(seed)
+    _seed_reference_data()
+    password = make_password(None)
+    today = timezone.localdate()
+
+    admins = _make_users("admin", 1, User.Role.ADMIN, password)
+    guides = _make_users("guide", max(2, scale // 5), User.Role.GUIDE, password)
+    tourists = _make_users("tourist", max(2, scale), User.Role.TOURIST, password)
+
+    Admin.objects.bulk_create([Admin(user_id=user) for user in admins])
+    Guide.objects.bulk_create([Guide(user_id=user, phone_number="0780000002", bio="Local guide") for user in guides])
+    Tourist.objects.bulk_create([Tourist(user_id=user) for user in tourists])
+
+    location = Location.objects.create(
+        latitude=Decimal("-1.953600"), longitude=Decimal("30.092800"), place_name="Kigali, Rwanda",
+    )
+    preferences = registry.get_all(TravelPreference)
+    languages = registry.get_all(Language)
+
+    experiences = Experience.objects.bulk_create([
+        Experience(guide=guide, title=f"{guide.username} experience {i}", description="Benchmark experience",
+                   location=location)
+        for guide in guides for i in range(3)
+    ])
+    for experience in experiences:
+        experience.expertise.add(rng.choice(preferences))
+        experience.languages.add(rng.choice(languages))
+
+    slots = ExperienceSlot.objects.bulk_create([
+        ExperienceSlot(experience=experience, date=today + timedelta(days=day), capacity=20, remaining_slots=20,
+                       price=Decimal("25.00"))
+        for experience in experiences for day in range(-3, 4)
+    ])
+
+    booking_rows = []
+    for tourist in tourists:
+        for slot in rng.sample(slots, min(len(slots), 3 if tourist is not tourists[0] else 20)):
+            guests = rng.randint(1, 3)
+            past = slot.date < today
+            booking_rows.append(Booking(
+                traveler=tourist, slot=slot, guests=guests, experience_title=slot.experience.title,
+                price_per_guest=slot.price, total_price=slot.price * guests,
+                status=Booking.Status.COMPLETED if past else Booking.Status.CONFIRMED,
+            ))
+    bookings = Booking.objects.bulk_create(booking_rows)
+
+    completed_payment = registry.get_by_code(PaymentStatus, "COMPLETED")
+    mobile = registry.get_by_name(PaymentMethod, "Mobile")
+    mtn = registry.get_by_name(MobileProvider, "MTN")
+    payments = Payment.objects.bulk_create([
+        Payment(booking=booking, amount=booking.total_price, payment_method=mobile, payment_status=completed_payment,
+                provider=mtn)
+        for booking in bookings
+    ])
+
+    pending_payout = registry.get_by_code(PayoutStatus, "PENDING")
+    Payout.objects.bulk_create([
+        Payout(guide=booking.slot.experience.guide, booking=booking, amount=booking.total_price * Decimal("0.90"),
+               status=pending_payout)
+        for booking in bookings if booking.status == Booking.Status.COMPLETED
+    ])
+
+    Review.objects.bulk_create([
+        Review(traveler=booking.traveler, experience=booking.slot.experience, rating=rng.randint(1, 5),
+               comment="Benchmark review")
+        for booking in bookings if booking.status == Booking.Status.COMPLETED
+    ], ignore_conflicts=True)
+
+    tourist, guide = tourists[0], guides[0]
+    booking = next(b for b in bookings if b.traveler_id == tourist.id)
+    experience = next(e for e in experiences if e.guide_id == guide.id)
+    # Room for every bookings-create request, however many iterations run
+    open_slot = ExperienceSlot.objects.create(
+        experience=experience, date=today + timedelta(days=30), capacity=10000, remaining_slots=10000,
+        price=Decimal("25.00"),
+    )
+    review = Review.objects.filter(traveler=tourist).first() or Review.objects.create(
+        traveler=tourist, experience=experience, rating=5, comment="Benchmark review",
+    )
+    asset = ImageAsset.objects.create(
+        owner=guide, bucket="experience_pictures", url="https://storage.test/benchmark-full.jpg",
+        status=ImageAsset.Status.READY,
+    )
+    return {
+        "users": {"admin": admins[0], "guide": guide, "tourist": tourist},
+        "ids": {
+            "tourist_id": tourist.id,
+            "guide_id": guide.id,
+            "experience_id": experience.id,
+            "slot_id": next(s for s in slots if s.experience_id == experience.id).id,
+            "booking_id": booking.id,
+            "payment_id": next(p for p in payments if p.booking_id == booking.id).id,
+            "payout_id": Payout.objects.filter(guide=guide).values_list("id", flat=True).first(),
+            "open_slot_id": open_slot.id,
+            "review_id": review.id,
+            "location_id": location.id,
+            "asset_id": asset.id,
+        },
+    }
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def _format_body(body, ids):
+    """Fill the {id} placeholders of a JSON body's string values."""
+    if body is None:
+        return None
+    return {key: value.format(**ids) if isinstance(value, str) else value for key, value in body.items()}
+
+
+def run_benchmarks(dataset, iterations=10, endpoints=ENDPOINTS):
+    """
+    Request each endpoint `iterations` times (after one warm-up request)
+    and return {name: {status, queries, p50_ms, p95_ms, bytes}}.
+    """
+    results = {}
+    for name, method, path, role, body in endpoints:
+        client = APIClient()
+        if role:
+            client.force_authenticate(user=dataset["users"][role])
+        url = path.format(**dataset["ids"])
+
+        def request():
+            data = body() if callable(body) else _format_body(body, dataset["ids"])
+            if data is None:
+                return getattr(client, method)(url)
+            multipart = any(hasattr(value, "read") for value in data.values())
+            return getattr(client, method)(url, data, format="multipart" if multipart else "json")
+
+        request()
+        timings = []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - started) * 1000)
+
+        results[name] = {
+            "status": response.status_code,
+            "queries": len(queries),
+            "p50_ms": round(_percentile(timings, 50), 2),
+            "p95_ms": round(_percentile(timings, 95), 2),
+            "bytes": len(response.content),
+        }
+    return results
+
+
+def _view_name(url_name, callback):
+    if url_name:
+        return url_name
+    view = getattr(callback, "view_class", callback)
+    return f"{view.__module__}.{view.__qualname__}"
+
+
+_HTTP_METHODS = ("get", "post", "put", "patch", "delete")
+
+
+def _methods(callback):
+    # DRF adds "head" to a viewset's actions the first time it serves a request
+    if getattr(callback, "actions", None):
+        return set(callback.actions) & set(_HTTP_METHODS)
+    view = getattr(callback, "view_class", None)
+    if view is None:
+        return {"get"}
+    return {method for method in _HTTP_METHODS if hasattr(view, method)}
+
+
+def api_routes():
+    """
+    (view name, method) of every route the URLconf serves, apart from the admin site and
+    DRF's format-suffix duplicates. The view name is the URL name, or the view's dotted path.
+    """
+    routes = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                if pattern.namespace != "admin":
+                    walk(pattern.url_patterns)
+            elif "format" not in pattern.pattern.regex.groupindex:
+                name = _view_name(pattern.name, pattern.callback)
+                routes.update((name, method) for method in _methods(pattern.callback))
+
+    walk(get_resolver().url_patterns)
+    return routes
+
+
+def benchmarked_routes(endpoints=ENDPOINTS):
+    """(view name, method) of the routes the endpoints request."""
+    placeholder_ids = defaultdict(lambda: uuid.UUID(int=0))
+    routes = set()
+    for _, method, path, _, _ in endpoints:
+        match = resolve(urlsplit(path.format_map(placeholder_ids)).path)
+        routes.add((_view_name(match.url_name, match.func), method))
+    return routes
+
+
+def check_budgets(results, budgets, latency_tolerance=None):
+    """
+    Return a list of human-readable budget violations (empty when everything is within budget).
+    p95 latency is only checked when `latency_tolerance` is given, against max_p95_ms times it.
+    """
+    violations = []
+    for name, result in results.items():
+        if result["status"] >= 400:
+            violations.append(f"{name}: HTTP {result['status']}")
+        budget = budgets.get(name)
+        if budget is None:
+            violations.append(f"{name}: no budget in baseline")
+            continue
+        limits = {"queries": budget.get("max_queries"), "bytes": budget.get("max_bytes")}
+        if latency_tolerance is not None and "max_p95_ms" in budget:
+            limits["p95_ms"] = round(budget["max_p95_ms"] * latency_tolerance, 1)
+        for metric, limit in limits.items():
+            if limit is not None and result[metric] > limit:
+                violations.append(f"{name}: {metric} {result[metric]} > {limit}")
+    return violations
+
+
+def budgets_from_results(results, latency_headroom=5.0, size_headroom=1.5):
+    """Derive budgets from a run: exact query counts, generous latency and size headroom."""
+    return {
+        name: {
+            "max_queries": result["queries"],
+            "max_p95_ms": round(max(result["p95_ms"] * latency_headroom, 250.0), 1),
+            "max_bytes": int(result["bytes"] * size_headroom) + 256,
+        }
+        for name, result in results.items()
+    }
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_baseline(baseline, path=BASELINE_PATH):
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
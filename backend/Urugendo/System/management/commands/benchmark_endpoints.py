@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from Choices import registry
+from System import benchmark
+from Utils import geocoding
+from Utils.system_info import invalidate_system_settings
+
+
+class Command(BaseCommand):
+    help = "Benchmark query counts, latency and response size of every API endpoint against the checked-in budgets"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=int, help="Number of tourists to seed (defaults to the baseline's scale)")
+        parser.add_argument("--iterations", type=int, default=10, help="Timed requests per endpoint")
+        parser.add_argument("--baseline", default=str(benchmark.BASELINE_PATH), help="Path to the budgets file")
+        parser.add_argument("--update-baseline", action="store_true", help="Write new budgets from this run")
+        parser.add_argument("--no-fail", action="store_true", help="Report budget violations without failing")
+        parser.add_argument(
+            "--latency-tolerance", type=float,
+            help="Also enforce p95 latency budgets, multiplied by this factor (off by default: timings vary by machine)",
+        )
+
+    def handle(self, *args, **options):
+        update = options["update_baseline"]
+        baseline = {} if update else benchmark.load_baseline(options["baseline"])
+        scale = options["scale"] or baseline.get("scale", 20)
+
+        self.stdout.write(f"Seeding benchmark dataset (scale={scale})...")
+        # Seed and measure inside one transaction that is always rolled back,
+        # so the benchmark never leaves rows behind.
+        with benchmark.stub_external_services(), transaction.atomic():
+            dataset = benchmark.seed_dataset(scale=scale)
+            results = benchmark.run_benchmarks(dataset, iterations=options["iterations"])
+            transaction.set_rollback(True)
+        # The in-process caches may still hold rows from the rolled-back dataset.
+        registry.clear()
+        invalidate_system_settings()
+        geocoding.clear()
+
+        self.stdout.write(f"{'endpoint':<28} {'status':>6} {'queries':>7} {'p50 ms':>8} {'p95 ms':>8} {'bytes':>8}")
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<28} {result['status']:>6} {result['queries']:>7} "
+                f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['bytes']:>8}"
+            )
+
+        if update:
+            benchmark.write_baseline(
+                {"scale": scale, "budgets": benchmark.budgets_from_results(results)}, options["baseline"]
+            )
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        violations = benchmark.check_budgets(
+            results, baseline.get("budgets", {}), latency_tolerance=options["latency_tolerance"]
+        )
+        if not violations:
+            self.stdout.write(self.style.SUCCESS("All endpoints within budget."))
+            return
+
+        for violation in violations:
+            self.stdout.write(self.style.ERROR(violation))
+        if not options["no_fail"]:
+            raise CommandError(f"{len(violations)} endpoint budget(s) exceeded.")
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from Utils.system_info import invalidate_system_settings
+from .models import SystemInfo
+
+
+@receiver(post_save, sender=SystemInfo)
+@receiver(post_delete, sender=SystemInfo)
+def handle_system_info_change(sender, instance, **kwargs):
+    """
+    Invalidate cached settings in every worker when a setting changes.
+    """
+    invalidate_system_settings()
@@ -1,3 +1,141 @@
+import json
+import shutil
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 
-# Create your tests here.
+from System import benchmark
+from System.models import SystemInfo
+from Utils import system_info
+from Utils.system_info import (
+    get_system_setting, get_decimal_setting, get_int_setting, get_bool_setting, get_json_setting,
+    invalidate_system_settings,
+)
+
+
+class SystemSettingsCacheTests(TestCase):
+    def setUp(self):
+        SystemInfo.objects.create(key="PlatformFee", value="0.10")
+        SystemInfo.objects.create(key="MaxGuests", value="12")
+        SystemInfo.objects.create(key="BookingsOpen", value="true")
+        SystemInfo.objects.create(key="SupportedCurrencies", value='["RWF", "USD"]')
+        invalidate_system_settings()
+
+    def test_settings_load_once_then_serve_from_memory(self):
+        """All settings are read in one query, then repeated reads cost nothing."""
+        print("Testing system settings are cached in memory")
+        get_system_setting("PlatformFee")
+
+        with self.assertNumQueries(0):
+            for _ in range(15):
+                get_decimal_setting("PlatformFee")
+
+    def test_typed_accessors(self):
+        """Typed accessors parse values and fall back to the default."""
+        print("Testing typed system setting accessors")
+        self.assertEqual(get_decimal_setting("PlatformFee"), Decimal("0.10"))
+        self.assertEqual(get_int_setting("MaxGuests"), 12)
+        self.assertIs(get_bool_setting("BookingsOpen"), True)
+        self.assertEqual(get_json_setting("SupportedCurrencies"), ["RWF", "USD"])
+        self.assertEqual(get_int_setting("PlatformFee", 5), 5)
+        self.assertEqual(get_system_setting("Missing", "fallback"), "fallback")
+
+    def test_saving_a_setting_invalidates_the_cache(self):
+        """Saving a SystemInfo row is visible on the next read."""
+        print("Testing system settings cache invalidation on save")
+        self.assertEqual(get_decimal_setting("PlatformFee"), Decimal("0.10"))
+
+        fee = SystemInfo.objects.get(key="PlatformFee")
+        fee.value = "0.15"
+        fee.save()
+
+        self.assertEqual(get_decimal_setting("PlatformFee"), Decimal("0.15"))
+
+    def test_other_workers_reload_when_the_shared_version_changes(self):
+        """A worker whose TTL expired reloads only if the shared version moved."""
+        print("Testing system settings reload on shared version change")
+        get_system_setting("PlatformFee")
+
+        with patch.object(system_info, "SETTINGS_TTL", 0):
+            # Version unchanged: only the version check runs.
+            with self.assertNumQueries(1):
+                get_system_setting("PlatformFee")
+
+            # Simulate another worker saving a setting.
+            SystemInfo.objects.filter(key="PlatformFee").update(value="0.20")
+            cache.set(system_info.SETTINGS_VERSION_KEY, "changed-elsewhere", timeout=None)
+
+            self.assertEqual(get_decimal_setting("PlatformFee"), Decimal("0.20"))
+
+
+class BenchmarkEndpointsTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.baseline = Path(directory) / "baseline.json"
+
+    def _run(self, *args):
+        out = StringIO()
+        call_command("benchmark_endpoints", "--scale", "2", "--iterations", "1",
+                     "--baseline", str(self.baseline), *args, stdout=out)
+        return out.getvalue()
+
+    def test_every_endpoint_responds_and_dataset_is_rolled_back(self):
+        """Each benchmarked endpoint succeeds and the seeded rows do not survive the run."""
+        print("Testing endpoint benchmark covers every endpoint")
+        output = self._run("--update-baseline")
+
+        budgets = json.loads(self.baseline.read_text())["budgets"]
+        self.assertEqual(set(budgets), {name for name, *_ in benchmark.ENDPOINTS})
+        self.assertIn("All endpoints within budget.", self._run())
+        self.assertIn("bookings-list", output)
+        self.assertFalse(SystemInfo.objects.filter(key="PlatformFee").exists())
+
+    def test_every_api_route_is_benchmarked_or_excused(self):
+        """A route added to the URLconf fails here until it is in ENDPOINTS or NOT_BENCHMARKED."""
+        print("Testing endpoint benchmark covers every API route")
+        routes = benchmark.api_routes()
+        benchmarked = benchmark.benchmarked_routes()
+
+        self.assertEqual(routes - benchmarked - set(benchmark.NOT_BENCHMARKED), set())
+        self.assertEqual(set(benchmark.NOT_BENCHMARKED) - routes, set())
+        self.assertEqual(set(benchmark.NOT_BENCHMARKED) & benchmarked, set())
+
+    def test_committed_baseline_is_current(self):
+        """The checked-in budgets cover exactly ENDPOINTS and hold for the current code."""
+        print("Testing the committed benchmark baseline")
+        budgets = benchmark.load_baseline()["budgets"]
+        self.assertEqual(set(budgets), {name for name, *_ in benchmark.ENDPOINTS})
+
+        out = StringIO()
+        call_command("benchmark_endpoints", "--scale", "2", "--iterations", "1", stdout=out)
+        self.assertIn("All endpoints within budget.", out.getvalue())
+
+    def test_exceeded_budget_fails(self):
+        """A query count above the stored budget raises CommandError."""
+        print("Testing endpoint benchmark fails on exceeded budgets")
+        self._run("--update-baseline")
+        baseline = json.loads(self.baseline.read_text())
+        baseline["budgets"]["bookings-list"]["max_queries"] = 0
+        self.baseline.write_text(json.dumps(baseline))
+
+        with self.assertRaisesMessage(CommandError, "1 endpoint budget(s) exceeded"):
+            self._run()
+        self.assertIn("bookings-list: queries", self._run("--no-fail"))
+
+    def test_latency_is_only_enforced_on_request(self):
+        """p95 budgets are ignored unless a latency tolerance is given."""
+        print("Testing endpoint benchmark latency budgets are opt-in")
+        self._run("--update-baseline")
+        baseline = json.loads(self.baseline.read_text())
+        baseline["budgets"]["bookings-list"]["max_p95_ms"] = 0.001
+        self.baseline.write_text(json.dumps(baseline))
+
+        self.assertIn("All endpoints within budget.", self._run())
+        self.assertIn("bookings-list: p95_ms", self._run("--no-fail", "--latency-tolerance", "1.0"))
@@ -120,6 +120,11 @@ GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 GOOGLE_REFRESH_TOKEN = os.getenv("GOOGLE_REFRESH_TOKEN")
 GMAIL_SENDER_EMAIL = os.getenv("GMAIL_SENDER_EMAIL")
 
+# Outbox delivery backend: "gmail", "console" (print to stdout) or "file"
+# (write .eml files to EMAIL_OUTBOX_FILE_PATH). Use console/file offline.
+EMAIL_OUTBOX_BACKEND = os.getenv("EMAIL_OUTBOX_BACKEND", "gmail")
+EMAIL_OUTBOX_FILE_PATH = os.getenv("EMAIL_OUTBOX_FILE_PATH", str(BASE_DIR / "outbox"))
+
 # Google - Calendar
 GOOGLE_CALENDAR_CLIENT_ID = os.getenv("GOOGLE_CALENDAR_CLIENT_ID")
 GOOGLE_CALENDAR_CLIENT_SECRET = os.getenv("GOOGLE_CALENDAR_CLIENT_SECRET")
@@ -162,6 +167,21 @@ WSGI_APPLICATION = 'Urugendo.wsgi.application'
 # Password reset token expiration time (in seconds)
 PASSWORD_RESET_TIMEOUT = 3600  # 1 hour in seconds
 
+# Minutes a new (PENDING) booking holds its seats while the traveler pays
+BOOKING_HOLD_MINUTES = int(os.getenv("BOOKING_HOLD_MINUTES", 15))
+
+# Image uploads larger than this (bytes) are resized by a django-q worker instead of
+# the request; their originals wait in the private PICTURES_STAGING_BUCKET meanwhile.
+PICTURES_INLINE_MAX_BYTES = int(os.getenv("PICTURES_INLINE_MAX_BYTES", 2 * 1024 * 1024))
+PICTURES_STAGING_BUCKET = os.getenv("PICTURES_STAGING_BUCKET", "upload_staging")
+# Largest image upload accepted (bytes); larger request bodies are refused unread.
+PICTURES_MAX_UPLOAD_BYTES = int(os.getenv("PICTURES_MAX_UPLOAD_BYTES", 15 * 1024 * 1024))
+# Pictures.tasks.collect_orphaned_images deletes nothing when a larger share of all images look orphaned.
+PICTURES_ORPHAN_MAX_RATIO = float(os.getenv("PICTURES_ORPHAN_MAX_RATIO", 0.5))
+# Days an uploaded image may wait to be saved on a profile or experience before it
+# counts as orphaned (0 keeps unattached uploads forever).
+PICTURES_UNATTACHED_EXPIRY_DAYS = int(os.getenv("PICTURES_UNATTACHED_EXPIRY_DAYS", 30))
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
@@ -201,6 +221,32 @@ else:
     }
 
 
+# Cache
+# "default" is shared by every gunicorn and django-q worker and holds only the
+# version tokens that invalidate cached values across processes (Utils.system_info,
+# Choices.registry, Experiences.availability). Every set there also runs a COUNT(*)
+# for culling, and culling drops tokens, so the limit is kept well above their number.
+# The values themselves live in each process's "local" memory, keyed by those tokens.
+# Create the table with `python manage.py createcachetable`.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv("CACHE_MAX_ENTRIES", 100000)),
+            'CULL_FREQUENCY': 10,
+        },
+    },
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'urugendo-local',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", 5000)),
+        },
+    },
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
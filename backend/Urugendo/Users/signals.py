@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from Utils.google_clients import forget_calendar_credentials
+from .models import GoogleOAuthToken
+
+
+@receiver(post_save, sender=GoogleOAuthToken)
+@receiver(post_delete, sender=GoogleOAuthToken)
+def handle_google_token_change(sender, instance, **kwargs):
+    """
+    Stop using cached calendar credentials once a user reconnects or disconnects.
+    """
+    forget_calendar_credentials(instance.user_id)
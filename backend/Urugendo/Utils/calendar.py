@@ -1,36 +1,8 @@
-from django.conf import settings
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from django.db import transaction
+from django_q.tasks import async_task
 from googleapiclient.errors import HttpError
-
-CALENDAR_SCOPES = ["https://www.googleapis.com/auth/calendar.events"]
-
-
-def _get_calendar_service(user):
-    """
-    Builds Calendar API service from the user's stored OAuth token.
-    Automatically refreshes the access token if expired.
-    """
-    # Import here to avoid circular imports
-    from Users.models import GoogleOAuthToken
-
-    token_obj = GoogleOAuthToken.objects.get(user=user)
-    creds = Credentials(
-        token=token_obj.access_token,
-        refresh_token=token_obj.refresh_token,
-        token_uri="https://oauth2.googleapis.com/token",
-        client_id=settings.GOOGLE_CALENDAR_CLIENT_ID,
-        client_secret=settings.GOOGLE_CALENDAR_CLIENT_SECRET,
-        scopes=CALENDAR_SCOPES,
-    )
-
-    if creds.expired and creds.refresh_token:
-        creds.refresh(Request())
-        token_obj.access_token = creds.token
-        token_obj.save(update_fields=["access_token"])
-
-    return build("calendar", "v3", credentials=creds)
+from .google_clients import get_calendar_service
+from .models import CalendarSync
 
 
 def add_event( user, title: str, description: str, start_datetime: str, end_datetime: str, location: str = "", timezone: str = "Africa/Kigali", ) -> dict:
@@ -61,16 +33,10 @@ def add_event( user, title: str, description: str, start_datetime: str, end_date
         )
         # result = {"event_id": "abc123", "event_link": "https://calendar.google.com/..."}
     """
-    event_body = {
-        "summary": title,
-        "description": description,
-        "location": location,
-        "start": {"dateTime": start_datetime, "timeZone": timezone},
-        "end": {"dateTime": end_datetime, "timeZone": timezone},
-    }
+    event_body = _event_body(title, description, start_datetime, end_datetime, location, timezone)
 
     try:
-        service = _get_calendar_service(user)
+        service = get_calendar_service(user)
         event = service.events().insert(calendarId="primary", body=event_body).execute()
         return {"event_id": event["id"], "event_link": event.get("htmlLink", "")}
     except HttpError as e:
@@ -86,7 +52,7 @@ def delete_event(user, event_id: str) -> None:
         delete_event(user=request.user, event_id="abc123")
     """
     try:
-        service = _get_calendar_service(user)
+        service = get_calendar_service(user)
         service.events().delete(calendarId="primary", eventId=event_id).execute()
     except HttpError as e:
         raise Exception(f"Google Calendar delete error: {e}")
@@ -101,7 +67,7 @@ def update_event(user, event_id: str, **kwargs) -> dict:
         update_event(user=request.user, event_id="abc123", title="Updated Tour Name")
     """
     try:
-        service = _get_calendar_service(user)
+        service = get_calendar_service(user)
         event = service.events().get(calendarId="primary", eventId=event_id).execute()
 
         if "title" in kwargs:
@@ -118,4 +84,103 @@ def update_event(user, event_id: str, **kwargs) -> dict:
         updated = service.events().update(calendarId="primary", eventId=event_id, body=event).execute()
         return {"event_id": updated["id"], "event_link": updated.get("htmlLink", "")}
     except HttpError as e:
-        raise Exception(f"Google Calendar update error: {e}")
\ No newline at end of file
+        raise Exception(f"Google Calendar update error: {e}")
+
+# --- Queued changes, sent in batches by Utils.tasks.sync_calendar_events ---
+
+def _event_body(title, description, start_datetime, end_datetime, location="", timezone="Africa/Kigali"):
+    return {
+        "summary": title,
+        "description": description,
+        "location": location,
+        "start": {"dateTime": start_datetime, "timeZone": timezone},
+        "end": {"dateTime": end_datetime, "timeZone": timezone},
+    }
+
+
+def _patch_body(title=None, description=None, start_datetime=None, end_datetime=None, location=None,
+                timezone="Africa/Kigali"):
+    body = {}
+    if title is not None:
+        body["summary"] = title
+    if description is not None:
+        body["description"] = description
+    if location is not None:
+        body["location"] = location
+    if start_datetime is not None:
+        body["start"] = {"dateTime": start_datetime, "timeZone": timezone}
+    if end_datetime is not None:
+        body["end"] = {"dateTime": end_datetime, "timeZone": timezone}
+    return body
+
+
+def _queue(syncs):
+    CalendarSync.objects.bulk_create(syncs)
+    if syncs:
+        transaction.on_commit(lambda: async_task("Utils.tasks.sync_calendar_events"))
+    return syncs
+
+
+def calendar_event(user, title, description, start_datetime, end_datetime, location="", timezone="Africa/Kigali",
+                   booking=None, slot=None):
+    """
+    Build an unsaved insert for queue_calendar_events. The returned event id is
+    stored on `booking` or `slot` once Google has created the event.
+    """
+    return CalendarSync(
+        user=user, action=CalendarSync.Action.INSERT, booking=booking, slot=slot,
+        payload=_event_body(title, description, start_datetime, end_datetime, location, timezone),
+    )
+
+
+def queue_calendar_events(events):
+    """Queue several calendar_event() inserts with one query."""
+    return _queue(list(events))
+
+
+def queue_calendar_event(user, title, description, start_datetime, end_datetime, location="",
+                         timezone="Africa/Kigali", booking=None, slot=None):
+    """
+    Queue an event for the user's Google Calendar and return immediately.
+
+    Usage:
+        from Utils.calendar import queue_calendar_event
+        queue_calendar_event(
+            user=booking.traveler,
+            title="Kigali City Tour",
+            description="Meet at Kigali Convention Centre.",
+            start_datetime="2025-06-01T09:00:00",
+            end_datetime="2025-06-01T12:00:00",
+            booking=booking,
+        )
+    """
+    return queue_calendar_events([calendar_event(
+        user, title, description, start_datetime, end_datetime, location, timezone, booking=booking, slot=slot,
+    )])[0]
+
+
+def queue_calendar_update(user, event_id="", booking=None, slot=None, **fields):
+    """
+    Queue changes to an event. Accepts the same keyword fields as update_event.
+    Without `event_id`, the id stored on `booking` or `slot` is used when the change is sent.
+    """
+    return _queue([CalendarSync(
+        user=user, action=CalendarSync.Action.UPDATE, event_id=event_id, booking=booking, slot=slot,
+        payload=_patch_body(**fields),
+    )])[0]
+
+
+def queue_calendar_delete(user, event_id="", booking=None, slot=None):
+    """Queue removal of an event (see queue_calendar_update for how the event is found)."""
+    return _queue([CalendarSync(
+        user=user, action=CalendarSync.Action.DELETE, event_id=event_id, booking=booking, slot=slot,
+    )])[0]
+
+
+def has_calendar_event(target):
+    """True if a booking or slot has a calendar event, or one is queued for it."""
+    if target.calendar_event_id:
+        return True
+    return target.calendar_syncs.filter(action=CalendarSync.Action.INSERT).exclude(
+        status=CalendarSync.Status.FAILED
+    ).exists()
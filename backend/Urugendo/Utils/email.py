@@ -10,47 +10,86 @@
 import base64
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from pathlib import Path
 
 from django.conf import settings
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
+from django.db import transaction
+from django_q.tasks import async_task
 from googleapiclient.errors import HttpError
 
+from . import google_clients
+from .models import OutboundEmail
+
+
+def _build_message(email):
+    message = MIMEMultipart("alternative")
+    message["Subject"] = email.subject
+    message["From"] = settings.GMAIL_SENDER_EMAIL or ""
+    message["To"] = email.to
+    message.attach(MIMEText(email.html_body, "html"))
+    return message
+
+
+def _deliver_gmail(email):
+    raw = base64.urlsafe_b64encode(_build_message(email).as_bytes()).decode()
+    try:
+        google_clients.get_gmail_service().users().messages().send(userId="me", body={"raw": raw}).execute()
+    except HttpError as e:
+        raise Exception(f"Gmail API error: {e}")
+
+
+def _deliver_console(email):
+    print("===================================")
+    print(f"To: {email.to}")
+    print(f"Subject: {email.subject}")
+    print(email.html_body)
+    print("===================================")
+
+
+def _deliver_file(email):
+    outbox = Path(settings.EMAIL_OUTBOX_FILE_PATH)
+    outbox.mkdir(parents=True, exist_ok=True)
+    (outbox / f"{email.id}.eml").write_bytes(_build_message(email).as_bytes())
 
-def _get_gmail_service():
-    creds = Credentials(
-        token=None,
-        refresh_token=settings.GOOGLE_REFRESH_TOKEN,
-        token_uri="https://oauth2.googleapis.com/token",
-        client_id=settings.GOOGLE_CLIENT_ID,
-        client_secret=settings.GOOGLE_CLIENT_SECRET,
-        scopes=["https://www.googleapis.com/auth/gmail.send"],
-    )
-    return build("gmail", "v1", credentials=creds)
 
+EMAIL_BACKENDS = {
+    "gmail": _deliver_gmail,
+    "console": _deliver_console,
+    "file": _deliver_file,
+}
 
-def send_email(to, subject, html_body):
+
+def deliver_email(email):
+    """
+    Deliver one OutboundEmail through the backend named by
+    settings.EMAIL_OUTBOX_BACKEND. Raises on failure.
+    """
+    backend = EMAIL_BACKENDS.get(settings.EMAIL_OUTBOX_BACKEND)
+    if backend is None:
+        raise ValueError(f"Unknown EMAIL_OUTBOX_BACKEND: {settings.EMAIL_OUTBOX_BACKEND!r}")
+    backend(email)
+
+
+def send_email(to, subject, html_body, dedupe_key=None):
     """
+    Queue an email in the outbox and return immediately; it is delivered by
+    Utils.tasks.drain_email_outbox. A message whose dedupe_key was already
+    queued is dropped.
+
     Usage:
         from Utils.email import send_email
         send_email("user@example.com", "Subject", "<p>Body</p>")
     """
-    message = MIMEMultipart("alternative")
-    message["Subject"] = subject
-    message["From"] = settings.GMAIL_SENDER_EMAIL
-    message["To"] = to
-    message.attach(MIMEText(html_body, "html"))
-    raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
-
-    try:
-        service = _get_gmail_service()
-        service.users().messages().send(userId="me", body={"raw": raw}).execute()
-    except HttpError as e:
-        raise Exception(f"Gmail API error: {e}")
+    OutboundEmail.objects.bulk_create(
+        [OutboundEmail(to=to, subject=subject, html_body=html_body, dedupe_key=dedupe_key)],
+        ignore_conflicts=True,
+    )
+    # Start a drain once the row is visible rather than waiting for the schedule.
+    transaction.on_commit(lambda: async_task("Utils.tasks.drain_email_outbox"))
 
 # --- Named templates for tasks ---
 
-def send_verification_email(to, verify_url):
+def send_verification_email(to, verify_url, dedupe_key=None):
     """
     Send verification email to new users.
     """
@@ -68,9 +107,10 @@ def send_verification_email(to, verify_url):
             <p>{verify_url}</p>
             <p>If you didn't create an account, you can safely ignore this email.</p>
         """,
+        dedupe_key=dedupe_key,
     )
 
-def send_booking_confirmation(to, tourist_name, experience_title, booking_date, start_time, end_time):
+def send_booking_confirmation(to, tourist_name, experience_title, booking_date, start_time, end_time, dedupe_key=None):
     """
     Send booking confirmation email to tourists.
     """
@@ -84,9 +124,10 @@ def send_booking_confirmation(to, tourist_name, experience_title, booking_date,
             <p>Time: <strong>{start_time} - {end_time}</strong></p>
             <p>We look forward to seeing you!</p>
         """,
+        dedupe_key=dedupe_key,
     )
 
-def send_booking_pending_alert(to, tourist_name, experience_title, booking_date, start_time, end_time):
+def send_booking_pending_alert(to, tourist_name, experience_title, booking_date, start_time, end_time, dedupe_key=None):
     """
     Send booking pending alert email to tourists.
     """
@@ -100,9 +141,10 @@ def send_booking_pending_alert(to, tourist_name, experience_title, booking_date,
             <p>Time: <strong>{start_time} - {end_time}</strong></p>
             <p>Please proceed with payment to confirm your booking.</p>
         """,
+        dedupe_key=dedupe_key,
     )
 
-def send_booking_cancellation(to, tourist_name, experience_title, booking_date):
+def send_booking_cancellation(to, tourist_name, experience_title, booking_date, dedupe_key=None):
     """
     Send booking cancellation email to tourists.
     """
@@ -115,9 +157,10 @@ def send_booking_cancellation(to, tourist_name, experience_title, booking_date):
             <p>Date: <strong>{booking_date}</strong></p>
             <p>If this was a mistake, please try booking again.</p>
         """,
+        dedupe_key=dedupe_key,
     )
 
-def send_cancellation_alert(to, guide_name, tourist_name, experience_title, booking_date):
+def send_cancellation_alert(to, guide_name, tourist_name, experience_title, booking_date, dedupe_key=None):
     """
     Notify guides when a tourist cancels their booking.
     """
@@ -130,9 +173,10 @@ def send_cancellation_alert(to, guide_name, tourist_name, experience_title, book
             <p>Experience: <strong>{experience_title}</strong></p>
             <p>Date: <strong>{booking_date}</strong></p>
         """,
+        dedupe_key=dedupe_key,
     )
 
-def send_reminder_email(to, name, experience_title, event_time):
+def send_reminder_email(to, name, experience_title, event_time, dedupe_key=None):
     """
     Send reminder email to tourists.
     """
@@ -144,9 +188,10 @@ def send_reminder_email(to, name, experience_title, event_time):
             <p>Your experience <strong>{experience_title}</strong> is scheduled for:</p>
             <p><strong>{event_time}</strong></p>
         """,
+        dedupe_key=dedupe_key,
     )
 
-def send_guide_new_booking_alert(to, guide_name, tourist_name, experience_title, booking_date):
+def send_guide_new_booking_alert(to, guide_name, tourist_name, experience_title, booking_date, dedupe_key=None):
     """
     Notify guides when a tourist books their experience.
     """
@@ -159,4 +204,5 @@ def send_guide_new_booking_alert(to, guide_name, tourist_name, experience_title,
             <p>Experience: <strong>{experience_title}</strong></p>
             <p>Date: <strong>{booking_date}</strong></p>
         """,
+        dedupe_key=dedupe_key,
     )
\ No newline at end of file
@@ -1,72 +1,269 @@
+"""
+Google Geocoding lookups with a two-tier cache.
+
+Answers are kept in an in-process LRU and in the GeocodeCacheEntry table
+(shared by every worker), so repeated queries ("Kigali", "Musanze", the same
+pin) never leave the process after the first lookup. Forward queries are
+keyed by their normalised text and reverse lookups by coordinates rounded to
+REVERSE_PRECISION decimals. ZERO_RESULTS answers are cached for a shorter
+time; API errors and network failures are never cached.
+
+Usage:
+    from Utils.geocoding import geocode_place, reverse_geocode, cache_stats
+    geocode_place("Kigali")   # {'place_name', 'latitude', 'longitude', 'place_id'}
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
 import requests
 from django.conf import settings
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
 
+GEOCODE_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+REQUEST_TIMEOUT = 10
 
-def geocode_place(place_name):
-    """
-    Convert a place name to lat/lng coordinates using Google Geocoding API.
-    """
-    try:
-        response = requests.get(
-            "https://maps.googleapis.com/maps/api/geocode/json",
-            params={
-                "address": place_name,
-                "key": settings.GOOGLE_MAPS_API_KEY,
-                "region": "rw",        # prioritises results from Rwanda
-                "language": "en",
-            },
-            timeout=10,
-        )
-        response.raise_for_status()
-        data = response.json()
+# Upstream calls allowed per second by this process, and the burst it may use at once.
+RATE_LIMIT_PER_SECOND = 10
+RATE_LIMIT_BURST = 20
+# Seconds a call waits for a token before giving up with GeocodingRateLimited.
+RATE_LIMIT_MAX_WAIT = 2
 
-        if data["status"] == "ZERO_RESULTS":
-            raise ValueError(f"No results found for: '{place_name}'")
+# Seconds an answer stays valid, for results and for ZERO_RESULTS.
+FOUND_TTL = 30 * 24 * 60 * 60
+NOT_FOUND_TTL = 24 * 60 * 60
+MEMORY_CACHE_SIZE = 2048
+# 4 decimals is ~11m, finer than a reverse-geocoded street address.
+REVERSE_PRECISION = 4
 
-        if data["status"] != "OK":
-            raise Exception(f"Geocoding API error: {data['status']} — {data.get('error_message', '')}")
+# Marks a cached ZERO_RESULTS answer in the in-process cache.
+_NOT_FOUND = object()
 
-        result = data["results"][0]
-        location = result["geometry"]["location"]
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=20))
 
-        return {
-            "place_name": result["formatted_address"],
-            "latitude": location["lat"],
-            "longitude": location["lng"],
-            "place_id": result.get("place_id", ""),
-        }
+_lock = threading.Lock()
+_memory = OrderedDict()
+_stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "not_found_hits": 0, "coalesced": 0, "rate_limited": 0}
+_inflight = {}
 
-    except requests.RequestException as e:
-        raise Exception(f"Geocoding request failed: {e}")
 
-def reverse_geocode(latitude, longitude):
+class GeocodingRateLimited(Exception):
+    """No upstream call could be made within RATE_LIMIT_MAX_WAIT seconds."""
+
+
+class TokenBucket:
+    """Allows `rate` calls per second on average, with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        """Take a token, waiting up to `timeout` seconds. Returns False if none became free."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class _Flight:
+    """One upstream lookup that concurrent callers for the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+_limiter = TokenBucket(RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def cache_stats():
+    """Hit/miss counters of this process since start (or the last clear())."""
+    with _lock:
+        return dict(_stats)
+
+
+def clear():
+    """Forget the in-process cache and reset the counters. The table is left as is."""
+    with _lock:
+        _memory.clear()
+        for name in _stats:
+            _stats[name] = 0
+
+
+def _remember(key, value, expires_at):
+    with _lock:
+        _memory[key] = (value, expires_at)
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def _from_memory(key):
+    with _lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del _memory[key]
+            return None
+        _memory.move_to_end(key)
+        return entry[0]
+
+
+def _cached(key, fetch):
     """
-    Convert lat/lng coordinates back to a human-readable address.
+    Return the answer for `key`: a result dict, or _NOT_FOUND for ZERO_RESULTS.
+    `fetch()` is only called when neither cache has a live answer, and only
+    by one of the threads missing on `key` at the same time.
     """
+    value = _from_memory(key)
+    if value is not None:
+        _count("memory_hits")
+    else:
+        with _lock:
+            flight = _inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _inflight[key] = _Flight()
+            else:
+                _stats["coalesced"] += 1
+
+        if leader:
+            try:
+                flight.value = _load(key, fetch)
+            except Exception as e:
+                flight.error = e
+                raise
+            finally:
+                with _lock:
+                    del _inflight[key]
+                flight.done.set()
+            value = flight.value
+        else:
+            if not flight.done.wait(REQUEST_TIMEOUT + RATE_LIMIT_MAX_WAIT):
+                raise Exception("Geocoding request timed out.")
+            if flight.error is not None:
+                raise flight.error
+            value = flight.value
+
+    if value is _NOT_FOUND:
+        _count("not_found_hits")
+    return value
+
+
+def _load(key, fetch):
+    """Read `key` from the cache table, or fetch it upstream and store it in both tiers."""
+    from .models import GeocodeCacheEntry
+
+    entry = GeocodeCacheEntry.objects.filter(key=key, expires_at__gt=timezone.now()).first()
+    if entry is not None:
+        _count("db_hits")
+        value = entry.result if entry.result is not None else _NOT_FOUND
+        _remember(key, value, entry.expires_at.timestamp())
+        return value
+
+    _count("misses")
+    if not _limiter.acquire(RATE_LIMIT_MAX_WAIT):
+        _count("rate_limited")
+        raise GeocodingRateLimited("Too many geocoding requests. Please retry shortly.")
+    value = fetch()
+
+    ttl = NOT_FOUND_TTL if value is _NOT_FOUND else FOUND_TTL
+    expires_at = timezone.now() + timedelta(seconds=ttl)
+    GeocodeCacheEntry.objects.update_or_create(
+        key=key,
+        defaults={"result": None if value is _NOT_FOUND else value, "expires_at": expires_at},
+    )
+    _remember(key, value, expires_at.timestamp())
+    return value
+
+
+def _request(params, error_label):
+    """Call the Geocoding API. Returns the first result, or _NOT_FOUND for ZERO_RESULTS."""
     try:
-        response = requests.get(
-            "https://maps.googleapis.com/maps/api/geocode/json",
-            params={
-                "latlng": f"{latitude},{longitude}",
-                "key": settings.GOOGLE_MAPS_API_KEY,
-                "language": "en",
-            },
-            timeout=10,
+        response = _session.get(
+            GEOCODE_URL,
+            params={**params, "key": settings.GOOGLE_MAPS_API_KEY, "language": "en"},
+            timeout=REQUEST_TIMEOUT,
         )
         response.raise_for_status()
         data = response.json()
+    except requests.RequestException as e:
+        raise Exception(f"{error_label} request failed: {e}")
 
-        if data["status"] == "ZERO_RESULTS":
-            raise ValueError(f"No address found for: ({latitude}, {longitude})")
+    if data["status"] == "ZERO_RESULTS":
+        return _NOT_FOUND
+    if data["status"] != "OK":
+        raise Exception(f"{error_label} error: {data['status']} — {data.get('error_message', '')}")
+    return data["results"][0]
 
-        if data["status"] != "OK":
-            raise Exception(f"Reverse geocoding error: {data['status']}")
 
-        result = data["results"][0]
-        return {
-            "place_name": result["formatted_address"],
-            "place_id": result.get("place_id", ""),
-        }
+def _geocode_fetch(place_name):
+    result = _request({"address": place_name, "region": "rw"}, "Geocoding")  # region prioritises Rwanda
+    if result is _NOT_FOUND:
+        return _NOT_FOUND
 
-    except requests.RequestException as e:
-        raise Exception(f"Reverse geocoding request failed: {e}")
+    location = result["geometry"]["location"]
+    return {
+        "place_name": result["formatted_address"],
+        "latitude": location["lat"],
+        "longitude": location["lng"],
+        "place_id": result.get("place_id", ""),
+    }
+
+
+def _reverse_fetch(latitude, longitude):
+    result = _request({"latlng": f"{latitude},{longitude}"}, "Reverse geocoding")
+    if result is _NOT_FOUND:
+        return _NOT_FOUND
+
+    return {
+        "place_name": result["formatted_address"],
+        "place_id": result.get("place_id", ""),
+    }
+
+
+def geocode_place(place_name):
+    """
+    Convert a place name to lat/lng coordinates using Google Geocoding API.
+    Raises ValueError when Google has no result.
+    """
+    normalised = " ".join(place_name.lower().split())
+    result = _cached(f"geocode:{normalised}", lambda: _geocode_fetch(normalised))
+    if result is _NOT_FOUND:
+        raise ValueError(f"No results found for: '{place_name}'")
+    return result
+
+
+def reverse_geocode(latitude, longitude):
+    """
+    Convert lat/lng coordinates back to a human-readable address.
+    Raises ValueError when Google has no address for the point.
+    """
+    latitude = round(float(latitude), REVERSE_PRECISION)
+    longitude = round(float(longitude), REVERSE_PRECISION)
+    result = _cached(f"reverse:{latitude},{longitude}", lambda: _reverse_fetch(latitude, longitude))
+    if result is _NOT_FOUND:
+        raise ValueError(f"No address found for: ({latitude}, {longitude})")
+    return result
@@ -0,0 +1,149 @@
+"""
+Cached Google API clients.
+
+Building a client parses the discovery document and opens a new HTTP
+transport, so each service is built once per credential and reused.
+httplib2 connections are not thread-safe, so built services are cached per
+thread; credentials are shared between threads and only refreshed once
+they have expired. A refresh holds only that credential's lock, so one slow
+token request doesn't stall every other Google call. Both caches keep the
+most recently used entries only (CREDENTIALS_CACHE_SIZE, SERVICES_CACHE_SIZE).
+
+Usage:
+    from Utils.google_clients import get_gmail_service, get_calendar_service
+    get_gmail_service().users().messages().send(...).execute()
+    get_calendar_service(user).events().insert(...).execute()
+"""
+import threading
+import time
+from collections import OrderedDict
+import google_auth_httplib2
+import httplib2
+from django.conf import settings
+from django.utils import timezone
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+TOKEN_URI = "https://oauth2.googleapis.com/token"
+GMAIL_SCOPES = ["https://www.googleapis.com/auth/gmail.send"]
+CALENDAR_SCOPES = ["https://www.googleapis.com/auth/calendar.events"]
+HTTP_TIMEOUT = 30
+# Seconds a user's calendar credentials are reused before GoogleOAuthToken is
+# read again, so tokens replaced or removed by another worker are picked up.
+CALENDAR_CREDENTIALS_TTL = 300
+# Credentials kept in memory (shared by all threads), and clients kept per thread;
+# the least recently used are dropped beyond these.
+CREDENTIALS_CACHE_SIZE = 256
+SERVICES_CACHE_SIZE = 32
+
+_lock = threading.Lock()
+_credentials = OrderedDict()
+_local = threading.local()
+
+
+def _cached_credentials(key, load, ttl=None):
+    """Return the credentials cached under `key`, calling `load()` on a miss or once `ttl` has passed."""
+    with _lock:
+        entry = _credentials.get(key)
+        if entry is not None and (ttl is None or time.monotonic() - entry[1] < ttl):
+            _credentials.move_to_end(key)
+            return entry[0]
+
+    creds = load()
+    with _lock:
+        # Each entry carries its own lock so refreshes of different credentials don't wait on each other
+        _credentials[key] = (creds, time.monotonic(), threading.Lock())
+        _credentials.move_to_end(key)
+        while len(_credentials) > CREDENTIALS_CACHE_SIZE:
+            _credentials.popitem(last=False)
+    return creds
+
+
+def _refresh_if_expired(key, creds):
+    """
+    Refresh credentials that have no valid access token. Returns True if a refresh happened.
+    The token request is made holding only the lock of the credentials cached under `key`.
+    """
+    with _lock:
+        entry = _credentials.get(key)
+    # Credentials replaced or evicted meanwhile are still refreshed, just without a shared lock
+    refresh_lock = entry[2] if entry is not None and entry[0] is creds else threading.Lock()
+    with refresh_lock:
+        if creds.valid or not creds.refresh_token:
+            return False
+        creds.refresh(Request())
+        return True
+
+
+def _service(key, api, version, creds):
+    """Build (or reuse this thread's) client for `api` authorised with `creds`."""
+    services = getattr(_local, "services", None)
+    if services is None:
+        services = _local.services = OrderedDict()
+
+    cache_key = (key, api, version)
+    entry = services.get(cache_key)
+    if entry is None or entry[0] is not creds:
+        http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+        service = build(api, version, http=http, cache_discovery=False, static_discovery=True)
+        entry = services[cache_key] = (creds, service)
+    services.move_to_end(cache_key)
+    while len(services) > SERVICES_CACHE_SIZE:
+        services.popitem(last=False)
+    return entry[1]
+
+
+def get_gmail_service():
+    """Gmail client for the platform's sender account."""
+    creds = _cached_credentials("gmail", lambda: Credentials(
+        token=None,
+        refresh_token=settings.GOOGLE_REFRESH_TOKEN,
+        token_uri=TOKEN_URI,
+        client_id=settings.GOOGLE_CLIENT_ID,
+        client_secret=settings.GOOGLE_CLIENT_SECRET,
+        scopes=GMAIL_SCOPES,
+    ))
+    _refresh_if_expired("gmail", creds)
+    return _service("gmail", "gmail", "v1", creds)
+
+
+def _load_calendar_credentials(user):
+    from Users.models import GoogleOAuthToken
+
+    token_obj = GoogleOAuthToken.objects.get(user=user)
+    return Credentials(
+        token=token_obj.access_token,
+        refresh_token=token_obj.refresh_token,
+        token_uri=TOKEN_URI,
+        client_id=settings.GOOGLE_CALENDAR_CLIENT_ID,
+        client_secret=settings.GOOGLE_CALENDAR_CLIENT_SECRET,
+        scopes=CALENDAR_SCOPES,
+    )
+
+
+def get_calendar_service(user):
+    """
+    Calendar client authorised with the user's stored OAuth token.
+    Raises GoogleOAuthToken.DoesNotExist if the user hasn't connected a calendar.
+    """
+    from Users.models import GoogleOAuthToken
+
+    key = f"calendar:{user.pk}"
+    creds = _cached_credentials(key, lambda: _load_calendar_credentials(user), ttl=CALENDAR_CREDENTIALS_TTL)
+    if _refresh_if_expired(key, creds):
+        # update() rather than save() so the token signal doesn't drop the credentials just refreshed.
+        GoogleOAuthToken.objects.filter(user=user).update(access_token=creds.token, updated_at=timezone.now())
+    return _service(key, "calendar", "v3", creds)
+
+
+def forget_calendar_credentials(user_id):
+    """Drop a user's cached calendar credentials (their token was replaced or removed)."""
+    with _lock:
+        _credentials.pop(f"calendar:{user_id}", None)
+
+
+def clear():
+    """Forget every cached credential. Built services are rebuilt on next use."""
+    with _lock:
+        _credentials.clear()
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Utils', '0003_geocodecacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(max_length=64)),
+                ('from_lang', models.CharField(blank=True, max_length=10)),
+                ('to_lang', models.CharField(max_length=10)),
+                ('translated_text', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source_hash', 'from_lang', 'to_lang'), name='unique_translation_source_langs')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 6.0.2 on 2026-10-18 15:05
+
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+
+def move_payout_watermark(apps, schema_editor):
+    """The payout watermark used to be a SystemInfo row."""
+    SystemInfo = apps.get_model('System', 'SystemInfo')
+    TaskWatermark = apps.get_model('Utils', 'TaskWatermark')
+    row = SystemInfo.objects.filter(key='PayoutWatermark').first()
+    if row is not None:
+        value = parse_datetime(row.value or '')
+        if value is not None:
+            TaskWatermark.objects.create(name='PayoutWatermark', value=value)
+        row.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Utils', '0004_translationcacheentry'),
+        ('System', '0002_rename_systemindo_systeminfo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('value', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(move_payout_watermark, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,147 @@
+import uuid
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class QueuedJob(models.Model):
+    """
+    Delivery state shared by the outbox tables. Rows are claimed and
+    retried by the drain tasks in Utils.tasks.
+    """
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Pending"
+        SENDING = "SENDING", "Sending"
+        SENT = "SENT", "Sent"
+        FAILED = "FAILED", "Failed"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+        ordering = ['created_at']
+
+
+class OutboundEmail(QueuedJob):
+    """
+    An email waiting in (or delivered from) the outbox.
+    Rows are written by Utils.email.send_email and delivered by
+    Utils.tasks.drain_email_outbox.
+    """
+    to = models.EmailField()
+    subject = models.CharField(max_length=255)
+    html_body = models.TextField()
+
+    # Messages sharing a dedupe key are only ever queued once.
+    dedupe_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta(QueuedJob.Meta):
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to} ({self.status})"
+
+
+class CalendarSync(QueuedJob):
+    """
+    A pending change to a user's Google Calendar.
+    Rows are written by the queue_* helpers in Utils.calendar and sent in
+    per-user batch requests by Utils.tasks.sync_calendar_events. The event id
+    Google returns for an insert is stored on the booking or slot.
+    """
+    class Action(models.TextChoices):
+        INSERT = "INSERT", "Insert"
+        UPDATE = "UPDATE", "Update"
+        DELETE = "DELETE", "Delete"
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='calendar_syncs')
+    action = models.CharField(max_length=10, choices=Action.choices)
+
+    # Event the change applies to; for updates and deletes queued before the insert
+    # finished, it is read from the booking or slot when the change is sent.
+    event_id = models.CharField(max_length=255, blank=True)
+    booking = models.ForeignKey(
+        'Booking.Booking', on_delete=models.CASCADE, related_name='calendar_syncs', null=True, blank=True
+    )
+    slot = models.ForeignKey(
+        'Experiences.ExperienceSlot', on_delete=models.CASCADE, related_name='calendar_syncs', null=True, blank=True
+    )
+
+    # Event resource (insert) or the fields to change (update).
+    payload = models.JSONField(default=dict, blank=True)
+
+    class Meta(QueuedJob.Meta):
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.action} calendar event for {self.user} ({self.status})"
+
+
+class GeocodeCacheEntry(models.Model):
+    """
+    Second-tier cache for Utils.geocoding, shared by every worker.
+    `result` is null for queries Google had no results for (negative cache).
+    """
+    key = models.CharField(max_length=255, unique=True)
+    result = models.JSONField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key} (until {self.expires_at})"
+
+
+class TranslationCacheEntry(models.Model):
+    """
+    A translation returned by Azure, reused by Utils.translate for identical
+    source text. `source_hash` is the SHA-256 of the text; `from_lang` is
+    empty when the source language was auto-detected.
+    """
+    source_hash = models.CharField(max_length=64)
+    from_lang = models.CharField(max_length=10, blank=True)
+    to_lang = models.CharField(max_length=10)
+    translated_text = models.TextField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['source_hash', 'from_lang', 'to_lang'], name='unique_translation_source_langs'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.source_hash[:12]} {self.from_lang or 'auto'} -> {self.to_lang}"
+
+
+class TaskWatermark(models.Model):
+    """
+    How far an incremental background task has got, e.g. the updated_at of
+    the last completed booking Payment.tasks.create_payouts_for_completed_bookings
+    processed. Kept out of SystemInfo so recording progress doesn't
+    invalidate every worker's cached settings.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    value = models.DateTimeField()
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
@@ -1,7 +1,107 @@
+"""
+Cached access to SystemInfo settings.
+
+All rows are loaded with one query and served from memory. Each worker
+re-checks a shared version token in the cache backend every SETTINGS_TTL
+seconds and reloads only when it changed. Saving or deleting a SystemInfo
+row replaces the token (see System.signals).
+
+Usage:
+    from Utils.system_info import get_decimal_setting
+    fee_rate = get_decimal_setting("PlatformFee", Decimal("0.10"))
+"""
+import json
+import threading
+import time
+import uuid
+from decimal import Decimal, InvalidOperation
+from django.core.cache import cache
 from System.models import SystemInfo
 
+# Seconds a worker serves settings from memory before checking the shared version.
+SETTINGS_TTL = 60
+SETTINGS_VERSION_KEY = "system_info:version"
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+_FALSE_VALUES = {"0", "false", "no", "off"}
+
+_lock = threading.Lock()
+_state = {"values": None, "version": None, "checked_at": 0.0}
+
+
+def _shared_version():
+    version = cache.get(SETTINGS_VERSION_KEY)
+    if version is None:
+        # add() so concurrent workers agree on a single token; the loser reads the winner's
+        version = uuid.uuid4().hex
+        if not cache.add(SETTINGS_VERSION_KEY, version, timeout=None):
+            version = cache.get(SETTINGS_VERSION_KEY)
+    return version
+
+
+def _load_settings():
+    values = _state["values"]
+    if values is not None and time.monotonic() - _state["checked_at"] < SETTINGS_TTL:
+        return values
+
+    with _lock:
+        version = _shared_version()
+        if _state["values"] is None or version != _state["version"]:
+            _state["values"] = dict(SystemInfo.objects.values_list("key", "value"))
+            _state["version"] = version
+        _state["checked_at"] = time.monotonic()
+        return _state["values"]
+
+
+def invalidate_system_settings():
+    """Drop cached settings here and, via the shared version, in every other worker."""
+    cache.set(SETTINGS_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    with _lock:
+        _state["values"] = None
+
+
 def get_system_setting(key, default=None):
+    """Return the raw string value of a setting."""
+    return _load_settings().get(key, default)
+
+
+def get_decimal_setting(key, default=None):
+    value = get_system_setting(key)
+    if value is None:
+        return default
+    try:
+        return Decimal(value.strip())
+    except InvalidOperation:
+        return default
+
+
+def get_int_setting(key, default=None):
+    value = get_system_setting(key)
+    if value is None:
+        return default
+    try:
+        return int(value.strip())
+    except ValueError:
+        return default
+
+
+def get_bool_setting(key, default=None):
+    value = get_system_setting(key)
+    if value is None:
+        return default
+    value = value.strip().lower()
+    if value in _TRUE_VALUES:
+        return True
+    if value in _FALSE_VALUES:
+        return False
+    return default
+
+
+def get_json_setting(key, default=None):
+    value = get_system_setting(key)
+    if value is None:
+        return default
     try:
-        return SystemInfo.objects.get(key=key).value
-    except SystemInfo.DoesNotExist:
-        return default
\ No newline at end of file
+        return json.loads(value)
+    except ValueError:
+        return default
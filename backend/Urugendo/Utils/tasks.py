@@ -0,0 +1,228 @@
+import time
+from collections import defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from Booking.models import Booking
+from Experiences.models import ExperienceSlot
+from Users.models import GoogleOAuthToken
+from .email import deliver_email
+from .google_clients import get_calendar_service
+from . import geocoding
+from .models import OutboundEmail, CalendarSync, GeocodeCacheEntry
+
+# Messages delivered per claimed batch.
+EMAIL_BATCH_SIZE = 50
+# Attempts before a message is given up on and left FAILED.
+EMAIL_MAX_ATTEMPTS = 5
+
+# Calendar changes claimed per run of the loop, and sent per batch HTTP request
+# (the Calendar API accepts at most 50 calls in one batch).
+CALENDAR_BATCH_SIZE = 200
+CALENDAR_REQUESTS_PER_BATCH = 50
+CALENDAR_MAX_ATTEMPTS = 5
+
+# Retry delays double from RETRY_BASE up to RETRY_MAX.
+RETRY_BASE = timedelta(minutes=1)
+RETRY_MAX = timedelta(hours=1)
+# A SENDING row older than this belongs to a worker that died mid-batch.
+SENDING_TIMEOUT = timedelta(minutes=10)
+
+
+def _retry_delay(attempts):
+    return min(RETRY_BASE * 2 ** (attempts - 1), RETRY_MAX)
+
+
+def _claim_jobs(model, batch_size, max_attempts, summary, select_related=()):
+    """
+    Lock a batch of due rows of a QueuedJob model, mark them SENDING and
+    return them. Concurrent drains skip rows another worker has already locked.
+
+    Rows left SENDING by a worker that died are claimed again, unless they are
+    out of attempts: those (likely the rows that kill the worker) become FAILED.
+    """
+    now = timezone.now()
+    stale = Q(status=model.Status.SENDING, updated_at__lt=now - SENDING_TIMEOUT)
+    due = Q(status=model.Status.PENDING, next_attempt_at__lte=now) | stale
+    with transaction.atomic():
+        summary['failed'] += model.objects.filter(stale, attempts__gte=max_attempts).update(
+            status=model.Status.FAILED, last_error="Worker stopped while sending; out of attempts.", updated_at=now
+        )
+        ids = list(
+            model.objects.select_for_update(skip_locked=True)
+            .filter(due)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        model.objects.filter(id__in=ids).update(
+            status=model.Status.SENDING, attempts=F('attempts') + 1, updated_at=now
+        )
+    return list(model.objects.filter(id__in=ids).select_related(*select_related).order_by('created_at'))
+
+
+def _record_failure(job, error, max_attempts, summary, retry=True):
+    """Reschedule a failed job with backoff, or mark it FAILED once it is out of attempts."""
+    job.last_error = str(error)[:1000]
+    if retry and job.attempts < max_attempts:
+        job.status = job.Status.PENDING
+        job.next_attempt_at = timezone.now() + _retry_delay(job.attempts)
+        summary['retried'] += 1
+    else:
+        job.status = job.Status.FAILED
+        summary['failed'] += 1
+    job.save(update_fields=['status', 'next_attempt_at', 'last_error', 'updated_at'])
+
+
+def drain_email_outbox(batch_size=EMAIL_BATCH_SIZE, max_attempts=EMAIL_MAX_ATTEMPTS):
+    """
+    Deliver queued emails in batches until none are due. Each message is
+    marked SENT as soon as it is delivered. Failed deliveries are retried
+    with exponential backoff and marked FAILED after `max_attempts`.
+    Returns a summary of the run.
+    """
+    started = time.monotonic()
+    summary = {'claimed': 0, 'sent': 0, 'retried': 0, 'failed': 0}
+
+    while True:
+        emails = _claim_jobs(OutboundEmail, batch_size, max_attempts, summary)
+        if not emails:
+            break
+        summary['claimed'] += len(emails)
+
+        for email in emails:
+            try:
+                deliver_email(email)
+            except Exception as e:
+                print(f"Failed to send email {email.id} to {email.to}: {e}")
+                _record_failure(email, e, max_attempts, summary)
+                continue
+            # Recorded straight away, so a worker killed later in the batch can't send it again
+            now = timezone.now()
+            summary['sent'] += OutboundEmail.objects.filter(id=email.id).update(
+                status=OutboundEmail.Status.SENT, sent_at=now, last_error='', updated_at=now
+            )
+
+        if len(emails) < batch_size:
+            break
+
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+    print(f"drain_email_outbox: {summary}")
+    return summary
+
+
+def _calendar_event_id(sync):
+    if sync.event_id:
+        return sync.event_id
+    target = sync.booking or sync.slot
+    return target.calendar_event_id if target else ""
+
+
+def _calendar_request(service, sync, event_id):
+    events = service.events()
+    if sync.action == CalendarSync.Action.INSERT:
+        return events.insert(calendarId="primary", body=sync.payload)
+    if sync.action == CalendarSync.Action.UPDATE:
+        return events.patch(calendarId="primary", eventId=event_id, body=sync.payload)
+    return events.delete(calendarId="primary", eventId=event_id)
+
+
+def _send_calendar_batch(user, syncs):
+    """
+    Send one user's changes as batch HTTP requests.
+    Returns ({sync id: (response, exception)}, number of batch requests).
+    """
+    results = {}
+
+    def callback(request_id, response, exception):
+        results[request_id] = (response, exception)
+
+    service = get_calendar_service(user)
+    batches = 0
+    for start in range(0, len(syncs), CALENDAR_REQUESTS_PER_BATCH):
+        batch = service.new_batch_http_request(callback=callback)
+        for sync in syncs[start:start + CALENDAR_REQUESTS_PER_BATCH]:
+            batch.add(_calendar_request(service, sync, sync.resolved_event_id), request_id=str(sync.id))
+        batch.execute()
+        batches += 1
+    return results, batches
+
+
+def sync_calendar_events(batch_size=CALENDAR_BATCH_SIZE, max_attempts=CALENDAR_MAX_ATTEMPTS):
+    """
+    Send queued calendar changes, grouped per user into batch HTTP requests.
+    Event ids returned by inserts are stored on the booking or slot, so later
+    updates and deletes can find the event. Failures are retried with
+    exponential backoff. Returns a summary of the run.
+    """
+    started = time.monotonic()
+    summary = {'claimed': 0, 'sent': 0, 'batches': 0, 'retried': 0, 'failed': 0}
+
+    while True:
+        syncs = _claim_jobs(CalendarSync, batch_size, max_attempts, summary, select_related=('user', 'booking', 'slot'))
+        if not syncs:
+            break
+        summary['claimed'] += len(syncs)
+
+        by_user = defaultdict(list)
+        for sync in syncs:
+            sync.resolved_event_id = _calendar_event_id(sync)
+            if sync.action != CalendarSync.Action.INSERT and not sync.resolved_event_id:
+                # The insert for this event hasn't completed yet.
+                _record_failure(sync, "Calendar event has not been created yet.", max_attempts, summary)
+                continue
+            by_user[sync.user_id].append(sync)
+
+        for user_syncs in by_user.values():
+            user = user_syncs[0].user
+            try:
+                results, batches = _send_calendar_batch(user, user_syncs)
+                summary['batches'] += batches
+            except GoogleOAuthToken.DoesNotExist:
+                for sync in user_syncs:
+                    _record_failure(sync, "Calendar not connected.", max_attempts, summary, retry=False)
+                continue
+            except Exception as e:
+                print(f"Failed to sync calendar events for {user}: {e}")
+                for sync in user_syncs:
+                    _record_failure(sync, e, max_attempts, summary)
+                continue
+
+            sent_ids = []
+            for sync in user_syncs:
+                response, exception = results.get(str(sync.id), (None, Exception("No response in batch.")))
+                if exception is not None:
+                    _record_failure(sync, exception, max_attempts, summary)
+                    continue
+                sent_ids.append(sync.id)
+                if sync.action == CalendarSync.Action.INSERT and response:
+                    if sync.booking_id:
+                        Booking.objects.filter(id=sync.booking_id).update(calendar_event_id=response["id"])
+                    if sync.slot_id:
+                        ExperienceSlot.objects.filter(id=sync.slot_id).update(calendar_event_id=response["id"])
+                    CalendarSync.objects.filter(id=sync.id).update(event_id=response["id"])
+
+            # Per user, so a worker killed before the next user's batch doesn't resend these
+            summary['sent'] += CalendarSync.objects.filter(id__in=sent_ids).update(
+                status=CalendarSync.Status.SENT, last_error='', updated_at=timezone.now()
+            )
+
+        if len(syncs) < batch_size:
+            break
+
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+    print(f"sync_calendar_events: {summary}")
+    return summary
+
+
+def purge_geocode_cache():
+    """
+    Delete expired geocoding answers from the shared cache table and report
+    this worker's hit/miss counters.
+    """
+    started = time.monotonic()
+    deleted, _ = GeocodeCacheEntry.objects.filter(expires_at__lte=timezone.now()).delete()
+    summary = {'deleted': deleted, **geocoding.cache_stats()}
+    summary['duration_ms'] = round((time.monotonic() - started) * 1000, 2)
+    print(f"purge_geocode_cache: {summary}")
+    return summary
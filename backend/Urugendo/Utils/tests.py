@@ -0,0 +1,588 @@
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from google.oauth2.credentials import Credentials
+
+from Users.models import GoogleOAuthToken
+from Utils import geocoding, google_clients
+from Utils.calendar import calendar_event, queue_calendar_events, queue_calendar_update, queue_calendar_delete
+from Utils.email import send_email, send_booking_cancellation
+from Utils.models import OutboundEmail, CalendarSync, GeocodeCacheEntry
+from Utils.tasks import drain_email_outbox, sync_calendar_events
+
+
+class EmailOutboxTests(TestCase):
+    def test_send_email_queues_without_contacting_gmail(self):
+        """Helpers only write an outbox row; delivery happens in the drain task."""
+        print("Testing email helpers enqueue instead of sending")
+        with patch("Utils.google_clients.get_gmail_service") as gmail:
+            send_email("tourist@example.com", "Hello", "<p>Hi</p>")
+
+        gmail.assert_not_called()
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, OutboundEmail.Status.PENDING)
+        self.assertEqual(email.to, "tourist@example.com")
+
+    def test_dedupe_key_queues_a_message_once(self):
+        """A second message with the same dedupe key is dropped."""
+        print("Testing outbox dedupe keys")
+        for _ in range(2):
+            send_booking_cancellation(
+                to="tourist@example.com", tourist_name="Ana", experience_title="Kigali City Walk",
+                booking_date="March 01, 2026", dedupe_key="booking:1:cancelled:tourist",
+            )
+        send_email("tourist@example.com", "Different", "<p>Hi</p>")
+
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+
+    def test_drain_delivers_with_file_backend(self):
+        """The file backend writes one .eml per message and marks it SENT."""
+        print("Testing outbox drain with the file backend")
+        outbox = tempfile.mkdtemp()
+        for i in range(3):
+            send_email(f"user{i}@example.com", "Hello", "<p>Hi</p>")
+
+        with override_settings(EMAIL_OUTBOX_BACKEND="file", EMAIL_OUTBOX_FILE_PATH=outbox):
+            summary = drain_email_outbox(batch_size=2)
+
+        self.assertEqual(summary["sent"], 3)
+        self.assertEqual(len(list(Path(outbox).glob("*.eml"))), 3)
+        self.assertFalse(OutboundEmail.objects.exclude(status=OutboundEmail.Status.SENT).exists())
+
+    @override_settings(EMAIL_OUTBOX_BACKEND="console")
+    def test_failures_retry_with_backoff_then_fail(self):
+        """A failing delivery is rescheduled, then marked FAILED after max attempts."""
+        print("Testing outbox retries with backoff")
+        send_email("tourist@example.com", "Hello", "<p>Hi</p>")
+
+        with patch("Utils.tasks.deliver_email", side_effect=Exception("Gmail down")):
+            summary = drain_email_outbox(max_attempts=2)
+            email = OutboundEmail.objects.get()
+            self.assertEqual(summary["retried"], 1)
+            self.assertEqual(email.status, OutboundEmail.Status.PENDING)
+            self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=30))
+            self.assertEqual(email.last_error, "Gmail down")
+
+            # Not due yet, so a second run leaves it alone.
+            self.assertEqual(drain_email_outbox(max_attempts=2)["claimed"], 0)
+
+            OutboundEmail.objects.update(next_attempt_at=timezone.now())
+            summary = drain_email_outbox(max_attempts=2)
+
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.Status.FAILED)
+
+    @override_settings(EMAIL_OUTBOX_BACKEND="console")
+    def test_worker_killed_mid_batch_sends_nothing_twice(self):
+        """Messages delivered before a crash stay SENT; the reclaimed rest go out once."""
+        print("Testing outbox recovery after a worker dies mid-batch")
+        for i in range(3):
+            send_email(f"user{i}@example.com", "Hello", "<p>Hi</p>")
+        delivered = []
+
+        def deliver_then_die(email):
+            if len(delivered) == 2:
+                raise SystemExit("worker killed")
+            delivered.append(email.to)
+
+        with patch("Utils.tasks.deliver_email", side_effect=deliver_then_die):
+            with self.assertRaises(SystemExit):
+                drain_email_outbox()
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.Status.SENT).count(), 2)
+
+        OutboundEmail.objects.filter(status=OutboundEmail.Status.SENDING).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+        with patch("Utils.tasks.deliver_email", side_effect=lambda email: delivered.append(email.to)):
+            summary = drain_email_outbox()
+
+        self.assertEqual(summary["sent"], 1)
+        self.assertEqual(sorted(delivered), ["user0@example.com", "user1@example.com", "user2@example.com"])
+
+    def test_reclaimed_rows_out_of_attempts_fail(self):
+        """A row that keeps killing the worker is given up on instead of being retried forever."""
+        print("Testing stale SENDING rows out of attempts are failed")
+        send_email("tourist@example.com", "Hello", "<p>Hi</p>")
+        OutboundEmail.objects.update(
+            status=OutboundEmail.Status.SENDING, attempts=2, updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        with patch("Utils.tasks.deliver_email") as deliver:
+            summary = drain_email_outbox(max_attempts=2)
+
+        deliver.assert_not_called()
+        self.assertEqual(summary["failed"], 1)
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.Status.FAILED)
+
+    @override_settings(EMAIL_OUTBOX_BACKEND="gmail")
+    def test_gmail_backend_sends_through_the_cached_client(self):
+        """Draining many messages through Gmail uses one client."""
+        print("Testing outbox sends through the cached Gmail client")
+        for i in range(5):
+            send_email(f"user{i}@example.com", "Hello", "<p>Hi</p>")
+
+        with patch("Utils.google_clients.get_gmail_service") as gmail:
+            summary = drain_email_outbox()
+
+        self.assertEqual(summary["sent"], 5)
+        self.assertEqual(gmail.return_value.users.return_value.messages.return_value.send.call_count, 5)
+
+
+def fake_refresh(creds, request):
+    creds.token = "refreshed-token"
+    creds.expiry = datetime.utcnow() + timedelta(hours=1)
+
+
+@override_settings(GOOGLE_REFRESH_TOKEN="refresh")
+@patch.object(Credentials, "refresh", autospec=True, side_effect=fake_refresh)
+@patch.object(google_clients, "build")
+class GoogleClientTests(TestCase):
+    def setUp(self):
+        google_clients.clear()
+        google_clients._local.__dict__.clear()
+        self.user = get_user_model().objects.create_user(
+            username="guide1", email="guide@example.com", password="SecurePass123!", role="Guide"
+        )
+        GoogleOAuthToken.objects.create(user=self.user, access_token="access", refresh_token="refresh")
+
+    def test_gmail_service_is_built_and_refreshed_once(self, build, refresh):
+        """100 sends reuse one client and refresh the token once."""
+        print("Testing Gmail client is cached")
+        for _ in range(100):
+            google_clients.get_gmail_service()
+
+        build.assert_called_once()
+        refresh.assert_called_once()
+        self.assertTrue(build.call_args.kwargs["static_discovery"])
+
+    def test_calendar_token_is_read_once(self, build, refresh):
+        """The user's token is loaded once; later calls cost no queries."""
+        print("Testing calendar credentials are cached")
+        google_clients.get_calendar_service(self.user)
+
+        with self.assertNumQueries(0):
+            for _ in range(10):
+                google_clients.get_calendar_service(self.user)
+        build.assert_called_once()
+        refresh.assert_not_called()
+
+    def test_token_change_drops_cached_credentials(self, build, refresh):
+        """Reconnecting the calendar makes the next call use the new token."""
+        print("Testing calendar credentials are dropped when the token changes")
+        google_clients.get_calendar_service(self.user)
+
+        token = GoogleOAuthToken.objects.get(user=self.user)
+        token.access_token = "new-access"
+        token.save()
+
+        with self.assertNumQueries(1):
+            google_clients.get_calendar_service(self.user)
+        self.assertEqual(build.call_count, 2)
+        self.assertEqual(build.call_args.kwargs["http"].credentials.token, "new-access")
+
+    def test_each_thread_gets_its_own_client(self, build, refresh):
+        """Clients are not shared between threads, but credentials are."""
+        print("Testing Google clients are cached per thread")
+        google_clients.get_gmail_service()
+        worker = threading.Thread(target=google_clients.get_gmail_service)
+        worker.start()
+        worker.join()
+
+        self.assertEqual(build.call_count, 2)
+        refresh.assert_called_once()
+
+    def test_slow_refresh_does_not_block_other_credentials(self, build, refresh):
+        """A calendar client can be fetched while the Gmail token refresh is still waiting on Google."""
+        print("Testing a token refresh only locks its own credentials")
+        started, release = threading.Event(), threading.Event()
+
+        def slow_refresh(creds, request):
+            started.set()
+            release.wait(timeout=5)
+            fake_refresh(creds, request)
+
+        refresh.side_effect = slow_refresh
+        worker = threading.Thread(target=google_clients.get_gmail_service)
+        worker.start()
+        try:
+            self.assertTrue(started.wait(timeout=5))
+            google_clients.get_calendar_service(self.user)
+            self.assertTrue(worker.is_alive())
+        finally:
+            release.set()
+            worker.join()
+
+    def test_caches_keep_only_recent_entries(self, build, refresh):
+        """Credentials and clients beyond the cache sizes are dropped, least recently used first."""
+        print("Testing Google client caches are bounded")
+        other = get_user_model().objects.create_user(
+            username="guide2", email="guide2@example.com", password="SecurePass123!", role="Guide"
+        )
+        GoogleOAuthToken.objects.create(user=other, access_token="access", refresh_token="refresh")
+
+        with patch.object(google_clients, "CREDENTIALS_CACHE_SIZE", 2), \
+                patch.object(google_clients, "SERVICES_CACHE_SIZE", 2):
+            google_clients.get_calendar_service(self.user)
+            google_clients.get_gmail_service()
+            google_clients.get_calendar_service(other)
+
+        self.assertEqual(list(google_clients._credentials), ["gmail", f"calendar:{other.pk}"])
+        self.assertEqual(
+            [key for key, _, _ in google_clients._local.services], ["gmail", f"calendar:{other.pk}"]
+        )
+
+
+class FakeBatch:
+    """Stands in for BatchHttpRequest: answers every request when executed."""
+    executed = []
+
+    def __init__(self, callback, fail_ids=()):
+        self.callback = callback
+        self.fail_ids = fail_ids
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request, request_id))
+
+    def execute(self):
+        FakeBatch.executed.append(len(self.requests))
+        for request, request_id in self.requests:
+            if request_id in self.fail_ids:
+                self.callback(request_id, None, Exception("Rate limit exceeded"))
+            else:
+                self.callback(request_id, {"id": f"event-{request_id}"}, None)
+
+
+class CalendarSyncTests(TestCase):
+    def setUp(self):
+        from Experiences.models import Experience, ExperienceSlot
+
+        FakeBatch.executed = []
+        self.guide = get_user_model().objects.create_user(
+            username="guide1", email="guide@example.com", password="SecurePass123!", role="Guide"
+        )
+        experience = Experience.objects.create(title="Kigali City Walk", guide=self.guide)
+        self.slots = [
+            ExperienceSlot.objects.create(
+                experience=experience, date=timezone.localdate() + timedelta(days=day),
+                capacity=10, remaining_slots=10, price="25.00",
+            )
+            for day in range(1, 61)
+        ]
+        self.service = MagicMock()
+        self.service.new_batch_http_request.side_effect = lambda callback: FakeBatch(callback)
+
+    def _queue_slot_events(self, slots):
+        return queue_calendar_events(
+            calendar_event(self.guide, "Kigali City Walk Slot", "", f"{slot.date}T09:00:00", f"{slot.date}T12:00:00",
+                           slot=slot)
+            for slot in slots
+        )
+
+    def test_events_for_one_user_are_sent_in_batches(self):
+        """60 new slots go out as two batch requests and store their event ids."""
+        print("Testing calendar sync batches events per user")
+        self._queue_slot_events(self.slots)
+
+        with patch("Utils.tasks.get_calendar_service", return_value=self.service):
+            summary = sync_calendar_events()
+
+        self.assertEqual(summary["sent"], 60)
+        self.assertEqual(FakeBatch.executed, [50, 10])
+        self.service.events.return_value.insert.assert_called()
+        slot = self.slots[0]
+        slot.refresh_from_db()
+        self.assertTrue(slot.calendar_event_id.startswith("event-"))
+
+    def test_updates_and_deletes_use_the_stored_event_id(self):
+        """Later changes find the event id the insert stored on the slot."""
+        print("Testing calendar sync updates and deletes stored events")
+        slot = self.slots[0]
+        self._queue_slot_events([slot])
+        with patch("Utils.tasks.get_calendar_service", return_value=self.service):
+            sync_calendar_events()
+            slot.refresh_from_db()
+
+            queue_calendar_update(self.guide, slot=slot, title="Moved")
+            queue_calendar_delete(self.guide, slot=slot)
+            summary = sync_calendar_events()
+
+        self.assertEqual(summary["sent"], 2)
+        events = self.service.events.return_value
+        events.patch.assert_called_once_with(calendarId="primary", eventId=slot.calendar_event_id,
+                                             body={"summary": "Moved"})
+        events.delete.assert_called_once_with(calendarId="primary", eventId=slot.calendar_event_id)
+
+    def test_failed_requests_are_retried(self):
+        """A request that fails inside the batch is rescheduled; the rest are sent."""
+        print("Testing calendar sync retries failed batch requests")
+        syncs = self._queue_slot_events(self.slots[:3])
+        failing = str(syncs[0].id)
+        self.service.new_batch_http_request.side_effect = lambda callback: FakeBatch(callback, fail_ids={failing})
+
+        with patch("Utils.tasks.get_calendar_service", return_value=self.service):
+            summary = sync_calendar_events()
+
+        self.assertEqual(summary["sent"], 2)
+        self.assertEqual(summary["retried"], 1)
+        self.assertEqual(CalendarSync.objects.get(id=failing).status, CalendarSync.Status.PENDING)
+
+    def test_users_without_calendar_fail_without_retry(self):
+        """Changes for a user who disconnected their calendar are dropped."""
+        print("Testing calendar sync drops changes for disconnected users")
+        self._queue_slot_events(self.slots[:2])
+
+        summary = sync_calendar_events()
+
+        self.assertEqual(summary["failed"], 2)
+        self.assertFalse(CalendarSync.objects.exclude(status=CalendarSync.Status.FAILED).exists())
+
+
+def geocode_response(status="OK", address="Kigali, Rwanda"):
+    response = MagicMock()
+    response.json.return_value = {
+        "status": status,
+        "results": [] if status != "OK" else [{
+            "formatted_address": address,
+            "place_id": "place-1",
+            "geometry": {"location": {"lat": -1.9441, "lng": 30.0619}},
+        }],
+    }
+    return response
+
+
+class GeocodingCacheTests(TestCase):
+    def setUp(self):
+        geocoding.clear()
+        self.addCleanup(geocoding.clear)
+
+    def test_repeated_queries_are_served_from_memory(self):
+        """Queries differing only in case and spacing share one API call and no DB reads."""
+        print("Testing geocoding in-process cache")
+        with patch.object(geocoding._session, "get", return_value=geocode_response()) as get:
+            first = geocoding.geocode_place("Kigali")
+            with self.assertNumQueries(0):
+                again = geocoding.geocode_place("  kigali ")
+
+        self.assertEqual(first, again)
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(geocoding.cache_stats()["memory_hits"], 1)
+
+    def test_other_workers_hit_the_table(self):
+        """A process without the answer in memory reads it from the cache table."""
+        print("Testing geocoding database cache")
+        with patch.object(geocoding._session, "get", return_value=geocode_response()) as get:
+            geocoding.reverse_geocode(-1.94412, 30.06188)
+            geocoding.clear()
+            result = geocoding.reverse_geocode("-1.94409", "30.06191")
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(result["place_name"], "Kigali, Rwanda")
+        self.assertEqual(geocoding.cache_stats()["db_hits"], 1)
+        self.assertTrue(GeocodeCacheEntry.objects.filter(key="reverse:-1.9441,30.0619").exists())
+
+    def test_zero_results_are_cached_but_errors_are_not(self):
+        """ZERO_RESULTS is remembered; API errors are retried on the next call."""
+        print("Testing geocoding negative cache")
+        with patch.object(geocoding._session, "get", return_value=geocode_response("ZERO_RESULTS")) as get:
+            for _ in range(2):
+                with self.assertRaises(ValueError):
+                    geocoding.geocode_place("Nowhere")
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(geocoding.cache_stats()["not_found_hits"], 2)
+
+        with patch.object(geocoding._session, "get", return_value=geocode_response("OVER_QUERY_LIMIT")) as get:
+            for _ in range(2):
+                with self.assertRaisesMessage(Exception, "OVER_QUERY_LIMIT"):
+                    geocoding.geocode_place("Musanze")
+        self.assertEqual(get.call_count, 2)
+        self.assertFalse(GeocodeCacheEntry.objects.filter(key="geocode:musanze").exists())
+
+    def test_expired_entries_are_fetched_again(self):
+        """Answers past their TTL are refreshed from the API."""
+        print("Testing geocoding cache expiry")
+        with patch.object(geocoding._session, "get", return_value=geocode_response()):
+            geocoding.geocode_place("Huye")
+        GeocodeCacheEntry.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        geocoding.clear()
+
+        with patch.object(geocoding._session, "get", return_value=geocode_response(address="Huye, Rwanda")) as get:
+            self.assertEqual(geocoding.geocode_place("Huye")["place_name"], "Huye, Rwanda")
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(GeocodeCacheEntry.objects.count(), 1)
+
+
+class FakeGeocodingServer:
+    """A local HTTP server answering like the Geocoding API, slowly, and counting requests."""
+
+    def __init__(self, delay=0.3):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.lock:
+                    server.requests += 1
+                time.sleep(server.delay)
+                body = json.dumps(geocode_response().json.return_value).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.delay = delay
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/geocode/json"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class GeocodingCoalescingTests(TransactionTestCase):
+    """Uses real commits because lookups run in worker threads."""
+
+    def setUp(self):
+        geocoding.clear()
+        self.addCleanup(geocoding.clear)
+        self.server = FakeGeocodingServer()
+        self.addCleanup(self.server.close)
+        url_patch = patch.object(geocoding, "GEOCODE_URL", self.server.url)
+        url_patch.start()
+        self.addCleanup(url_patch.stop)
+
+    def _concurrently(self, calls):
+        results, errors = [], []
+        start = threading.Barrier(len(calls))
+
+        def run(call):
+            try:
+                start.wait()
+                results.append(call())
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=run, args=(call,)) for call in calls]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return results, errors
+
+    def test_concurrent_identical_queries_share_one_upstream_call(self):
+        """Simultaneous lookups of one place (or one coordinate cell) make one request each."""
+        print("Testing geocoding single-flight coalescing")
+        calls = [lambda: geocoding.geocode_place("Kigali")] * 8
+        calls += [lambda: geocoding.reverse_geocode(-1.94412, 30.06188)] * 4
+        calls += [lambda: geocoding.reverse_geocode(-1.94409, 30.06191)] * 4
+
+        results, errors = self._concurrently(calls)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(results), 16)
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(geocoding.cache_stats()["coalesced"], 14)
+
+    def test_rate_limiter_caps_upstream_calls(self):
+        """Distinct queries beyond the bucket's burst are refused instead of hitting the API."""
+        print("Testing geocoding rate limiter")
+        places = ["Kigali", "Musanze", "Huye", "Rubavu", "Nyanza"]
+        with patch.object(geocoding, "_limiter", geocoding.TokenBucket(rate=0.01, capacity=2)), \
+                patch.object(geocoding, "RATE_LIMIT_MAX_WAIT", 0):
+            results, errors = self._concurrently([lambda place=place: geocoding.geocode_place(place) for place in places])
+
+        self.assertEqual(self.server.requests, 2)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(len(errors), 3)
+        self.assertTrue(all(isinstance(error, geocoding.GeocodingRateLimited) for error in errors))
+
+
+def azure_translate(url, params=None, headers=None, json=None, timeout=None):
+    """Fake Azure /translate: 'text' becomes '[lang] text' for every requested language."""
+    response = MagicMock()
+    response.json.return_value = [
+        {"translations": [{"text": f"[{lang}] {item['text']}", "to": lang} for lang in params["to"]]}
+        for item in json
+    ]
+    return response
+
+
+class TranslationBatchTests(TestCase):
+    def test_catalog_is_translated_in_few_requests(self):
+        """1,000 experiences' titles and descriptions need tens of requests, not thousands."""
+        print("Testing batch translation of an experience catalog")
+        from Utils.translate import translate_batch
+        texts = [f"Experience {i}" for i in range(1000)] + [f"A long description {i}. " * 10 for i in range(1000)]
+
+        with patch("Utils.translate._session.post", side_effect=azure_translate) as post:
+            results = translate_batch(texts, ["fr", "rw"])
+
+        self.assertLessEqual(post.call_count, 50)
+        self.assertEqual(results[0], {"fr": "[fr] Experience 0", "rw": "[rw] Experience 0"})
+        self.assertEqual(len(results), 2000)
+        for call in post.call_args_list:
+            sent = call.kwargs["json"]
+            self.assertLessEqual(len(sent), 100)
+            self.assertLessEqual(sum(len(item["text"]) for item in sent) * 2, 50000)
+
+    def test_cached_translations_are_not_sent_again(self):
+        """Repeated and previously translated texts only go to Azure for the languages they lack."""
+        print("Testing translation cache")
+        from Utils.models import TranslationCacheEntry
+        from Utils.translate import translate_batch, translate_text
+
+        with patch("Utils.translate._session.post", side_effect=azure_translate) as post:
+            self.assertEqual(translate_text("Muraho", "en"), "[en] Muraho")
+            results = translate_batch(["Muraho", "Muraho", "Murakoze", ""], ["en", "fr"])
+
+        self.assertEqual(post.call_count, 3)
+        self.assertEqual(post.call_args_list[1].kwargs["params"]["to"], ["fr"])
+        self.assertEqual(post.call_args_list[2].kwargs["params"]["to"], ["en", "fr"])
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[3], {"en": "", "fr": ""})
+        self.assertEqual(TranslationCacheEntry.objects.count(), 4)
+
+        with patch("Utils.translate._session.post") as post:
+            with self.assertNumQueries(1):
+                translate_batch(["Muraho", "Murakoze"], ["en", "fr"])
+        post.assert_not_called()
+
+    def test_unmatched_language_codes_are_left_out(self):
+        """Codes differing only in case are matched; other codes Azure returns are dropped, not raised on."""
+        print("Testing translation results with unexpected language codes")
+        from Utils.models import TranslationCacheEntry
+        from Utils.translate import translate_batch, translate_text
+
+        def regional_codes(url, params=None, headers=None, json=None, timeout=None):
+            response = MagicMock()
+            response.json.return_value = [
+                {"translations": [{"text": f"[{lang}] {item['text']}", "to": {"fr": "FR", "rw": "rw-RW"}[lang]}
+                                  for lang in params["to"]]}
+                for item in json
+            ]
+            return response
+
+        with patch("Utils.translate._session.post", side_effect=regional_codes):
+            results = translate_batch(["Muraho"], ["fr", "rw"])
+            with self.assertRaisesMessage(Exception, "no translation into 'rw'"):
+                translate_text("Murakoze", "rw")
+
+        self.assertEqual(results, [{"fr": "[fr] Muraho"}])
+        self.assertEqual(list(TranslationCacheEntry.objects.values_list("to_lang", flat=True)), ["fr"])
@@ -1,6 +1,136 @@
+"""
+Azure Translator with batching and a persistent cache.
+
+translate_batch sends many texts (and several target languages) per HTTP
+request over a pooled session, and stores every translation in the
+TranslationCacheEntry table keyed by (SHA-256 of the text, from, to), so a
+text is only ever sent to Azure once per language pair.
+
+Usage:
+    from Utils.translate import translate_batch, translate_text
+    translate_batch(["Gorilla trekking", "Canopy walk"], ["fr", "rw"])
+    # [{'fr': '...', 'rw': '...'}, {'fr': '...', 'rw': '...'}]
+"""
+import hashlib
 import uuid
+from collections import defaultdict
 import requests
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+# Languages experience content is offered in.
+SUPPORTED_LANGUAGES = ("en", "fr", "rw")
+
+# Azure limits a request to 1000 texts and 50,000 characters summed over
+# every target language; stay below both.
+MAX_TEXTS_PER_REQUEST = 100
+MAX_CHARS_PER_REQUEST = 45000
+REQUEST_TIMEOUT = 30
+
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+
+
+def _headers():
+    return {
+        "Ocp-Apim-Subscription-Key": settings.AZURE_TRANSLATOR_KEY,
+        "Ocp-Apim-Subscription-Region": settings.AZURE_TRANSLATOR_REGION,
+        "Content-Type": "application/json",
+        "X-ClientTraceId": str(uuid.uuid4()),
+    }
+
+
+def _post(path, params, texts, error_label):
+    try:
+        response = _session.post(
+            f"{settings.AZURE_TRANSLATOR_ENDPOINT}/{path}",
+            params=params,
+            headers=_headers(),
+            json=[{"text": text} for text in texts],
+            timeout=REQUEST_TIMEOUT,
+        )
+        response.raise_for_status()
+        return response.json()
+    except requests.RequestException as e:
+        raise Exception(f"{error_label} error: {e}")
+
+
+def _chunks(texts, languages=1):
+    """Split texts into request-sized chunks. A text longer than the limit gets a chunk of its own."""
+    chunk, chars = [], 0
+    for text in texts:
+        size = len(text) * languages
+        if chunk and (len(chunk) == MAX_TEXTS_PER_REQUEST or chars + size > MAX_CHARS_PER_REQUEST):
+            yield chunk
+            chunk, chars = [], 0
+        chunk.append(text)
+        chars += size
+    if chunk:
+        yield chunk
+
+
+def _hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def translate_batch(texts, to_langs, from_lang=None):
+    """
+    Translate every text into every language in `to_langs`.
+    Omit from_lang to enable auto-detection.
+
+    Returns a list aligned with `texts` of {language code: translated text}.
+    Cached translations are read with one query; the rest are sent to Azure
+    grouped by the languages they still need, up to MAX_TEXTS_PER_REQUEST
+    texts per request. Blank texts are returned unchanged. A language Azure
+    returned no translation for is left out of that text's dict, so callers
+    should use .get().
+    """
+    from .models import TranslationCacheEntry
+
+    to_langs = list(dict.fromkeys(to_langs))
+    # Azure may echo a code in different case ("zh-hans" -> "zh-Hans"); file it under the code asked for
+    requested = {lang.lower(): lang for lang in to_langs}
+    from_key = from_lang or ""
+    hashes = {text: _hash(text) for text in texts if text and text.strip()}
+
+    translated = defaultdict(dict)  # hash -> {language: text}
+    for row in TranslationCacheEntry.objects.filter(
+        source_hash__in=set(hashes.values()), from_lang=from_key, to_lang__in=to_langs
+    ).values('source_hash', 'to_lang', 'translated_text'):
+        translated[row['source_hash']][row['to_lang']] = row['translated_text']
+
+    # Unique texts grouped by the languages they are still missing
+    missing = defaultdict(list)
+    for text, source_hash in hashes.items():
+        languages = tuple(lang for lang in to_langs if lang not in translated[source_hash])
+        if languages:
+            missing[languages].append(text)
+
+    new_rows = []
+    for languages, pending in missing.items():
+        params = {"api-version": "3.0", "to": list(languages)}
+        if from_lang:
+            params["from"] = from_lang
+        for chunk in _chunks(pending, len(languages)):
+            results = _post("translate", params, chunk, "Azure Translator")
+            for text, result in zip(chunk, results):
+                for translation in result["translations"]:
+                    to_lang = requested.get(translation["to"].lower())
+                    if to_lang is None:
+                        continue
+                    translated[hashes[text]][to_lang] = translation["text"]
+                    new_rows.append(TranslationCacheEntry(
+                        source_hash=hashes[text], from_lang=from_key,
+                        to_lang=to_lang, translated_text=translation["text"],
+                    ))
+
+    if new_rows:
+        TranslationCacheEntry.objects.bulk_create(new_rows, batch_size=500, ignore_conflicts=True)
+
+    return [
+        dict(translated[hashes[text]]) if text in hashes else {lang: text for lang in to_langs}
+        for text in texts
+    ]
 
 
 def translate_text(text: str, to_lang: str, from_lang: str = None) -> str:
@@ -16,34 +146,27 @@ def translate_text(text: str, to_lang: str, from_lang: str = None) -> str:
     Returns:
         Translated string
 
+    Raises:
+        Exception: if Azure returned no translation into to_lang
+
     Usage:
         from Utils.translate import translate_text
         translated = translate_text("Muraho!", to_lang="en")
         # returns "Hello!"
     """
-    params = {"api-version": "3.0", "to": to_lang}
-    if from_lang:
-        params["from"] = from_lang
+    translated = translate_batch([text], [to_lang], from_lang)[0].get(to_lang)
+    if translated is None:
+        raise Exception(f"Azure Translator error: no translation into {to_lang!r} returned")
+    return translated
 
-    headers = {
-        "Ocp-Apim-Subscription-Key": settings.AZURE_TRANSLATOR_KEY,
-        "Ocp-Apim-Subscription-Region": settings.AZURE_TRANSLATOR_REGION,
-        "Content-Type": "application/json",
-        "X-ClientTraceId": str(uuid.uuid4()),
-    }
 
-    try:
-        response = requests.post(
-            f"{settings.AZURE_TRANSLATOR_ENDPOINT}/translate",
-            params=params,
-            headers=headers,
-            json=[{"text": text}],
-            timeout=10,
-        )
-        response.raise_for_status()
-        return response.json()[0]["translations"][0]["text"]
-    except requests.RequestException as e:
-        raise Exception(f"Azure Translator error: {e}")
+def detect_languages(texts):
+    """Detect the language of many texts, MAX_TEXTS_PER_REQUEST per request. Returns codes aligned with `texts`."""
+    languages = []
+    for chunk in _chunks(texts):
+        results = _post("detect", {"api-version": "3.0"}, chunk, "Azure Detect")
+        languages.extend(result["language"] for result in results)
+    return languages
 
 
 def detect_language(text: str) -> str:
@@ -58,22 +181,4 @@ def detect_language(text: str) -> str:
         lang = detect_language("Muraho!")
         # returns "rw"
     """
-    headers = {
-        "Ocp-Apim-Subscription-Key": settings.AZURE_TRANSLATOR_KEY,
-        "Ocp-Apim-Subscription-Region": settings.AZURE_TRANSLATOR_REGION,
-        "Content-Type": "application/json",
-        "X-ClientTraceId": str(uuid.uuid4()),
-    }
-
-    try:
-        response = requests.post(
-            f"{settings.AZURE_TRANSLATOR_ENDPOINT}/detect",
-            params={"api-version": "3.0"},
-            headers=headers,
-            json=[{"text": text}],
-            timeout=10,
-        )
-        response.raise_for_status()
-        return response.json()[0]["language"]
-    except requests.RequestException as e:
-        raise Exception(f"Azure Detect error: {e}")
\ No newline at end of file
+    return detect_languages([text])[0]
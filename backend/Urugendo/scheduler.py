@@ -13,6 +13,11 @@ def setup_schedules():
             'func': 'Booking.tasks.expire_pending_bookings',
             'minutes': 5,
         },
+        {
+            'name': 'Release expired seat holds',
+            'func': 'Booking.tasks.release_expired_holds',
+            'minutes': 1,
+        },
         {
             'name': 'Complete confirmed bookings',
             'func': 'Booking.tasks.complete_confirmed_bookings',
@@ -33,6 +38,36 @@ def setup_schedules():
             'func': 'Payment.tasks.process_pending_payouts',
             'minutes': 15,
         },
+        {
+            'name': 'Drain email outbox',
+            'func': 'Utils.tasks.drain_email_outbox',
+            'minutes': 1,
+        },
+        {
+            'name': 'Sync calendar events',
+            'func': 'Utils.tasks.sync_calendar_events',
+            'minutes': 1,
+        },
+        {
+            'name': 'Translate experiences',
+            'func': 'Experiences.tasks.translate_experiences',
+            'minutes': 30,
+        },
+        {
+            'name': 'Purge geocoding cache',
+            'func': 'Utils.tasks.purge_geocode_cache',
+            'minutes': 24 * 60,
+        },
+        {
+            'name': 'Collect orphaned images',
+            'func': 'Pictures.tasks.collect_orphaned_images',
+            'minutes': 60,
+        },
+        {
+            'name': 'Sweep stalled uploads',
+            'func': 'Pictures.tasks.sweep_stalled_uploads',
+            'minutes': 60,
+        },
     ]
 
     for task in tasks: